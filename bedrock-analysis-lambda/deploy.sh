@@ -13,6 +13,8 @@ echo "Creating deployment package for $LAMBDA_NAME..."
 echo "Setting up package directory..."
 mkdir -p package
 cp lambda_function.py package/
+cp ../deployment-package/aws_clients.py ../deployment-package/import_timing.py ../deployment-package/snapstart.py package/
+cp ../deployment-package/lru_cache.py ../deployment-package/l2_cache.py ../deployment-package/analysis_sections.py package/
 
 # Install dependencies in package directory
 echo "Installing boto3 in the package directory..."
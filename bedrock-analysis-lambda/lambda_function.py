@@ -1,10 +1,17 @@
+import copy
+import hashlib
 import json
 import os
-import boto3
 import logging
 import time
 import re
-from typing import Dict, Any, Optional
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Any, List, Optional, Tuple
+from analysis_sections import ANALYSIS_SECTIONS, SectionStreamParser, parse_sections, structured_sections
+from aws_clients import get_client, reset_clients
+from l2_cache import L2_CACHE_FLUSH_TIMEOUT, L2Cache
+from lru_cache import LRUTTLCache
+from snapstart import before_snapshot, after_restore, reseed_random
 
 # Configure logging
 logger = logging.getLogger()
@@ -12,6 +19,64 @@ logger.setLevel(logging.INFO)
 
 # Default model if environment variable is not set
 DEFAULT_MODEL_ID = 'meta.llama3-70b-instruct-v1:0'
+BEDROCK_REGION = os.environ.get('REACT_APP_AWS_REGION', 'us-east-1')
+
+# Batch requests: candidates analysed concurrently, and the time each may take
+BATCH_MAX_CANDIDATES = int(os.environ.get('BATCH_MAX_CANDIDATES', '25'))
+BATCH_MAX_WORKERS = int(os.environ.get('BATCH_MAX_WORKERS', '4'))
+BATCH_ITEM_TIMEOUT_SECONDS = float(os.environ.get('BATCH_ITEM_TIMEOUT_SECONDS', '25'))
+# Time kept back from the Lambda deadline to build and return the response
+BATCH_DEADLINE_MARGIN_SECONDS = float(os.environ.get('BATCH_DEADLINE_MARGIN_SECONDS', '2'))
+
+_executor = None
+
+# Default execute-api host of a WebSocket API: {api-id}.execute-api.{region}.amazonaws.com
+_EXECUTE_API_HOST_PATTERN = re.compile(r'^[a-z0-9]+\.execute-api\.([a-z0-9-]+)\.amazonaws\.com$')
+
+# Comparative requests ("mode": "compare") rank a shortlist in one model call
+COMPARE_MAX_CANDIDATES = int(os.environ.get('COMPARE_MAX_CANDIDATES', '8'))
+# Generation budget when the request does not set max_gen_len; Llama 3 caps it at 2048
+COMPARE_BASE_GEN_LEN = 256
+COMPARE_GEN_LEN_PER_CANDIDATE = 224
+COMPARE_MAX_GEN_LEN = 2048
+
+# Finished analyses keyed by prompt, model and sampling parameters. The
+# DynamoDB tier is shared by all containers and enabled by L2_CACHE_TABLE.
+ANALYSIS_CACHE_MAX_ENTRIES = int(os.environ.get('ANALYSIS_CACHE_MAX_ENTRIES', '500'))
+ANALYSIS_CACHE_TTL_SECONDS = float(os.environ.get('ANALYSIS_CACHE_TTL', '86400'))
+# Default for the request's "reproducible" flag: greedy decoding, so a
+# repeated request gets the same analysis from cache or model alike
+ANALYSIS_REPRODUCIBLE = os.environ.get('ANALYSIS_REPRODUCIBLE', 'false').lower() == 'true'
+_analysis_cache = LRUTTLCache(ANALYSIS_CACHE_MAX_ENTRIES, ANALYSIS_CACHE_TTL_SECONDS, name='candidate_analysis')
+_l2_cache = L2Cache()
+
+_TEXT_OUTPUT_INSTRUCTIONS = """Please provide a comprehensive professional analysis with the following sections:
+
+1. EXECUTIVE SUMMARY (2-3 sentences overview of the candidate)
+
+2. SCORE ANALYSIS (Explain why the candidate received their match scores)
+
+3. KEY STRENGTHS (3-5 bullet points highlighting the candidate's strongest qualifications)
+
+4. AREAS FOR CONSIDERATION (2-3 potential gaps or concerns)
+
+5. INTERVIEW RECOMMENDATIONS (2-3 specific areas to probe during an interview)
+
+6. FINAL RECOMMENDATION (Overall assessment of candidate fit for the position)
+
+Format your response with clear section headings and professional language suitable for a recruitment context."""
+
+_JSON_OUTPUT_INSTRUCTIONS = """Provide a comprehensive professional analysis in language suitable for a recruitment context.
+Respond with only a JSON object with these string fields:
+
+{
+  "executive_summary": "2-3 sentences overview of the candidate",
+  "score_analysis": "Explanation of why the candidate received their match scores",
+  "key_strengths": "3-5 bullet points highlighting the candidate's strongest qualifications",
+  "areas_for_consideration": "2-3 potential gaps or concerns",
+  "interview_recommendations": "2-3 specific areas to probe during an interview",
+  "final_recommendation": "Overall assessment of candidate fit for the position"
+}"""
 
 def validate_request(event):
     """Validate the incoming request"""
@@ -30,20 +95,59 @@ def validate_request(event):
     except Exception as e:
         return False, f"Invalid JSON in request body: {str(e)}"
     
-    # Check required fields
-    required_fields = ['candidateData', 'jobInfo']
-    for field in required_fields:
-        if field not in body:
-            return False, f"Missing required field: {field}"
+    # Check required fields; a batch request sends 'candidates' instead of 'candidateData'
+    if 'jobInfo' not in body:
+        return False, "Missing required field: jobInfo"
+    if body.get('mode') == 'compare':
+        candidates = body.get('candidates')
+        if not isinstance(candidates, list) or len(candidates) < 2:
+            return False, "A comparison needs a list of at least 2 candidates"
+        if len(candidates) > COMPARE_MAX_CANDIDATES:
+            return False, f"A comparison can contain at most {COMPARE_MAX_CANDIDATES} candidates"
+    elif 'candidates' in body:
+        candidates = body['candidates']
+        if not isinstance(candidates, list) or not candidates:
+            return False, "candidates must be a non-empty list"
+        if len(candidates) > BATCH_MAX_CANDIDATES:
+            return False, f"A batch can contain at most {BATCH_MAX_CANDIDATES} candidates"
+    elif 'candidateData' not in body:
+        return False, "Missing required field: candidateData"
     
     return True, body
 
-def create_candidate_prompt(candidate_data, job_info):
-    """Create a prompt for the Bedrock model"""
-    if not isinstance(candidate_data, dict):
-        candidate_data = {}
+def format_job_requirements(job_info):
+    """Format the JOB REQUIREMENTS block of the prompt
+    
+    Batch requests format it once and pass it to create_candidate_prompt
+    for every candidate.
+    """
     if not isinstance(job_info, dict):
         job_info = {}
+    job_title = job_info.get('job_title', 'Not specified')
+    required_skills = job_info.get('required_skills', [])
+    if not isinstance(required_skills, list):
+        required_skills = []
+    required_experience = job_info.get('required_experience', 'Not specified')
+    
+    return f"""JOB REQUIREMENTS:
+Title: {job_title}
+Required skills: {', '.join(required_skills) if required_skills else 'Not specified'}
+Required experience: {required_experience} years"""
+
+def create_candidate_prompt(candidate_data, job_info, job_requirements=None, output_format='text'):
+    """Create a prompt for the Bedrock model
+    
+    Args:
+        candidate_data: Candidate profile from the request
+        job_info: Job information from the request
+        job_requirements: Pre-formatted format_job_requirements(job_info) text
+        output_format: 'text' for numbered section headings, 'json' for a
+            JSON object with the analysis_sections.STRUCTURED_FIELDS
+    """
+    if not isinstance(candidate_data, dict):
+        candidate_data = {}
+    if job_requirements is None:
+        job_requirements = format_job_requirements(job_info)
         
     personal_info = candidate_data.get('personal_info', {}) if isinstance(candidate_data, dict) else {}
     skills = candidate_data.get('skills', {}) if isinstance(candidate_data, dict) else {}
@@ -77,13 +181,6 @@ def create_candidate_prompt(candidate_data, job_info):
         if education_entries:
             education_info = '\n'.join(education_entries)
 
-    # Get values from job_info safely
-    job_title = job_info.get('job_title', 'Not specified') if isinstance(job_info, dict) else 'Not specified'
-    required_skills = job_info.get('required_skills', []) if isinstance(job_info, dict) else []
-    if not isinstance(required_skills, list):
-        required_skills = []
-    required_experience = job_info.get('required_experience', 'Not specified') if isinstance(job_info, dict) else 'Not specified'
-
     # Get values from scores safely
     overall_score = scores.get('overall', 0) if isinstance(scores, dict) else 0
     skill_match = scores.get('skill_match', scores.get('skill_coverage', 0)) if isinstance(scores, dict) else 0
@@ -101,31 +198,14 @@ Missing skills: {missing_skills_text}
 All skills: {all_skills_text}
 Education: {education_info}
 
-JOB REQUIREMENTS:
-Title: {job_title}
-Required skills: {', '.join(required_skills) if required_skills else 'Not specified'}
-Required experience: {required_experience} years
+{job_requirements}
 
 MATCH SCORES:
 Overall match: {overall_score}%
 Skill match: {skill_match}%
 Experience match: {experience_match}%
 
-Please provide a comprehensive professional analysis with the following sections:
-
-1. EXECUTIVE SUMMARY (2-3 sentences overview of the candidate)
-
-2. SCORE ANALYSIS (Explain why the candidate received their match scores)
-
-3. KEY STRENGTHS (3-5 bullet points highlighting the candidate's strongest qualifications)
-
-4. AREAS FOR CONSIDERATION (2-3 potential gaps or concerns)
-
-5. INTERVIEW RECOMMENDATIONS (2-3 specific areas to probe during an interview)
-
-6. FINAL RECOMMENDATION (Overall assessment of candidate fit for the position)
-
-Format your response with clear section headings and professional language suitable for a recruitment context.
+{_JSON_OUTPUT_INSTRUCTIONS if output_format == 'json' else _TEXT_OUTPUT_INSTRUCTIONS}
 """
 
 def create_cors_response(status_code, body):
@@ -143,88 +223,48 @@ def create_cors_response(status_code, body):
     }
 
 def parse_response(raw_text):
-    """Parse the raw model response into structured sections"""
-    sections = {
-        'executiveSummary': extract_section(raw_text, 'EXECUTIVE SUMMARY', 'SCORE ANALYSIS'),
-        'scoreAnalysis': extract_section(raw_text, 'SCORE ANALYSIS', 'KEY STRENGTHS'),
-        'keyStrengths': extract_section(raw_text, 'KEY STRENGTHS', 'AREAS FOR CONSIDERATION'),
-        'areasForConsideration': extract_section(raw_text, 'AREAS FOR CONSIDERATION', 'INTERVIEW RECOMMENDATIONS'),
-        'interviewRecommendations': extract_section(raw_text, 'INTERVIEW RECOMMENDATIONS', 'FINAL RECOMMENDATION'),
-        'finalRecommendation': extract_section(raw_text, 'FINAL RECOMMENDATION', None)
-    }
+    """Parse the raw model response into structured sections
     
+    The text is split by analysis_sections.parse_sections, which uses the
+    same parser as streamed responses. Sections the model left out come
+    back as empty strings.
+    """
+    raw_text = raw_text or ''
     return {
         'rawText': raw_text,
-        'sections': sections
+        'sections': parse_sections(raw_text)
     }
 
-def extract_section(text, start_marker, end_marker):
-    """Extract a section from the response text based on markers"""
+def parse_structured_response(raw_text):
+    """Parse a structured-JSON answer into the parse_response() shape
+    
+    The JSON object may be wrapped in prose or a code fence. When it is
+    missing or malformed the text is parsed for section headings instead,
+    so a bad answer never needs a second model call. The result's
+    'structured' flag says which parser was used; the handler moves it to
+    the response metadata.
+    """
+    raw_text = raw_text or ''
+    start, end = raw_text.find('{'), raw_text.rfind('}')
     try:
-        if not text:
-            return ""
-            
-        # Find the start marker
-        start_index = text.find(start_marker)
-        if start_index == -1:
-            # Try with numeric prefix (e.g., "1. EXECUTIVE SUMMARY")
-            for i in range(1, 7):  # Try numbers 1-6
-                alt_marker = f"{i}. {start_marker}"
-                start_index = text.find(alt_marker)
-                if start_index != -1:
-                    start_marker = alt_marker
-                    break
-                
-                # Also try with just the number and colon
-                alt_marker = f"{i}: {start_marker}"
-                start_index = text.find(alt_marker)
-                if start_index != -1:
-                    start_marker = alt_marker
-                    break
-            
-            if start_index == -1:
-                return ""
-            
-        # Get the text after the start marker
-        start_offset = start_index + len(start_marker)
-        
-        # Find the end marker if provided
-        if end_marker:
-            end_index = text.find(end_marker, start_offset)
-            
-            # Try with numeric prefix if not found
-            if end_index == -1:
-                for i in range(1, 7):  # Try numbers 1-6
-                    alt_end_marker = f"{i}. {end_marker}"
-                    end_index = text.find(alt_end_marker, start_offset)
-                    if end_index != -1:
-                        break
-                    
-                    # Also try with just the number and colon
-                    alt_end_marker = f"{i}: {end_marker}"
-                    end_index = text.find(alt_end_marker, start_offset)
-                    if end_index != -1:
-                        break
-            
-            if end_index == -1:
-                return text[start_offset:].strip()
-            
-            return text[start_offset:end_index].strip()
-        else:
-            # If no end marker, take the rest of the text
-            return text[start_offset:].strip()
-    except Exception as e:
-        logger.error(f"Error extracting section '{start_marker}': {str(e)}")
-        return ""
+        fields = json.loads(raw_text[start:end + 1]) if 0 <= start < end else None
+    except ValueError:
+        fields = None
+    if not isinstance(fields, dict):
+        logger.warning("Structured output did not parse, falling back to section headings")
+        return dict(parse_response(raw_text), structured=False)
+    
+    return {
+        'rawText': raw_text,
+        'sections': structured_sections(fields),
+        'structured': True
+    }
 
 def invoke_bedrock_model(prompt, temperature=0.5, max_gen_len=512, top_p=0.9):
     """Invoke Llama 3 model using boto3"""
     try:
-        # Create Bedrock client
-        bedrock_runtime = boto3.client(
-            service_name='bedrock-runtime',
-            region_name=os.environ.get('REACT_APP_AWS_REGION', 'us-east-1')
-        )
+        # Reuse the container-wide Bedrock client
+        bedrock_runtime = get_client('bedrock-runtime', BEDROCK_REGION)
         
         # Get model ID from environment variable or use default
         model_id = os.environ.get('REACT_APP_BEDROCK_MODEL_ID', DEFAULT_MODEL_ID)
@@ -263,6 +303,669 @@ def invoke_bedrock_model(prompt, temperature=0.5, max_gen_len=512, top_p=0.9):
         logger.error(f"Error invoking Bedrock model: {str(e)}")
         raise
 
+def get_analysis_cache_key(prompt, model_id, temperature, max_gen_len, top_p):
+    """Cache key for an analysis: SHA-256 of the model, sampling parameters and prompt
+    
+    The prompt is create_candidate_prompt's normalised rendering of the
+    inputs, so fields it does not use (email, phone, address) and
+    missing-versus-empty values do not change the key.
+    """
+    canonical = json.dumps({
+        'model': model_id,
+        'temperature': round(float(temperature), 4),
+        'max_gen_len': int(max_gen_len),
+        'top_p': round(float(top_p), 4),
+        'prompt': ' '.join(prompt.split())
+    }, sort_keys=True)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+def lookup_analysis(cache_key):
+    """Return (analysis_result, status) from the analysis caches
+    
+    status is 'hit' (local), 'l2_hit' (DynamoDB tier) or 'miss'; the
+    result is a private copy, or None on a miss.
+    """
+    found = lookup_analyses([cache_key]).get(cache_key)
+    if found is None:
+        return None, 'miss'
+    logger.info(f"Using cached candidate analysis ({found[1]})")
+    return found
+
+def lookup_analyses(cache_keys):
+    """Return {cache_key: (analysis_result, status)} for every cached key
+    
+    Local misses are looked up in the DynamoDB tier with one BatchGetItem
+    call; keys found in neither cache are omitted. status is 'hit' or
+    'l2_hit' and each result is a private copy.
+    """
+    found = {}
+    l2_keys = []
+    for cache_key in dict.fromkeys(cache_keys):
+        cached = _analysis_cache.get(cache_key)
+        if cached is None:
+            l2_keys.append(('candidate_analysis', cache_key))
+        else:
+            found[cache_key] = (copy.deepcopy(cached), 'hit')
+    for (_, cache_key), l2_data in _l2_cache.get_many(l2_keys).items():
+        cached = json.loads(l2_data)
+        _analysis_cache.put(cache_key, cached)
+        found[cache_key] = (copy.deepcopy(cached), 'l2_hit')
+    return found
+
+def store_analysis(cache_key, analysis_result):
+    """Cache an analysis (single or comparative) unless the model returned nothing usable"""
+    sections = analysis_result.get('sections') or {}
+    ranking = analysis_result.get('ranking') or []
+    if not any(sections.values()) and not any(any(entry['sections'].values()) for entry in ranking):
+        return
+    _analysis_cache.put(cache_key, copy.deepcopy(analysis_result))
+    _l2_cache.put('candidate_analysis', cache_key, json.dumps(analysis_result).encode('utf-8'), ANALYSIS_CACHE_TTL_SECONDS)
+
+def analyze_candidate(prompt, temperature, max_gen_len, top_p, use_cache=True, output_format='text'):
+    """Return (analysis_result, bedrock_processing_time_ms, cache_status) for a prompt
+    
+    cache_status is 'hit', 'l2_hit', 'miss', or 'bypass' when use_cache is
+    False; bypassed requests still refresh the cache. output_format must
+    match the one the prompt was created with.
+    """
+    model_id = os.environ.get('REACT_APP_BEDROCK_MODEL_ID', DEFAULT_MODEL_ID)
+    cache_key = get_analysis_cache_key(prompt, model_id, temperature, max_gen_len, top_p)
+    if use_cache:
+        analysis_result, cache_status = lookup_analysis(cache_key)
+        if analysis_result is not None:
+            return analysis_result, 0, cache_status
+    else:
+        cache_status = 'bypass'
+    
+    bedrock_start_time = time.time()
+    response_text = invoke_bedrock_model(
+        prompt=prompt,
+        temperature=temperature,
+        max_gen_len=max_gen_len,
+        top_p=top_p
+    )
+    bedrock_processing_time_ms = int((time.time() - bedrock_start_time) * 1000)
+    
+    if output_format == 'json':
+        analysis_result = parse_structured_response(response_text)
+    else:
+        analysis_result = parse_response(response_text)
+    store_analysis(cache_key, analysis_result)
+    return analysis_result, bedrock_processing_time_ms, cache_status
+
+def invoke_bedrock_model_stream(prompt, temperature=0.5, max_gen_len=512, top_p=0.9):
+    """Invoke Llama 3 with response streaming, yielding text as it is generated"""
+    bedrock_runtime = get_client('bedrock-runtime', BEDROCK_REGION)
+    model_id = os.environ.get('REACT_APP_BEDROCK_MODEL_ID', DEFAULT_MODEL_ID)
+    logger.info(f"Invoking Bedrock model with response stream: {model_id}")
+    
+    response = bedrock_runtime.invoke_model_with_response_stream(
+        modelId=model_id,
+        body=json.dumps({
+            "prompt": prompt,
+            "max_gen_len": max_gen_len,
+            "temperature": temperature,
+            "top_p": top_p
+        })
+    )
+    for event in response['body']:
+        chunk = event.get('chunk')
+        if not chunk:
+            continue
+        generation = json.loads(chunk['bytes']).get('generation', '')
+        if generation:
+            yield generation
+
+def stream_candidate_analysis(prompt, emit, temperature=0.5, max_gen_len=512, top_p=0.9, use_cache=True):
+    """Generate the analysis with response streaming, emitting sections early
+    
+    emit is called with {'type': 'section', 'section': key, 'text': ...}
+    as soon as each section is complete. A cached analysis is emitted
+    section by section straight away.
+    
+    Returns:
+        (analysis_result, time_to_first_token_ms, bedrock_processing_time_ms,
+        cache_status), where analysis_result has the same shape as
+        parse_response() and cache_status is as for analyze_candidate()
+    """
+    model_id = os.environ.get('REACT_APP_BEDROCK_MODEL_ID', DEFAULT_MODEL_ID)
+    cache_key = get_analysis_cache_key(prompt, model_id, temperature, max_gen_len, top_p)
+    cache_status = 'bypass'
+    if use_cache:
+        analysis_result, cache_status = lookup_analysis(cache_key)
+        if analysis_result is not None:
+            for key, _ in ANALYSIS_SECTIONS:
+                if analysis_result['sections'].get(key):
+                    emit({'type': 'section', 'section': key, 'text': analysis_result['sections'][key]})
+            return analysis_result, 0, 0, cache_status
+    
+    parser = SectionStreamParser()
+    sections = {}
+    bedrock_start_time = time.time()
+    first_token_time = None
+    for text in invoke_bedrock_model_stream(prompt, temperature, max_gen_len, top_p):
+        if first_token_time is None:
+            first_token_time = time.time()
+        for key, section_text in parser.feed(text):
+            sections[key] = section_text
+            emit({'type': 'section', 'section': key, 'text': section_text})
+    for key, section_text in parser.finish():
+        sections[key] = section_text
+        emit({'type': 'section', 'section': key, 'text': section_text})
+    bedrock_end_time = time.time()
+    
+    time_to_first_token_ms = int(((first_token_time or bedrock_end_time) - bedrock_start_time) * 1000)
+    bedrock_processing_time_ms = int((bedrock_end_time - bedrock_start_time) * 1000)
+    analysis_result = {
+        'rawText': parser.text,
+        'sections': {key: sections.get(key, '') for key, _ in ANALYSIS_SECTIONS}
+    }
+    store_analysis(cache_key, analysis_result)
+    return analysis_result, time_to_first_token_ms, bedrock_processing_time_ms, cache_status
+
+def is_stream_request(event, body) -> bool:
+    """Streaming is requested with "stream": true in the body or ?stream=true,
+    and is implied for API Gateway WebSocket connections"""
+    if (event.get('requestContext') or {}).get('connectionId'):
+        return True
+    query_params = event.get('queryStringParameters') or {}
+    return parse_flag(query_params.get('stream', body.get('stream', False)))
+
+def parse_flag(value) -> bool:
+    """Read a boolean request flag; strings count as true only for 'true', '1' or 'yes'"""
+    if isinstance(value, str):
+        return value.lower() in ('true', '1', 'yes')
+    return bool(value)
+
+def get_api_region(request_context) -> str:
+    """Region of the API Gateway API that sent the event
+    
+    Read from the execute-api host name; custom domains fall back to the
+    Lambda's own region, where API Gateway integrations normally live.
+    """
+    match = _EXECUTE_API_HOST_PATTERN.match(request_context.get('domainName', ''))
+    if match:
+        return match.group(1)
+    return os.environ.get('AWS_REGION', BEDROCK_REGION)
+
+def create_websocket_emitter(event):
+    """Return an emit function that pushes events to the caller's WebSocket connection"""
+    request_context = event['requestContext']
+    endpoint_url = f"https://{request_context['domainName']}/{request_context['stage']}"
+    # The management API is signed for the API's region, which need not be Bedrock's
+    client = get_client('apigatewaymanagementapi', get_api_region(request_context), endpoint_url=endpoint_url)
+    connection_id = request_context['connectionId']
+    
+    def emit(stream_event):
+        client.post_to_connection(ConnectionId=connection_id, Data=json.dumps(stream_event).encode('utf-8'))
+    return emit
+
+def create_event_stream_response(events, status_code=200):
+    """Create an API response carrying events as text/event-stream frames"""
+    response = create_cors_response(status_code, {})
+    response['headers']['Content-Type'] = 'text/event-stream'
+    response['headers']['Cache-Control'] = 'no-cache'
+    response['body'] = ''.join(
+        f"event: {stream_event['type']}\ndata: {json.dumps(stream_event)}\n\n" for stream_event in events
+    )
+    return response
+
+def get_executor():
+    """Return the container-wide thread pool for batch requests, creating it on first use"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=BATCH_MAX_WORKERS, thread_name_prefix='analysis-worker')
+    return _executor
+
+def retire_executor(executor):
+    """Replace a pool whose workers are still busy with abandoned calls
+    
+    Calls already running cannot be interrupted, so they would hold the
+    shared workers through the next invocations. The pool stops taking work,
+    anything still queued on it is cancelled, and the next batch creates a
+    new one; the old threads exit once their calls return.
+    """
+    global _executor
+    if _executor is executor:
+        _executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+def get_candidate_id(candidate_data, index):
+    """Identify a batch item in the response: its 'id', else the candidate's email, else its position"""
+    if isinstance(candidate_data, dict):
+        personal_info = candidate_data.get('personal_info')
+        email = personal_info.get('email') if isinstance(personal_info, dict) else None
+        return candidate_data.get('id') or candidate_data.get('resume_id') or email or str(index)
+    return str(index)
+
+def analyze_batch(candidates, job_info, temperature, max_gen_len, top_p, deadline, use_cache=True,
+                  output_format='text'):
+    """Analyse a shortlist of candidates for one job concurrently
+    
+    At most BATCH_MAX_WORKERS Bedrock calls run at once. Each candidate has
+    BATCH_ITEM_TIMEOUT_SECONDS from the start of its call, and nothing is
+    waited on past deadline (epoch seconds). A candidate that fails or runs
+    out of time gets an error entry; the others are still returned. If a
+    timed-out call is still running, the pool is retired so the call cannot
+    starve later batches. Candidates whose analysis is cached are answered
+    from one batched cache lookup without using a worker.
+    
+    Returns:
+        List of per-candidate results, in request order
+    """
+    job_requirements = format_job_requirements(job_info)
+    executor = get_executor()
+    model_id = os.environ.get('REACT_APP_BEDROCK_MODEL_ID', DEFAULT_MODEL_ID)
+    
+    prompts = [create_candidate_prompt(candidate_data, job_info, job_requirements, output_format)
+               for candidate_data in candidates]
+    cache_keys = [get_analysis_cache_key(prompt, model_id, temperature, max_gen_len, top_p) for prompt in prompts]
+    # One batched cache lookup up front; cached candidates never reach the pool
+    cached = lookup_analyses(cache_keys) if use_cache else {}
+    
+    results = [None] * len(candidates)
+    started = {}
+    
+    def run(index):
+        started[index] = time.time()
+        # The caches were already checked, but the result still refreshes them
+        return analyze_candidate(prompts[index], temperature, max_gen_len, top_p, False, output_format)
+    
+    futures = {}
+    for index, cache_key in enumerate(cache_keys):
+        if cache_key in cached:
+            # Candidates with the same prompt share one lookup result
+            analysis_result = dict(cached[cache_key][0])
+            results[index] = {
+                'index': index,
+                'candidateId': get_candidate_id(candidates[index], index),
+                'success': True,
+                'data': analysis_result,
+                'structured': analysis_result.pop('structured', False),
+                'cached': True,
+                'bedrock_processing_time_ms': 0
+            }
+        else:
+            futures[index] = executor.submit(run, index)
+    pending = set(futures)
+    abandoned = False
+    
+    while pending:
+        now = time.time()
+        # Wake up at the earliest item deadline, or the batch deadline
+        wake_at = deadline
+        for index in pending:
+            if index in started:
+                wake_at = min(wake_at, started[index] + BATCH_ITEM_TIMEOUT_SECONDS)
+        if now < wake_at:
+            wait([futures[index] for index in pending], timeout=wake_at - now, return_when=FIRST_COMPLETED)
+        now = time.time()
+        
+        for index in list(pending):
+            future = futures[index]
+            candidate_id = get_candidate_id(candidates[index], index)
+            if future.done():
+                pending.discard(index)
+                try:
+                    analysis_result, bedrock_processing_time_ms, cache_status = future.result()
+                    results[index] = {
+                        'index': index,
+                        'candidateId': candidate_id,
+                        'success': True,
+                        'data': analysis_result,
+                        'structured': analysis_result.pop('structured', False),
+                        'cached': cache_status in ('hit', 'l2_hit'),
+                        'bedrock_processing_time_ms': bedrock_processing_time_ms
+                    }
+                except Exception as e:
+                    logger.error(f"Error analyzing batch candidate {candidate_id}: {str(e)}")
+                    results[index] = {
+                        'index': index,
+                        'candidateId': candidate_id,
+                        'success': False,
+                        'data': None,
+                        'error': str(e)
+                    }
+            elif now >= deadline or (index in started and now >= started[index] + BATCH_ITEM_TIMEOUT_SECONDS):
+                # A call already in flight cannot be interrupted; its result is dropped
+                if not future.cancel():
+                    abandoned = True
+                pending.discard(index)
+                results[index] = {
+                    'index': index,
+                    'candidateId': candidate_id,
+                    'success': False,
+                    'data': None,
+                    'error': 'Timed out' if index in started else 'Not started before the request deadline'
+                }
+    
+    if abandoned:
+        logger.warning("Batch abandoned running Bedrock calls; replacing the worker pool")
+        retire_executor(executor)
+    return results
+
+def handle_batch_request(body, job_info, temperature, max_gen_len, top_p, use_cache, output_format, start_time, context):
+    """Analyse every candidate in body['candidates'] against one job"""
+    deadline = start_time + BATCH_ITEM_TIMEOUT_SECONDS * len(body['candidates'])
+    if context is not None and hasattr(context, 'get_remaining_time_in_millis'):
+        deadline = min(deadline, time.time() + context.get_remaining_time_in_millis() / 1000 - BATCH_DEADLINE_MARGIN_SECONDS)
+    
+    results = analyze_batch(body['candidates'], job_info, temperature, max_gen_len, top_p, deadline, use_cache,
+                            output_format)
+    succeeded = sum(1 for result in results if result['success'])
+    cached = sum(1 for result in results if result.get('cached'))
+    
+    return create_cors_response(200 if succeeded else 502, {
+        'success': succeeded > 0,
+        'message': f"Analyzed {succeeded} of {len(results)} candidate profiles",
+        'data': {'results': results},
+        'metadata': {
+            'model': os.environ.get('REACT_APP_BEDROCK_MODEL_ID', DEFAULT_MODEL_ID),
+            'parameters': {
+                'temperature': temperature,
+                'max_gen_len': max_gen_len,
+                'top_p': top_p
+            },
+            'batch': {
+                'total': len(results),
+                'succeeded': succeeded,
+                'failed': len(results) - succeeded,
+                'cached': cached,
+                'max_workers': BATCH_MAX_WORKERS,
+                'item_timeout_seconds': BATCH_ITEM_TIMEOUT_SECONDS
+            },
+            'processing_time_ms': int((time.time() - start_time) * 1000)
+        }
+    })
+
+# Per-candidate fields of a comparative analysis: response key and label
+COMPARISON_FIELDS = [
+    ('summary', 'SUMMARY'),
+    ('keyStrengths', 'STRENGTHS'),
+    ('areasForConsideration', 'CONSIDERATIONS'),
+    ('recommendation', 'RECOMMENDATION')
+]
+_COMPARISON_FIELD_KEYS = {label: key for key, label in COMPARISON_FIELDS}
+# Every label a comparative answer is split on, each at the start of a line.
+# A candidate block starts with a header line of its own, upper case as in
+# the prompt ("CANDIDATE 2", "**CANDIDATE 2: Jane Doe**"), so prose such as
+# "Candidate 1 is weaker than..." does not open a block.
+_COMPARISON_TOKEN_PATTERN = re.compile(
+    r'(?im)^[ \t#*]*(?:'
+    r'(?P<ranking>RANKING)[ \t*]*:'
+    r'|(?P<overall>OVERALL COMPARISON)[ \t*]*:?'
+    r'|(?-i:CANDIDATE)[ \t]+#?(?P<candidate>\d+)[ \t*]*(?:[:(\u2013-][^\n]*)?$'
+    r'|(?P<field>' + '|'.join(label for _, label in COMPARISON_FIELDS) + r')[ \t*]*:'
+    r')'
+)
+# "Candidate 3" in a ranking, and the "1." of a numbered ranking list
+_RANKED_CANDIDATE_PATTERN = re.compile(r'(?i)\bcandidate[ \t]+#?(\d+)')
+_LIST_ORDINAL_PATTERN = re.compile(r'(?m)^[ \t*-]*\d+[.)][ \t]+')
+
+def format_candidate_summary(candidate_data, number):
+    """Format the compact block describing one candidate of a comparison"""
+    if not isinstance(candidate_data, dict):
+        candidate_data = {}
+    personal_info = candidate_data.get('personal_info') if isinstance(candidate_data.get('personal_info'), dict) else {}
+    skills = candidate_data.get('skills') if isinstance(candidate_data.get('skills'), dict) else {}
+    experience = candidate_data.get('experience') if isinstance(candidate_data.get('experience'), dict) else {}
+    scores = candidate_data.get('scores') if isinstance(candidate_data.get('scores'), dict) else {}
+    positions = candidate_data.get('positions') if isinstance(candidate_data.get('positions'), list) else []
+    education = candidate_data.get('education') if isinstance(candidate_data.get('education'), list) else []
+    
+    education_entries = []
+    for edu in education:
+        if isinstance(edu, dict):
+            education_entries.append(f"{edu.get('degree', '')} ({edu.get('year', 'N/A')})")
+        elif isinstance(edu, str):
+            education_entries.append(edu)
+    
+    return f"""CANDIDATE {number}: {personal_info.get('name', 'Not provided')}
+Current position: {positions[0] if positions else 'Not provided'} | Experience: {experience.get('years', 'Not provided')} years | Education: {'; '.join(education_entries) or 'Not provided'}
+Matching skills: {', '.join(skills.get('matching') or []) or 'None'} | Missing skills: {', '.join(skills.get('missing') or []) or 'None'}
+Scores: overall {scores.get('overall', 0)}%, skills {scores.get('skill_match', scores.get('skill_coverage', 0))}%, experience {scores.get('experience_match', 0)}%"""
+
+def create_comparison_prompt(candidates, job_info):
+    """Create one prompt that ranks every candidate against the shared job requirements"""
+    candidate_blocks = '\n\n'.join(
+        format_candidate_summary(candidate_data, number)
+        for number, candidate_data in enumerate(candidates, start=1)
+    )
+    return f"""
+You are an expert AI recruiter assistant comparing a shortlist of candidates for one position.
+
+{format_job_requirements(job_info)}
+
+{candidate_blocks}
+
+Compare the candidates against the job requirements and rank them from strongest to weakest fit.
+Respond in exactly this format:
+
+RANKING: (candidate numbers from strongest to weakest fit, comma-separated)
+
+Then, for each candidate in ranked order:
+
+CANDIDATE (number)
+SUMMARY: (1-2 sentences on the candidate's fit)
+STRENGTHS: (2-3 strongest qualifications for this role)
+CONSIDERATIONS: (1-2 gaps or concerns)
+RECOMMENDATION: (Advance, Hold or Decline, with a one-sentence reason)
+
+OVERALL COMPARISON: (2-3 sentences on how the shortlist compares)
+"""
+
+def parse_comparison_response(raw_text, candidates):
+    """Split a comparative answer into ranked per-candidate sections
+    
+    The text is scanned once for the labels the prompt asks for. The ranking
+    comes from the "Candidate N" mentions in the RANKING section (or its bare
+    numbers, list ordinals aside), then from the order of the candidate
+    blocks; candidates the model skipped are ranked last by overall score.
+    """
+    ranking_text = ''
+    overall_text = ''
+    sections_by_number = {}
+    current = None  # (number or None, field key, or 'ranking'/'overall')
+    position = 0
+    
+    def close(end):
+        nonlocal ranking_text, overall_text
+        if current is None:
+            return
+        number, key = current
+        value = raw_text[position:end].strip()
+        if key == 'ranking':
+            ranking_text = value
+        elif key == 'overall':
+            overall_text = value
+        elif number is not None and key is not None:
+            sections_by_number[number][key] = value
+    
+    for match in _COMPARISON_TOKEN_PATTERN.finditer(raw_text):
+        close(match.start())
+        position = match.end()
+        if match.group('ranking'):
+            current = (None, 'ranking')
+        elif match.group('overall'):
+            current = (None, 'overall')
+        elif match.group('candidate'):
+            number = int(match.group('candidate'))
+            if 1 <= number <= len(candidates):
+                sections_by_number.setdefault(number, {})
+                current = (number, None)
+            else:
+                current = None
+        elif current is not None and current[0] is not None:
+            current = (current[0], _COMPARISON_FIELD_KEYS[match.group('field').upper()])
+    close(len(raw_text))
+    
+    ranked = _RANKED_CANDIDATE_PATTERN.findall(ranking_text)
+    if not ranked:
+        ranked = re.findall(r'\d+', _LIST_ORDINAL_PATTERN.sub('', ranking_text))
+    order = []
+    for number in [int(n) for n in ranked] + list(sections_by_number):
+        if 1 <= number <= len(candidates) and number not in order:
+            order.append(number)
+    
+    def overall_score(number):
+        candidate_data = candidates[number - 1]
+        scores = candidate_data.get('scores') if isinstance(candidate_data, dict) else None
+        try:
+            return float(scores.get('overall', 0)) if isinstance(scores, dict) else 0.0
+        except (TypeError, ValueError):
+            return 0.0
+    
+    remaining = [number for number in range(1, len(candidates) + 1) if number not in order]
+    order.extend(sorted(remaining, key=overall_score, reverse=True))
+    
+    ranking = []
+    for rank, number in enumerate(order, start=1):
+        candidate_data = candidates[number - 1]
+        personal_info = candidate_data.get('personal_info') if isinstance(candidate_data, dict) else None
+        sections = sections_by_number.get(number, {})
+        ranking.append({
+            'rank': rank,
+            'index': number - 1,
+            'candidateId': get_candidate_id(candidate_data, number - 1),
+            'name': personal_info.get('name', 'Not provided') if isinstance(personal_info, dict) else 'Not provided',
+            'sections': {key: sections.get(key, '') for key, _ in COMPARISON_FIELDS}
+        })
+    
+    return {
+        'rawText': raw_text,
+        'ranking': ranking,
+        'overallComparison': overall_text
+    }
+
+def handle_compare_request(body, job_info, temperature, max_gen_len, top_p, use_cache, start_time):
+    """Rank body['candidates'] against one job with a single model call
+    
+    max_gen_len is None when the request did not set it; the budget then
+    grows with the number of candidates.
+    """
+    candidates = body['candidates']
+    if max_gen_len is None:
+        max_gen_len = min(COMPARE_MAX_GEN_LEN, COMPARE_BASE_GEN_LEN + COMPARE_GEN_LEN_PER_CANDIDATE * len(candidates))
+    prompt = create_comparison_prompt(candidates, job_info)
+    model_id = os.environ.get('REACT_APP_BEDROCK_MODEL_ID', DEFAULT_MODEL_ID)
+    
+    cache_key = get_analysis_cache_key(prompt, model_id, temperature, max_gen_len, top_p)
+    analysis_result, cache_status = lookup_analysis(cache_key) if use_cache else (None, 'bypass')
+    bedrock_processing_time_ms = 0
+    if analysis_result is None:
+        bedrock_start_time = time.time()
+        response_text = invoke_bedrock_model(
+            prompt=prompt,
+            temperature=temperature,
+            max_gen_len=max_gen_len,
+            top_p=top_p
+        )
+        bedrock_processing_time_ms = int((time.time() - bedrock_start_time) * 1000)
+        analysis_result = parse_comparison_response(response_text, candidates)
+        store_analysis(cache_key, analysis_result)
+    
+    return create_cors_response(200, {
+        'success': True,
+        'message': f"Successfully compared {len(candidates)} candidate profiles",
+        'data': analysis_result,
+        'metadata': {
+            'model': model_id,
+            'parameters': {
+                'temperature': temperature,
+                'max_gen_len': max_gen_len,
+                'top_p': top_p
+            },
+            'comparison': {
+                'candidates': len(candidates),
+                'prompt_chars': len(prompt)
+            },
+            'cached': cache_status in ('hit', 'l2_hit'),
+            'cache_status': cache_status,
+            'processing_time_ms': int((time.time() - start_time) * 1000),
+            'bedrock_processing_time_ms': bedrock_processing_time_ms
+        }
+    })
+
+@before_snapshot
+def prepare_snapshot():
+    """Load the Bedrock service model before the SnapStart snapshot"""
+    get_client('bedrock-runtime', BEDROCK_REGION)
+
+@after_restore
+def restore_from_snapshot():
+    """Drop clients holding snapshotted credentials and sockets"""
+    reseed_random()
+    reset_clients()
+
+def handle_stream_request(event, prompt, temperature, max_gen_len, top_p, use_cache, start_time):
+    """Run a streaming analysis and deliver its events
+    
+    Only an API Gateway WebSocket connection is streamed: each section is
+    pushed the moment it is complete. REST invocations get the same events
+    as a text/event-stream body, but API Gateway and the Python runtime
+    buffer it, so it arrives in one piece; the complete event says so with
+    'buffered': true.
+    
+    Every stream ends with a 'complete' event, or with an 'error' event if
+    the analysis failed part way; sections already sent stay valid.
+    """
+    websocket = bool((event.get('requestContext') or {}).get('connectionId'))
+    events = []
+    emit = create_websocket_emitter(event) if websocket else events.append
+    if not websocket:
+        logger.info("Stream requested over REST; events are returned buffered in one response")
+    
+    try:
+        analysis_result, time_to_first_token_ms, bedrock_processing_time_ms, cache_status = stream_candidate_analysis(
+            prompt,
+            emit,
+            temperature=temperature,
+            max_gen_len=max_gen_len,
+            top_p=top_p,
+            use_cache=use_cache
+        )
+    except Exception as e:
+        logger.error(f"Error streaming candidate analysis: {str(e)}")
+        try:
+            emit({
+                'type': 'error',
+                'success': False,
+                'message': f"Server error: {str(e)}",
+                'data': None
+            })
+        except Exception as emit_error:
+            # The connection itself may be what failed
+            logger.error(f"Error sending stream error event: {str(emit_error)}")
+        if websocket:
+            return {'statusCode': 502}
+        return create_event_stream_response(events, 502)
+    
+    emit({
+        'type': 'complete',
+        'success': True,
+        'message': 'Successfully analyzed candidate profile',
+        'data': analysis_result,
+        'metadata': {
+            'model': os.environ.get('REACT_APP_BEDROCK_MODEL_ID', DEFAULT_MODEL_ID),
+            'parameters': {
+                'temperature': temperature,
+                'max_gen_len': max_gen_len,
+                'top_p': top_p
+            },
+            'streaming': True,
+            'buffered': not websocket,
+            'cached': cache_status in ('hit', 'l2_hit'),
+            'cache_status': cache_status,
+            'processing_time_ms': int((time.time() - start_time) * 1000),
+            'time_to_first_token_ms': time_to_first_token_ms,
+            'bedrock_processing_time_ms': bedrock_processing_time_ms
+        }
+    })
+    
+    if websocket:
+        return {'statusCode': 200}
+    return create_event_stream_response(events)
+
 def lambda_handler(event, context):
     """AWS Lambda handler function"""
     # Handle OPTIONS request for CORS
@@ -296,7 +999,6 @@ def lambda_handler(event, context):
                 'data': None
             })
             
-        candidate_data = body.get('candidateData', {})
         job_info = body.get('jobInfo', {})
         
         # Get user-specified parameters or use defaults
@@ -305,26 +1007,48 @@ def lambda_handler(event, context):
         max_gen_len = parameters.get('max_gen_len', 512) if isinstance(parameters, dict) else 512
         top_p = parameters.get('top_p', 0.9) if isinstance(parameters, dict) else 0.9
         
+        # Reproducible mode decodes greedily so cached and fresh analyses agree
+        if parse_flag(body.get('reproducible', ANALYSIS_REPRODUCIBLE)):
+            temperature, top_p = 0.0, 1.0
+        use_cache = not parse_flag(body.get('bypassCache', False))
+        # Streaming and comparisons always use section headings
+        output_format = body.get('outputFormat', 'text')
+        if output_format not in ('text', 'json'):
+            return create_cors_response(400, {
+                'success': False,
+                'message': "outputFormat must be 'text' or 'json'",
+                'data': None
+            })
+        
+        if body.get('mode') == 'compare':
+            explicit_max_gen_len = parameters.get('max_gen_len') if isinstance(parameters, dict) else None
+            return handle_compare_request(body, job_info, temperature, explicit_max_gen_len, top_p, use_cache, start_time)
+        if 'candidates' in body:
+            return handle_batch_request(body, job_info, temperature, max_gen_len, top_p, use_cache, output_format,
+                                        start_time, context)
+        
         # Create prompt for the model
-        prompt = create_candidate_prompt(candidate_data, job_info)
+        candidate_data = body.get('candidateData', {})
+        if is_stream_request(event, body):
+            prompt = create_candidate_prompt(candidate_data, job_info)
+            return handle_stream_request(event, prompt, temperature, max_gen_len, top_p, use_cache, start_time)
+        prompt = create_candidate_prompt(candidate_data, job_info, output_format=output_format)
         
-        # Invoke Bedrock model
-        bedrock_start_time = time.time()
-        response_text = invoke_bedrock_model(
-            prompt=prompt,
+        # Invoke Bedrock model, unless the analysis is cached
+        analysis_result, bedrock_processing_time_ms, cache_status = analyze_candidate(
+            prompt,
             temperature=temperature,
             max_gen_len=max_gen_len,
-            top_p=top_p
+            top_p=top_p,
+            use_cache=use_cache,
+            output_format=output_format
         )
-        bedrock_end_time = time.time()
-        
-        # Process the response
-        analysis_result = parse_response(response_text)
+        # Reported in the metadata, like the LangChain Lambda does
+        structured = analysis_result.pop('structured', False)
         
         # Calculate processing times
         end_time = time.time()
         total_processing_time_ms = int((end_time - start_time) * 1000)
-        bedrock_processing_time_ms = int((bedrock_end_time - bedrock_start_time) * 1000)
         
         # Get the model ID used
         model_id = os.environ.get('REACT_APP_BEDROCK_MODEL_ID', DEFAULT_MODEL_ID)
@@ -341,6 +1065,10 @@ def lambda_handler(event, context):
                     'max_gen_len': max_gen_len,
                     'top_p': top_p
                 },
+                'output_format': output_format,
+                'structured': structured,
+                'cached': cache_status in ('hit', 'l2_hit'),
+                'cache_status': cache_status,
                 'processing_time_ms': total_processing_time_ms,
                 'bedrock_processing_time_ms': bedrock_processing_time_ms
             }
@@ -354,4 +1082,7 @@ def lambda_handler(event, context):
             'success': False,
             'message': f"Server error: {str(e)}",
             'data': None
-        })
\ No newline at end of file
+        })
+    finally:
+        # Lambda freezes the writer thread once the response is returned
+        _l2_cache.flush(L2_CACHE_FLUSH_TIMEOUT)
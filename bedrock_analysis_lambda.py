@@ -1,10 +1,8 @@
 import json
 import os
-import boto3
 import logging
 from typing import Dict, Any, List
 import time
-import re
 
 # LangChain imports
 from langchain_aws import BedrockLLM
@@ -12,11 +10,18 @@ from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser, PydanticOutputParser
 from langchain_core.pydantic_v1 import BaseModel, Field
 from typing import Optional, List, Dict
+from analysis_sections import parse_sections, structured_sections
+from aws_clients import get_client, reset_clients
+from snapstart import before_snapshot, after_restore, reseed_random
 
 # Configure logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
+# Prompt templates are built once per container, keyed by output format
+_analysis_prompt_templates = {}
+_structured_output_parser = None
+
 # Define structured output model
 class CandidateAnalysis(BaseModel):
     executive_summary: str = Field(description="2-3 sentences overview of the candidate")
@@ -49,9 +54,7 @@ def validate_request(event):
     
     return True, body
 
-def create_analysis_prompt_template():
-    """Create a structured prompt template for the LangChain"""
-    template = """
+_CANDIDATE_CONTEXT_TEMPLATE = """
 You are an expert AI recruiter assistant analyzing a candidate profile against job requirements.
 
 CANDIDATE INFORMATION:
@@ -72,7 +75,9 @@ MATCH SCORES:
 Overall match: {overall_score}%
 Skill match: {skill_score}%
 Experience match: {experience_score}%
+"""
 
+_TEXT_OUTPUT_INSTRUCTIONS = """
 Please provide a comprehensive professional analysis with the following sections:
 
 1. EXECUTIVE SUMMARY (2-3 sentences overview of the candidate)
@@ -89,7 +94,40 @@ Please provide a comprehensive professional analysis with the following sections
 
 Format your response with clear section headings and professional language suitable for a recruitment context.
 """
-    return PromptTemplate.from_template(template)
+
+_JSON_OUTPUT_INSTRUCTIONS = """
+Provide a comprehensive professional analysis in language suitable for a recruitment context.
+Respond with the JSON object only.
+
+{format_instructions}
+"""
+
+def get_structured_output_parser():
+    """Return the cached parser that fills CandidateAnalysis from a JSON answer"""
+    global _structured_output_parser
+    if _structured_output_parser is None:
+        _structured_output_parser = PydanticOutputParser(pydantic_object=CandidateAnalysis)
+    return _structured_output_parser
+
+def create_analysis_prompt_template(output_format='text'):
+    """Create a structured prompt template for the LangChain
+    
+    'text' asks for the six numbered section headings; 'json' asks for a
+    JSON object matching CandidateAnalysis.
+    """
+    if output_format == 'json':
+        return PromptTemplate.from_template(_CANDIDATE_CONTEXT_TEMPLATE + _JSON_OUTPUT_INSTRUCTIONS).partial(
+            format_instructions=get_structured_output_parser().get_format_instructions()
+        )
+    return PromptTemplate.from_template(_CANDIDATE_CONTEXT_TEMPLATE + _TEXT_OUTPUT_INSTRUCTIONS)
+
+def get_analysis_prompt_template(output_format='text'):
+    """Return the cached analysis prompt template for an output format"""
+    template = _analysis_prompt_templates.get(output_format)
+    if template is None:
+        template = create_analysis_prompt_template(output_format)
+        _analysis_prompt_templates[output_format] = template
+    return template
 
 def create_cors_response(status_code, body):
     """Create a standardized API response with CORS headers"""
@@ -104,73 +142,51 @@ def create_cors_response(status_code, body):
     }
 
 def parse_langchain_response(raw_text):
-    """Parse the raw LangChain response into structured sections"""
-    sections = {
-        'executiveSummary': extract_section(raw_text, 'EXECUTIVE SUMMARY', 'SCORE ANALYSIS'),
-        'scoreAnalysis': extract_section(raw_text, 'SCORE ANALYSIS', 'KEY STRENGTHS'),
-        'keyStrengths': extract_section(raw_text, 'KEY STRENGTHS', 'AREAS FOR CONSIDERATION'),
-        'areasForConsideration': extract_section(raw_text, 'AREAS FOR CONSIDERATION', 'INTERVIEW RECOMMENDATIONS'),
-        'interviewRecommendations': extract_section(raw_text, 'INTERVIEW RECOMMENDATIONS', 'FINAL RECOMMENDATION'),
-        'finalRecommendation': extract_section(raw_text, 'FINAL RECOMMENDATION', None)
-    }
+    """Parse the raw LangChain response into structured sections
     
+    The text is split by analysis_sections.parse_sections, the parser the
+    boto3 analysis Lambda uses too. Sections the model left out come back
+    as empty strings.
+    """
+    raw_text = raw_text or ''
     return {
         'rawText': raw_text,
-        'sections': sections
+        'sections': parse_sections(raw_text)
     }
 
-def extract_section(text, start_marker, end_marker):
-    """Extract a section from the response text based on markers"""
+def parse_structured_response(raw_text):
+    """Fill CandidateAnalysis from a JSON answer
+    
+    Falls back to the heading parser when the model did not return valid
+    JSON, so a malformed answer never needs a second model call.
+    
+    Returns:
+        (analysis_result, structured) where structured says whether the
+        JSON was used
+    """
     try:
-        # Find the start marker
-        start_index = text.find(start_marker)
-        if start_index == -1:
-            # Try with different formats like "1." or "• "
-            number_pattern = fr"\d+\.\s*{start_marker}"
-            bullet_pattern = fr"•\s*{start_marker}"
-            
-            number_match = re.search(number_pattern, text)
-            bullet_match = re.search(bullet_pattern, text)
-            
-            if number_match:
-                start_index = number_match.start()
-            elif bullet_match:
-                start_index = bullet_match.start()
-            else:
-                return ""
-        
-        # Get the text after the start marker
-        start_offset = start_index + len(start_marker)
-        
-        # Find the end marker if provided
-        if end_marker:
-            end_index = text.find(end_marker, start_offset)
-            if end_index == -1:
-                # Try with different formats
-                number_pattern = fr"\d+\.\s*{end_marker}"
-                bullet_pattern = fr"•\s*{end_marker}"
-                
-                number_match = re.search(number_pattern, text[start_offset:])
-                bullet_match = re.search(bullet_pattern, text[start_offset:])
-                
-                if number_match:
-                    end_index = start_offset + number_match.start()
-                elif bullet_match:
-                    end_index = start_offset + bullet_match.start()
-                else:
-                    # If end marker not found, take the rest of the text
-                    content = text[start_offset:].strip()
-                    return content
-            
-            content = text[start_offset:end_index].strip()
-        else:
-            # If no end marker, take the rest of the text
-            content = text[start_offset:].strip()
-        
-        return content
+        analysis = get_structured_output_parser().parse(raw_text)
     except Exception as e:
-        logger.error(f"Error extracting section '{start_marker}': {str(e)}")
-        return ""
+        logger.warning(f"Structured output did not parse, falling back to section headings: {str(e)}")
+        return parse_langchain_response(raw_text), False
+    
+    return {
+        'rawText': raw_text,
+        'sections': structured_sections(analysis.dict())
+    }, True
+
+@before_snapshot
+def prepare_snapshot():
+    """Build the prompt templates and load the Bedrock model before the snapshot"""
+    get_analysis_prompt_template('text')
+    get_analysis_prompt_template('json')
+    get_client('bedrock-runtime', os.environ.get('AWS_REGION', 'us-east-1'))
+
+@after_restore
+def restore_from_snapshot():
+    """Drop clients holding snapshotted credentials and sockets"""
+    reseed_random()
+    reset_clients()
 
 def lambda_handler(event, context):
     """AWS Lambda handler function"""
@@ -192,6 +208,13 @@ def lambda_handler(event, context):
         job_info = body.get('jobInfo', {})
         model_id = body.get('modelId', os.environ.get('DEFAULT_MODEL_ID', 'meta.llama3-70b-instruct-v1:0'))
         model_parameters = body.get('parameters', {})
+        output_format = body.get('outputFormat', 'text')
+        if output_format not in ('text', 'json'):
+            return create_cors_response(400, {
+                'success': False,
+                'message': "outputFormat must be 'text' or 'json'",
+                'data': None
+            })
         
         # Extract candidate information
         personal_info = candidate_data.get('personal_info', {})
@@ -227,7 +250,7 @@ def lambda_handler(event, context):
                 education_info = '\n'.join(education_entries)
         
         # Create LangChain components
-        prompt_template = create_analysis_prompt_template()
+        prompt_template = get_analysis_prompt_template(output_format)
         
         # Initialize the BedrockLLM with the selected model and parameters
         llm_params = {}
@@ -252,10 +275,12 @@ def lambda_handler(event, context):
                 'topP': model_parameters.get('top_p', 0.9)
             }
         
-        # Create Bedrock LLM object
+        # Create Bedrock LLM object on top of the container-wide client
+        region = os.environ.get('AWS_REGION', 'us-east-1')
         bedrock_llm = BedrockLLM(
+            client=get_client('bedrock-runtime', region),
             model_id=model_id,
-            region_name=os.environ.get('AWS_REGION', 'us-east-1'),
+            region_name=region,
             model_kwargs=llm_params
         )
         
@@ -284,7 +309,11 @@ def lambda_handler(event, context):
         bedrock_end_time = time.time()
         
         # Process the response
-        analysis_result = parse_langchain_response(response_text)
+        structured = False
+        if output_format == 'json':
+            analysis_result, structured = parse_structured_response(response_text)
+        else:
+            analysis_result = parse_langchain_response(response_text)
         
         # Calculate processing times
         end_time = time.time()
@@ -299,6 +328,8 @@ def lambda_handler(event, context):
             'metadata': {
                 'model': model_id,
                 'parameters': model_parameters,
+                'output_format': output_format,
+                'structured': structured,
                 'processing_time_ms': total_processing_time_ms,
                 'bedrock_processing_time_ms': bedrock_processing_time_ms
             }
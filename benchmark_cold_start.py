@@ -0,0 +1,471 @@
+#!/usr/bin/env python
+"""
+Cold-start benchmark for the Lambda handlers
+
+Runs each handler in a fresh interpreter many times against local stand-ins
+for OpenSearch, Bedrock and PostgreSQL, and reports three phases separately
+as percentiles:
+
+1. import_ms: loading the handler module (the Lambda INIT phase for a zip
+   deployment, including module-level setup)
+2. init_ms: one-time setup paid inside the first request, i.e. first-request
+   latency minus the latency of an identical warm request (lazy imports,
+   client creation, connection handshakes)
+3. first_request_ms: latency of the first invocation on a new container
+
+The stand-ins replace only the network layer (opensearch-py's HTTP
+connection, botocore's API call and pg8000.connect), so boto3/opensearch-py
+client construction and all handler code run for real. Each stand-in
+charges a configurable handshake cost on its first use in a process and a
+per-call latency afterwards.
+
+Payloads come from test_event.json (candidate analysis, and the job info used
+to build the search request) and aws-test-event.json (PII lookup), so
+results stay comparable between builds.
+
+Usage:
+    python benchmark_cold_start.py --runs 20
+    python benchmark_cold_start.py --handler search --runs 50 --json results.json
+
+Requires boto3 to be installed locally; the other dependencies are loaded
+from deployment-package/.
+"""
+import argparse
+import importlib.abc
+import importlib.util
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+PACKAGE_DIR = os.path.join(REPO_ROOT, 'deployment-package')
+
+HANDLERS = {
+    'search': {
+        'path': os.path.join(PACKAGE_DIR, 'lambda_function.py'),
+        'module': 'lambda_function'
+    },
+    'bedrock-analysis': {
+        'path': os.path.join(REPO_ROOT, 'bedrock-analysis-lambda', 'lambda_function.py'),
+        'module': 'lambda_function'
+    },
+    'pii': {
+        'path': os.path.join(REPO_ROOT, 'lambda_function+only_pii.py'),
+        'module': 'pii_lambda_function'
+    }
+}
+
+BENCHMARK_ENV = {
+    'AWS_ACCESS_KEY_ID': 'benchmark',
+    'AWS_SECRET_ACCESS_KEY': 'benchmark',
+    'AWS_DEFAULT_REGION': 'us-east-1',
+    'AWS_REGION': 'us-east-1',
+    'OPENSEARCH_ENDPOINT': 'search-benchmark.us-east-1.es.amazonaws.com',
+    'OPENSEARCH_INDEX': 'resume-embeddings',
+    'OPENSEARCH_REGION': 'us-east-1',
+    'MODEL_ID': 'meta.llama3-70b-instruct-v1:0',
+    'BEDROCK_EMBEDDINGS_MODEL': 'amazon.titan-embed-text-v2:0',
+    'DB_HOST': 'postgres.benchmark.local',
+    'DB_PORT': '5432',
+    'DB_NAME': 'resume_parser',
+    'DB_USER': 'benchmark',
+    'DB_PASSWORD': 'benchmark'
+}
+
+SAMPLE_RESUME_IDS = [
+    '123e4567-e89b-12d3-a456-426614174000',
+    '123e4567-e89b-12d3-a456-426614174001',
+    '123e4567-e89b-12d3-a456-426614174002',
+    '123e4567-e89b-12d3-a456-426614174003',
+    '123e4567-e89b-12d3-a456-426614174004'
+]
+
+SAMPLE_ANALYSIS = """1. EXECUTIVE SUMMARY
+Strong full stack candidate with relevant cloud experience.
+
+2. SCORE ANALYSIS
+High skill overlap, slightly below the experience requirement.
+
+3. KEY STRENGTHS
+- Python and React
+- AWS Lambda
+
+4. AREAS FOR CONSIDERATION
+- No Kubernetes experience
+
+5. INTERVIEW RECOMMENDATIONS
+- Probe container orchestration knowledge
+
+6. FINAL RECOMMENDATION
+Recommend for interview."""
+
+SAMPLE_JD_EXTRACTION = {
+    't': 'Senior Full Stack Developer',
+    'exp': 5,
+    'req': ['Python', 'React', 'AWS Lambda'],
+    'nice': ['Kubernetes'],
+    'sen': 'Senior',
+    'edu': "Bachelor's",
+    'jt': 'Full-time',
+    'ind': 'Software'
+}
+
+
+def load_payloads() -> Dict[str, Dict[str, Any]]:
+    """Build the benchmark event for each handler from the repo's test events"""
+    with open(os.path.join(REPO_ROOT, 'test_event.json')) as f:
+        analysis_event = json.load(f)
+    with open(os.path.join(REPO_ROOT, 'aws-test-event.json')) as f:
+        pii_event = json.load(f)
+
+    job_info = json.loads(analysis_event['body']).get('jobInfo', {})
+    search_event = {
+        'job_description': (
+            f"{job_info.get('job_title', 'Software Engineer')}\n"
+            f"We are looking for an engineer with {job_info.get('required_experience', 3)}+ years of experience.\n"
+            f"Required skills: {', '.join(job_info.get('required_skills', []))}."
+        ),
+        'max_results': 5
+    }
+    return {'search': search_event, 'bedrock-analysis': analysis_event, 'pii': pii_event}
+
+
+# ---------------------------------------------------------------------------
+# Child process: stand-ins and phase timing
+# ---------------------------------------------------------------------------
+
+class _StandIn:
+    """Charges a handshake cost on first use and a fixed latency per call"""
+
+    def __init__(self, handshake_ms: float, latency_ms: float):
+        self.handshake_ms = handshake_ms
+        self.latency_ms = latency_ms
+        self.connected = False
+
+    def wait(self):
+        delay_ms = self.latency_ms
+        if not self.connected:
+            delay_ms += self.handshake_ms
+            self.connected = True
+        time.sleep(delay_ms / 1000)
+
+
+class _StreamingBody:
+    def __init__(self, payload: Dict[str, Any]):
+        self._data = json.dumps(payload).encode('utf-8')
+
+    def read(self, *args):
+        return self._data
+
+
+class _FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self._rows = []
+
+    def execute(self, query, params=None):
+        self.connection.stand_in.wait()
+        if 'resume_pii' in query:
+            ids = params if isinstance(params, (list, tuple)) else SAMPLE_RESUME_IDS
+            self._rows = [_pii_row(str(resume_id)) for resume_id in ids]
+        else:
+            self._rows = [(1,)]
+
+    def fetchone(self):
+        return self._rows[0] if self._rows else None
+
+    def fetchall(self):
+        return list(self._rows)
+
+    def close(self):
+        pass
+
+
+class _FakePreparedStatement:
+    def __init__(self, connection, sql):
+        self.connection = connection
+        self.sql = sql
+
+    def run(self, **params):
+        self.connection.stand_in.wait()
+        ids = next(iter(params.values()), []) if params else []
+        return tuple(_pii_row(str(resume_id)) for resume_id in ids)
+
+    def close(self):
+        pass
+
+
+class _FakeConnection:
+    def __init__(self, stand_in):
+        self.stand_in = stand_in
+        # A real socket pair so liveness checks that select() on it work
+        self._usock, self._peer = socket.socketpair()
+        self._sock = self._usock
+
+    def cursor(self):
+        return _FakeCursor(self)
+
+    def prepare(self, sql):
+        return _FakePreparedStatement(self, sql)
+
+    def run(self, sql, **params):
+        self.stand_in.wait()
+        return ((1,),)
+
+    def close(self):
+        self._usock.close()
+        self._peer.close()
+        self._usock = self._sock = None
+
+
+def _pii_row(resume_id):
+    return (resume_id, 'Alex Johnson', 'alex@example.com', '+1234567890', 'San Francisco, CA',
+            'https://linkedin.com/in/alexjohnson', 'tg-ai-rec', f'processed/resumes/{resume_id}.pdf',
+            'resume.pdf', 'pdf')
+
+
+def _patch_opensearch(module, stand_in):
+    hits = [{
+        '_score': 10.0 - i,
+        '_source': {
+            'resume_id': resume_id,
+            'skills': ['Python', 'React', 'AWS Lambda'],
+            'total_experience': 4 + i,
+            'positions': ['Full Stack Developer']
+        }
+    } for i, resume_id in enumerate(SAMPLE_RESUME_IDS)]
+
+    def perform_request(self, method, url, params=None, body=None, timeout=None,
+                        allow_redirects=True, ignore=(), headers=None):
+        stand_in.wait()
+        if '_search' in url:
+            return 200, {}, json.dumps({'hits': {'hits': hits, 'total': {'value': len(hits)}}})
+        return 200, {}, '{}'
+
+    module.RequestsHttpConnection.perform_request = perform_request
+
+
+def _patch_botocore(module, stand_in):
+    def make_api_call(self, operation_name, api_params):
+        stand_in.wait()
+        model_id = api_params.get('modelId', '')
+        if operation_name == 'InvokeModel':
+            if 'embed' in model_id:
+                dimensions = int(os.environ.get('EMBEDDING_DIMENSIONS', '1024'))
+                return {'body': _StreamingBody({'embedding': [0.01] * dimensions})}
+            if 'llama' in model_id:
+                return {'body': _StreamingBody({'generation': SAMPLE_ANALYSIS})}
+            return {'body': _StreamingBody({'completion': SAMPLE_ANALYSIS})}
+        if operation_name == 'Converse':
+            tool_config = api_params.get('toolConfig')
+            # Like Bedrock, Llama 3 rejects tools and answers JD extraction
+            # (the only Converse call) with a plain JSON text
+            if 'llama' in model_id:
+                if tool_config:
+                    from botocore.exceptions import ClientError
+                    raise ClientError({'Error': {'Code': 'ValidationException',
+                                                 'Message': "This model doesn't support tool use."}}, operation_name)
+                content = [{'text': json.dumps(SAMPLE_JD_EXTRACTION)}]
+                return {'output': {'message': {'role': 'assistant', 'content': content}},
+                        'stopReason': 'end_turn', 'usage': {}}
+            if tool_config:
+                tool_name = tool_config['tools'][0]['toolSpec']['name']
+                content = [{'toolUse': {'toolUseId': 'benchmark', 'name': tool_name, 'input': SAMPLE_JD_EXTRACTION}}]
+                return {'output': {'message': {'role': 'assistant', 'content': content}},
+                        'stopReason': 'tool_use', 'usage': {}}
+            return {'output': {'message': {'role': 'assistant', 'content': [{'text': SAMPLE_ANALYSIS}]}},
+                    'stopReason': 'end_turn', 'usage': {}}
+        return {}
+
+    module.BaseClient._make_api_call = make_api_call
+
+
+def _patch_pg8000(module, stand_in):
+    module.connect = lambda *args, **kwargs: _FakeConnection(stand_in)
+
+
+class _PatchOnImport(importlib.abc.MetaPathFinder):
+    """Apply a patch right after a module is first imported
+
+    Patching at import time keeps the stand-ins out of the measured import
+    phase for modules the handlers load lazily.
+    """
+
+    def __init__(self, patches):
+        self.patches = patches
+
+    def find_spec(self, fullname, path, target=None):
+        if fullname not in self.patches:
+            return None
+        sys.meta_path.remove(self)
+        try:
+            spec = importlib.util.find_spec(fullname)
+        finally:
+            sys.meta_path.insert(0, self)
+        if spec is None or spec.loader is None:
+            return spec
+
+        loader = spec.loader
+        patch = self.patches[fullname]
+        original_exec_module = loader.exec_module
+
+        def exec_module(module):
+            original_exec_module(module)
+            patch(module)
+
+        loader.exec_module = exec_module
+        return spec
+
+
+def clear_result_caches(module) -> int:
+    """Empty every module-level LRUTTLCache of a handler; returns how many were cleared"""
+    from lru_cache import LRUTTLCache
+    caches = [value for value in vars(module).values() if isinstance(value, LRUTTLCache)]
+    for cache in caches:
+        cache.invalidate()
+    return len(caches)
+
+
+def run_child(handler_name: str, args) -> Dict[str, Any]:
+    """Load one handler in this (fresh) interpreter and time its phases"""
+    handler = HANDLERS[handler_name]
+    os.environ.update(BENCHMARK_ENV)
+    sys.path.insert(0, PACKAGE_DIR)
+    sys.path.insert(0, os.path.dirname(handler['path']))
+
+    sys.meta_path.insert(0, _PatchOnImport({
+        'opensearchpy.connection.http_requests': lambda m: _patch_opensearch(
+            m, _StandIn(args.handshake_ms, args.opensearch_ms)),
+        'botocore.client': lambda m: _patch_botocore(
+            m, _StandIn(args.handshake_ms, args.bedrock_ms)),
+        'pg8000': lambda m: _patch_pg8000(
+            m, _StandIn(args.postgres_handshake_ms, args.postgres_ms))
+    }))
+
+    import logging
+    logging.disable(logging.CRITICAL)
+
+    event = load_payloads()[handler_name]
+
+    import_start = time.perf_counter()
+    spec = importlib.util.spec_from_file_location(handler['module'], handler['path'])
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[handler['module']] = module
+    spec.loader.exec_module(module)
+    import_ms = (time.perf_counter() - import_start) * 1000
+
+    first_start = time.perf_counter()
+    response = module.lambda_handler(json.loads(json.dumps(event)), None)
+    first_request_ms = (time.perf_counter() - first_start) * 1000
+
+    # The warm request stands for a different request on the same container,
+    # so it must not be served from the result caches the first one filled
+    clear_result_caches(module)
+    warm_start = time.perf_counter()
+    module.lambda_handler(json.loads(json.dumps(event)), None)
+    warm_request_ms = (time.perf_counter() - warm_start) * 1000
+
+    return {
+        'import_ms': import_ms,
+        'init_ms': max(first_request_ms - warm_request_ms, 0.0),
+        'first_request_ms': first_request_ms,
+        'warm_request_ms': warm_request_ms,
+        'status_code': response.get('statusCode') if isinstance(response, dict) else None
+    }
+
+
+# ---------------------------------------------------------------------------
+# Parent process: repeated runs and percentile report
+# ---------------------------------------------------------------------------
+
+def percentile(values: List[float], pct: float) -> float:
+    """Linear-interpolated percentile of a list of values"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def summarize(samples: List[Dict[str, Any]]) -> Dict[str, Any]:
+    summary = {}
+    for phase in ('import_ms', 'init_ms', 'first_request_ms', 'warm_request_ms'):
+        values = [s[phase] for s in samples]
+        summary[phase] = {
+            'p50': round(percentile(values, 50), 2),
+            'p90': round(percentile(values, 90), 2),
+            'p99': round(percentile(values, 99), 2),
+            'min': round(min(values), 2),
+            'max': round(max(values), 2)
+        }
+    summary['status_codes'] = sorted({s['status_code'] for s in samples}, key=str)
+    return summary
+
+
+def benchmark_handler(handler_name: str, args) -> Dict[str, Any]:
+    child_args = [
+        sys.executable, os.path.abspath(__file__), '--child', handler_name,
+        '--handshake-ms', str(args.handshake_ms),
+        '--postgres-handshake-ms', str(args.postgres_handshake_ms),
+        '--opensearch-ms', str(args.opensearch_ms),
+        '--bedrock-ms', str(args.bedrock_ms),
+        '--postgres-ms', str(args.postgres_ms)
+    ]
+
+    samples = []
+    for run in range(args.runs):
+        completed = subprocess.run(child_args, capture_output=True, text=True, cwd=REPO_ROOT)
+        if completed.returncode != 0:
+            raise RuntimeError(f"{handler_name} run {run + 1} failed:\n{completed.stderr[-2000:]}")
+        samples.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+    return {'handler': handler_name, 'runs': len(samples), 'phases': summarize(samples)}
+
+
+def print_report(results: List[Dict[str, Any]]):
+    print(f"{'handler':<18}{'phase':<18}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}")
+    for result in results:
+        for phase in ('import_ms', 'init_ms', 'first_request_ms', 'warm_request_ms'):
+            stats = result['phases'][phase]
+            print(f"{result['handler']:<18}{phase:<18}{stats['p50']:>10.1f}{stats['p90']:>10.1f}"
+                  f"{stats['p99']:>10.1f}{stats['max']:>10.1f}")
+        print(f"{'':<18}status codes: {result['phases']['status_codes']}  runs: {result['runs']}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark cold-start cost of the Lambda handlers')
+    parser.add_argument('--handler', choices=sorted(HANDLERS) + ['all'], default='all')
+    parser.add_argument('--runs', type=int, default=20, help='Fresh interpreters per handler')
+    parser.add_argument('--handshake-ms', type=float, default=40.0,
+                        help='Extra latency of the first OpenSearch/Bedrock call (TLS handshake)')
+    parser.add_argument('--postgres-handshake-ms', type=float, default=150.0,
+                        help='Extra latency of the first Postgres call (TLS + SCRAM)')
+    parser.add_argument('--opensearch-ms', type=float, default=20.0, help='Per-request OpenSearch latency')
+    parser.add_argument('--bedrock-ms', type=float, default=100.0, help='Per-request Bedrock latency')
+    parser.add_argument('--postgres-ms', type=float, default=5.0, help='Per-query Postgres latency')
+    parser.add_argument('--json', help='Also write the results to this JSON file')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(run_child(args.child, args)))
+        return 0
+
+    handler_names = sorted(HANDLERS) if args.handler == 'all' else [args.handler]
+    results = [benchmark_handler(name, args) for name in handler_names]
+    print_report(results)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'python': sys.version.split()[0], 'results': results}, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
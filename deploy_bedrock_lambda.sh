@@ -26,7 +26,7 @@ FUNCTION_EXISTS=$?
 # Create deployment package
 echo "Creating deployment package..."
 rm -f $ZIP_FILENAME
-zip -j $ZIP_FILENAME bedrock_analysis_lambda.py
+zip -j $ZIP_FILENAME bedrock_analysis_lambda.py deployment-package/aws_clients.py deployment-package/import_timing.py deployment-package/snapstart.py deployment-package/analysis_sections.py
 
 # Create IAM role if needed
 if [ $FUNCTION_EXISTS -ne 0 ]; then
@@ -0,0 +1,128 @@
+"""
+Section headings of a candidate analysis, shared by both analysis Lambdas.
+
+The boto3 and LangChain analysis Lambdas ask the model for the same six
+headed sections and return them under the same response keys. This module
+holds those headings and the parser that splits an answer on them, so both
+Lambdas read model output the same way. Their deploy scripts copy it from
+this directory, like aws_clients.py.
+
+Headings are matched in upper case, as the prompts write them:
+
+- A heading at the start of a line counts, optionally numbered, bulleted or
+  in markdown ("2. SCORE ANALYSIS", "**2: SCORE ANALYSIS**", "• SCORE
+  ANALYSIS"). Each section is taken once, in whatever order the model wrote
+  them, so a later line starting with an earlier heading does not cut the
+  current section short.
+- If fewer than two lines start with a heading, headings followed by a
+  colon are taken anywhere in the text ("...analysis. EXECUTIVE SUMMARY:
+  Strong fit. SCORE ANALYSIS: ..."), provided that finds more sections.
+"""
+import re
+from typing import Any, Dict, List, Mapping, Tuple
+
+# Response keys and the headings the model is asked to write, in order
+ANALYSIS_SECTIONS = [
+    ('executiveSummary', 'EXECUTIVE SUMMARY'),
+    ('scoreAnalysis', 'SCORE ANALYSIS'),
+    ('keyStrengths', 'KEY STRENGTHS'),
+    ('areasForConsideration', 'AREAS FOR CONSIDERATION'),
+    ('interviewRecommendations', 'INTERVIEW RECOMMENDATIONS'),
+    ('finalRecommendation', 'FINAL RECOMMENDATION')
+]
+# Field names of the structured-JSON answer ("executive_summary", ...),
+# the same as the CandidateAnalysis model of the LangChain Lambda
+STRUCTURED_FIELDS = [(key, heading.lower().replace(' ', '_')) for key, heading in ANALYSIS_SECTIONS]
+
+_HEADINGS = '|'.join(re.escape(heading) for _, heading in ANALYSIS_SECTIONS)
+_SECTION_HEADING_PATTERN = re.compile(r'(?m)^[ \t#*•]*(?:\d+\s*[.:)]\s*)?(' + _HEADINGS + ')')
+# Fallback for answers that run the sections together on one line
+_INLINE_HEADING_PATTERN = re.compile(r'(?<![A-Za-z])(?:\d+\s*[.:)]\s*)?(' + _HEADINGS + r')(?=[ \t*]*:)')
+_SECTION_INDEX = {heading: index for index, (_, heading) in enumerate(ANALYSIS_SECTIONS)}
+# Rest of a heading line: markdown, a colon or an echoed "(2-3 sentences ...)"
+_HEADING_REMAINDER_PATTERN = re.compile(r'[ \t*:]*(?:\([^)\n]*\))?[ \t*:]*')
+# Longest text a heading can span, used to re-scan headings split across chunks
+_MAX_HEADING_LENGTH = max(len(heading) for _, heading in ANALYSIS_SECTIONS) + 16
+
+
+class SectionStreamParser:
+    """Split streamed model output into analysis sections as they complete
+
+    A section is complete once the next heading arrives, so each section
+    can be sent to the client while the model is still writing the next
+    one. Headings inline in the text are only looked for by finish(), once
+    the whole answer turned out to have fewer than two line-start headings.
+    """
+
+    def __init__(self):
+        self.text = ''
+        self._scan_from = 0
+        self._current = None  # (section index, offset where its text starts)
+        self._seen = set()
+
+    def feed(self, chunk: str) -> List[Tuple[str, str]]:
+        """Add generated text; returns (key, text) for each section completed by it"""
+        self.text += chunk
+        completed = self._scan(_SECTION_HEADING_PATTERN, self._scan_from)
+        # A heading may still be arriving at the end of the text
+        self._scan_from = max(len(self.text) - _MAX_HEADING_LENGTH, self._current[1] if self._current else 0)
+        return completed
+
+    def finish(self) -> List[Tuple[str, str]]:
+        """Return the sections still open once the stream has ended"""
+        completed = []
+        # With fewer than two line-start headings nothing has been returned
+        # yet, so the text can still be split on inline headings instead
+        if len(self._seen) < 2:
+            inline = {match.group(1) for match in _INLINE_HEADING_PATTERN.finditer(self.text)}
+            if len(inline) > len(self._seen):
+                self._current = None
+                self._seen = set()
+                completed = self._scan(_INLINE_HEADING_PATTERN, 0)
+        if self._current is not None:
+            completed.append(self._section(len(self.text)))
+            self._current = None
+        return completed
+
+    def _scan(self, pattern, start: int) -> List[Tuple[str, str]]:
+        completed = []
+        for match in pattern.finditer(self.text, start):
+            index = _SECTION_INDEX[match.group(1)]
+            if index in self._seen:
+                continue
+            if self._current is not None:
+                completed.append(self._section(match.start()))
+            self._current = (index, match.end())
+            self._seen.add(index)
+        return completed
+
+    def _section(self, end: int) -> Tuple[str, str]:
+        index, start = self._current
+        start = _HEADING_REMAINDER_PATTERN.match(self.text, start, end).end()
+        return ANALYSIS_SECTIONS[index][0], self.text[start:end].strip()
+
+
+def parse_sections(raw_text: str) -> Dict[str, str]:
+    """Split a whole answer into sections; missing ones are empty strings"""
+    parser = SectionStreamParser()
+    sections = {key: '' for key, _ in ANALYSIS_SECTIONS}
+    for key, section_text in parser.feed(raw_text or '') + parser.finish():
+        sections[key] = section_text
+    return sections
+
+
+def structured_sections(fields: Mapping[str, Any]) -> Dict[str, str]:
+    """Map the fields of a structured-JSON answer to the section keys
+
+    Lists become "- " bullet lines; missing and null fields become empty
+    strings.
+    """
+    sections = {}
+    for key, field in STRUCTURED_FIELDS:
+        value = fields.get(field)
+        if value is None:
+            value = ''
+        elif isinstance(value, list):
+            value = '\n'.join(f"- {item}" for item in value if item is not None)
+        sections[key] = str(value).strip()
+    return sections
@@ -0,0 +1,130 @@
+"""
+Shared AWS client factory for the resume matching Lambdas.
+
+Creating a boto3 client loads the service model from disk, resolves
+credentials and builds a new connection pool, so doing it per call throws
+away warm TLS connections. This module keeps one boto3 Session per container
+and one client per (service, region, endpoint, config overrides), all built
+with a botocore Config tuned
+for our traffic: pooled keep-alive connections, bounded timeouts and
+adaptive retries.
+
+boto3 and botocore are only imported when the first client or Session is
+requested. The search Lambda imports this module directly. The analysis
+Lambdas pick it up (together with import_timing.py) from this directory in
+their deploy scripts.
+
+Environment variables:
+- AWS_CLIENT_MAX_POOL_CONNECTIONS: connections kept per client (default 50)
+- AWS_CLIENT_CONNECT_TIMEOUT: TCP/TLS connect timeout in seconds (default 2)
+- AWS_CLIENT_READ_TIMEOUT: socket read timeout in seconds (default 60)
+- AWS_CLIENT_RETRY_MODE: botocore retry mode (default 'adaptive')
+- AWS_CLIENT_MAX_ATTEMPTS: total attempts including the first (default 3)
+"""
+import json
+import os
+import logging
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from import_timing import lazy_import
+
+logger = logging.getLogger()
+
+DEFAULT_REGION = os.environ.get('AWS_REGION', 'us-east-1')
+
+MAX_POOL_CONNECTIONS = int(os.environ.get('AWS_CLIENT_MAX_POOL_CONNECTIONS', '50'))
+CONNECT_TIMEOUT = float(os.environ.get('AWS_CLIENT_CONNECT_TIMEOUT', '2'))
+READ_TIMEOUT = float(os.environ.get('AWS_CLIENT_READ_TIMEOUT', '60'))
+RETRY_MODE = os.environ.get('AWS_CLIENT_RETRY_MODE', 'adaptive')
+MAX_ATTEMPTS = int(os.environ.get('AWS_CLIENT_MAX_ATTEMPTS', '3'))
+
+_session = None
+_data_loader = None
+_clients: Dict[Tuple[str, str, Optional[str], str], Any] = {}
+_lock = threading.RLock()
+
+
+def build_client_config(**overrides):
+    """Return the botocore Config shared by every client
+
+    Keyword arguments override individual Config settings, e.g.
+    read_timeout=5 for a latency-sensitive call site.
+    """
+    settings = {
+        'max_pool_connections': MAX_POOL_CONNECTIONS,
+        'tcp_keepalive': True,
+        'connect_timeout': CONNECT_TIMEOUT,
+        'read_timeout': READ_TIMEOUT,
+        'retries': {
+            'mode': RETRY_MODE,
+            'total_max_attempts': MAX_ATTEMPTS
+        }
+    }
+    settings.update(overrides)
+    return lazy_import('botocore.config').Config(**settings)
+
+
+def get_session():
+    """Return the container-wide boto3 Session"""
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                botocore_session = lazy_import('botocore.session').get_session()
+                if _data_loader is not None:
+                    # Reuse service models already parsed by a previous Session
+                    botocore_session.register_component('data_loader', _data_loader)
+                _session = lazy_import('boto3').Session(botocore_session=botocore_session)
+    return _session
+
+
+def get_client(service_name: str, region_name: Optional[str] = None,
+               endpoint_url: Optional[str] = None, **config_overrides):
+    """Return a cached boto3 client for (service_name, region_name, endpoint_url)
+
+    Clients are thread-safe, so the same instance is shared by every thread
+    in the container. endpoint_url points a client at a local emulator such
+    as DynamoDB Local. Config overrides are part of the cache key, so a call
+    site that needs different settings (e.g. no botocore retries) gets its
+    own client instead of one created earlier with other settings.
+    """
+    region = region_name or DEFAULT_REGION
+    key = (service_name, region, endpoint_url, json.dumps(config_overrides, sort_keys=True, default=repr))
+    client = _clients.get(key)
+    if client is not None:
+        return client
+
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            logger.info(f"Creating {service_name} client for region {region}")
+            client = get_session().client(
+                service_name=service_name,
+                region_name=region,
+                endpoint_url=endpoint_url,
+                config=build_client_config(**config_overrides)
+            )
+            _clients[key] = client
+    return client
+
+
+def reset_clients():
+    """Drop every cached client and the shared Session
+
+    Used when cached credentials or sockets can no longer be trusted,
+    e.g. after the execution environment has been restored from a snapshot.
+    The botocore data loader is kept, so recreating clients does not parse
+    the service models again.
+    """
+    global _session, _data_loader
+    with _lock:
+        if _session is not None:
+            _data_loader = _session._session.get_component('data_loader')
+        for client in _clients.values():
+            try:
+                client.close()
+            except Exception as e:
+                logger.debug(f"Error closing AWS client: {str(e)}")
+        _clients.clear()
+        _session = None
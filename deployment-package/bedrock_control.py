@@ -0,0 +1,592 @@
+"""
+Adaptive concurrency and retry control for Bedrock calls.
+
+Bedrock throttles per model and account. Without flow control a traffic
+spike turns into a burst of ThrottlingExceptions, and every caller quietly
+falls back to its pattern-based path. BedrockController sits in front of
+each call:
+
+- One AIMDLimiter per model caps the calls in flight. Each success below
+  the latency target raises the limit additively (about +1 per window of
+  `limit` calls); a throttle halves it. Throttles that arrive together
+  count once, so a burst does not collapse the limit to the minimum.
+- Throttling and transient errors are retried with exponential backoff and
+  full jitter, but every retry must be drawn from the RetryBudget of the
+  current request. Once the budget is spent, errors go straight to the
+  caller's fallback instead of stacking up latency.
+- A call that cannot get a slot within the acquire timeout raises
+  BedrockCapacityError, which callers treat like any other Bedrock failure.
+- call_hedged() optionally hedges the latency tail: when the first request
+  has not answered within the model's recent p95, an identical second
+  request is sent and whichever succeeds first is returned. The loser is
+  cancelled if it has not started and ignored otherwise. A hedge is only
+  sent while the model has a free limiter slot and never waits for one,
+  and at most a fixed fraction of calls is hedged.
+- A CircuitBreaker per model opens after consecutive throttling, timeout or
+  5xx failures. While it is open, calls fail at once with
+  BedrockCircuitOpenError instead of waiting out the client timeouts, so
+  callers go straight to their deterministic fallback. After a cool-down
+  one probe call is let through (half-open); its outcome closes the breaker
+  or opens it again.
+
+Limiters and breakers live for the life of the container. A Lambda container serves one
+request at a time, so the budget is simply replaced at the start of each
+invocation with start_request().
+
+The Bedrock client itself must be built with botocore retries disabled,
+otherwise throttles are retried (and hidden) before the controller sees
+them.
+
+Environment variables:
+- BEDROCK_INITIAL_CONCURRENCY: starting in-flight limit per model (default 4)
+- BEDROCK_MIN_CONCURRENCY / BEDROCK_MAX_CONCURRENCY: limit bounds (1 / 16)
+- BEDROCK_DECREASE_FACTOR: multiplier applied on throttling (default 0.5)
+- BEDROCK_LATENCY_TARGET_MS: successes slower than this do not raise the
+  limit; by default twice the model's smoothed latency
+- BEDROCK_ACQUIRE_TIMEOUT: seconds to wait for a free slot (default 5)
+- BEDROCK_RETRY_BUDGET: retries allowed per request across all calls (default 3)
+- BEDROCK_BACKOFF_BASE_MS / BEDROCK_BACKOFF_MAX_MS: backoff bounds (100 / 2000)
+- BEDROCK_HEDGING: enable hedged requests (default false)
+- BEDROCK_HEDGE_PERCENTILE: latency percentile that triggers a hedge (0.95)
+- BEDROCK_HEDGE_MAX_FRACTION: largest share of calls that may be hedged (0.1)
+- BEDROCK_HEDGE_MIN_SAMPLES: latencies needed before hedging starts (20)
+- BEDROCK_HEDGE_MIN_DELAY_MS: lower bound on the hedge delay (50)
+- BEDROCK_HEDGE_WORKERS: threads running hedged calls (default 16)
+- BEDROCK_BREAKER_FAILURES: consecutive failures that open a breaker (5)
+- BEDROCK_BREAKER_OPEN_SECONDS: time a breaker stays open before a probe (30)
+"""
+import logging
+import math
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+from import_timing import lazy_import
+
+logger = logging.getLogger()
+
+INITIAL_CONCURRENCY = float(os.environ.get('BEDROCK_INITIAL_CONCURRENCY', '4'))
+MIN_CONCURRENCY = float(os.environ.get('BEDROCK_MIN_CONCURRENCY', '1'))
+MAX_CONCURRENCY = float(os.environ.get('BEDROCK_MAX_CONCURRENCY', '16'))
+DECREASE_FACTOR = float(os.environ.get('BEDROCK_DECREASE_FACTOR', '0.5'))
+LATENCY_TARGET_MS = float(os.environ.get('BEDROCK_LATENCY_TARGET_MS', '0')) or None
+ACQUIRE_TIMEOUT = float(os.environ.get('BEDROCK_ACQUIRE_TIMEOUT', '5'))
+RETRY_BUDGET = int(os.environ.get('BEDROCK_RETRY_BUDGET', '3'))
+BACKOFF_BASE_SECONDS = float(os.environ.get('BEDROCK_BACKOFF_BASE_MS', '100')) / 1000
+BACKOFF_MAX_SECONDS = float(os.environ.get('BEDROCK_BACKOFF_MAX_MS', '2000')) / 1000
+HEDGING_ENABLED = os.environ.get('BEDROCK_HEDGING', 'false').lower() == 'true'
+HEDGE_PERCENTILE = float(os.environ.get('BEDROCK_HEDGE_PERCENTILE', '0.95'))
+HEDGE_MAX_FRACTION = float(os.environ.get('BEDROCK_HEDGE_MAX_FRACTION', '0.1'))
+HEDGE_MIN_SAMPLES = int(os.environ.get('BEDROCK_HEDGE_MIN_SAMPLES', '20'))
+HEDGE_MIN_DELAY_SECONDS = float(os.environ.get('BEDROCK_HEDGE_MIN_DELAY_MS', '50')) / 1000
+HEDGE_WORKERS = int(os.environ.get('BEDROCK_HEDGE_WORKERS', '16'))
+# Latencies kept per model for the percentile
+HEDGE_WINDOW = 200
+BREAKER_FAILURES = int(os.environ.get('BEDROCK_BREAKER_FAILURES', '5'))
+BREAKER_OPEN_SECONDS = float(os.environ.get('BEDROCK_BREAKER_OPEN_SECONDS', '30'))
+
+THROTTLING_ERROR_CODES = frozenset({
+    'ThrottlingException', 'TooManyRequestsException', 'ServiceQuotaExceededException'
+})
+TRANSIENT_ERROR_CODES = frozenset({
+    'ServiceUnavailableException', 'ModelNotReadyException', 'InternalServerException'
+})
+TRANSIENT_EXCEPTION_NAMES = frozenset({
+    'ReadTimeoutError', 'ConnectTimeoutError', 'EndpointConnectionError', 'ConnectionClosedError'
+})
+
+# Weight of the newest sample in the smoothed latency
+_LATENCY_SMOOTHING = 0.2
+
+
+class BedrockCapacityError(Exception):
+    """No in-flight slot for the model became free within the acquire timeout"""
+
+
+class BedrockCircuitOpenError(Exception):
+    """The model's circuit breaker is open, so the call was not attempted"""
+
+
+def error_code(error: Exception) -> Optional[str]:
+    """Return the AWS error code of a botocore ClientError, if any"""
+    response = getattr(error, 'response', None)
+    if isinstance(response, dict):
+        return response.get('Error', {}).get('Code')
+    return None
+
+
+def is_throttling(error: Exception) -> bool:
+    return error_code(error) in THROTTLING_ERROR_CODES
+
+
+def is_retryable(error: Exception) -> bool:
+    return (is_throttling(error) or error_code(error) in TRANSIENT_ERROR_CODES
+            or type(error).__name__ in TRANSIENT_EXCEPTION_NAMES)
+
+
+class AIMDLimiter:
+    """In-flight limit for one model, adjusted by additive increase and
+    multiplicative decrease"""
+
+    def __init__(self, name: str, initial: float = INITIAL_CONCURRENCY,
+                 minimum: float = MIN_CONCURRENCY, maximum: float = MAX_CONCURRENCY,
+                 decrease_factor: float = DECREASE_FACTOR,
+                 latency_target_ms: Optional[float] = LATENCY_TARGET_MS):
+        self.name = name
+        self.minimum = max(minimum, 1.0)
+        self.maximum = max(maximum, self.minimum)
+        self.limit = min(max(initial, self.minimum), self.maximum)
+        self.decrease_factor = decrease_factor
+        self.latency_target_ms = latency_target_ms
+        self.in_flight = 0
+        self.latency_ms: Optional[float] = None
+        self.successes = 0
+        self.throttles = 0
+        self.decreases = 0
+        self.rejections = 0
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    def acquire(self, timeout: float = ACQUIRE_TIMEOUT, count_rejection: bool = True):
+        """Wait for a free slot
+
+        count_rejection=False keeps an optional call (a hedge) that found
+        no slot out of the rejection count.
+
+        Raises:
+            BedrockCapacityError: if no slot became free within timeout
+        """
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    if count_rejection:
+                        self.rejections += 1
+                    raise BedrockCapacityError(
+                        f"{self.name}: {self.in_flight} calls in flight at limit {int(self.limit)}")
+                self._condition.wait(remaining)
+            self.in_flight += 1
+
+    def has_capacity(self) -> bool:
+        """True if a slot is free right now"""
+        with self._condition:
+            return self.in_flight < int(self.limit)
+
+    def release(self, latency_seconds: float, throttled: bool = False):
+        """Free the slot and adjust the limit from the call's outcome"""
+        latency_ms = latency_seconds * 1000
+        with self._condition:
+            self.in_flight -= 1
+            now = time.monotonic()
+            if throttled:
+                self.throttles += 1
+                # Calls already in flight when the first throttle arrived
+                # report the same congestion; only react once per round trip
+                window = (self.latency_ms or 100.0) / 1000
+                if now - self._last_decrease >= window:
+                    self.limit = max(self.minimum, self.limit * self.decrease_factor)
+                    self._last_decrease = now
+                    self.decreases += 1
+                    logger.warning(f"Bedrock throttled {self.name}; concurrency limit now {self.limit:.2f}")
+            else:
+                self.successes += 1
+                target = self.latency_target_ms or (2 * self.latency_ms if self.latency_ms else None)
+                if target is None or latency_ms <= target:
+                    self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+                if self.latency_ms is None:
+                    self.latency_ms = latency_ms
+                else:
+                    self.latency_ms += _LATENCY_SMOOTHING * (latency_ms - self.latency_ms)
+            self._condition.notify()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._condition:
+            return {
+                'limit': round(self.limit, 2),
+                'in_flight': self.in_flight,
+                'latency_ms': round(self.latency_ms) if self.latency_ms is not None else None,
+                'successes': self.successes,
+                'throttles': self.throttles,
+                'decreases': self.decreases,
+                'rejections': self.rejections
+            }
+
+
+class Hedger:
+    """Recent latencies of one model and the hedging counters derived from them"""
+
+    def __init__(self, name: str, percentile: float = HEDGE_PERCENTILE,
+                 max_fraction: float = HEDGE_MAX_FRACTION, min_samples: int = HEDGE_MIN_SAMPLES):
+        self.name = name
+        self.percentile = percentile
+        self.max_fraction = max_fraction
+        self.min_samples = min_samples
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.saved_seconds = 0.0
+        self._latencies = deque(maxlen=HEDGE_WINDOW)
+        self._lock = threading.Lock()
+
+    def record(self, latency_seconds: float):
+        """Record the latency of a single (unhedged) request"""
+        with self._lock:
+            self._latencies.append(latency_seconds)
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds to wait before hedging, or None until enough samples exist"""
+        with self._lock:
+            self.calls += 1
+            if len(self._latencies) < self.min_samples:
+                return None
+            ordered = sorted(self._latencies)
+        index = min(len(ordered) - 1, max(0, math.ceil(self.percentile * len(ordered)) - 1))
+        return max(HEDGE_MIN_DELAY_SECONDS, ordered[index])
+
+    def try_hedge(self) -> bool:
+        """Reserve a hedge if that keeps the hedged share under the cap"""
+        with self._lock:
+            if self.hedged + 1 > self.max_fraction * self.calls:
+                return False
+            self.hedged += 1
+            return True
+
+    def discard_hedge(self):
+        """Give back a hedge reserved by try_hedge() that never launched"""
+        with self._lock:
+            self.hedged -= 1
+
+    def record_win(self, saved_seconds: Optional[float] = None):
+        with self._lock:
+            if saved_seconds is None:
+                self.hedge_wins += 1
+            else:
+                self.saved_seconds += max(0.0, saved_seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            ordered = sorted(self._latencies)
+            p95 = ordered[min(len(ordered) - 1, math.ceil(self.percentile * len(ordered)) - 1)] if ordered else None
+            return {
+                'enabled': HEDGING_ENABLED,
+                'calls': self.calls,
+                'hedged': self.hedged,
+                'hedge_rate': round(self.hedged / self.calls, 3) if self.calls else 0.0,
+                'hedge_wins': self.hedge_wins,
+                'p95_ms': round(p95 * 1000) if p95 is not None else None,
+                'tail_saved_ms': round(self.saved_seconds * 1000)
+            }
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker for one model"""
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name: str, failure_threshold: int = BREAKER_FAILURES,
+                 open_seconds: float = BREAKER_OPEN_SECONDS):
+        self.name = name
+        self.failure_threshold = max(failure_threshold, 1)
+        self.open_seconds = open_seconds
+        self.consecutive_failures = 0
+        self.opens = 0
+        self.rejections = 0
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        # An open breaker turns half-open once the cool-down has passed;
+        # the caller must hold the lock
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._state = self.HALF_OPEN
+            self._probe_in_flight = False
+        return self._state
+
+    def allow(self) -> bool:
+        """Return True if a call may go ahead; in half-open state only one
+        probe at a time is allowed"""
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.rejections += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.consecutive_failures = 0
+            self._probe_in_flight = False
+            if self._state != self.CLOSED:
+                self._state = self.CLOSED
+                logger.warning(f"Bedrock circuit for {self.name} closed")
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            self._probe_in_flight = False
+            if self._state == self.HALF_OPEN or (
+                    self._state == self.CLOSED and self.consecutive_failures >= self.failure_threshold):
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self.opens += 1
+                logger.warning(f"Bedrock circuit for {self.name} opened after "
+                               f"{self.consecutive_failures} consecutive failures")
+
+    def abandon(self):
+        """Release a half-open probe that ended without a verdict"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            state = self._current_state()
+            return {
+                'state': state,
+                'consecutive_failures': self.consecutive_failures,
+                'opens': self.opens,
+                'rejections': self.rejections,
+                'retry_in_seconds': round(max(0.0, self.open_seconds - (time.monotonic() - self._opened_at)), 1)
+                if state == self.OPEN else None
+            }
+
+
+class RetryBudget:
+    """Fixed number of retries shared by every Bedrock call of one request"""
+
+    def __init__(self, retries: int = RETRY_BUDGET):
+        self.limit = retries
+        self.used = 0
+        self.denied = 0
+        self._lock = threading.Lock()
+
+    def take(self) -> bool:
+        """Consume one retry; returns False once the budget is spent"""
+        with self._lock:
+            if self.used >= self.limit:
+                self.denied += 1
+                return False
+            self.used += 1
+            return True
+
+    def stats(self) -> Dict[str, int]:
+        return {'limit': self.limit, 'used': self.used, 'denied': self.denied}
+
+
+class BedrockController:
+    """Per-model AIMD limiters, hedging and circuit breakers plus the retry
+    budget of the current request"""
+
+    def __init__(self, retry_budget: int = RETRY_BUDGET, acquire_timeout: float = ACQUIRE_TIMEOUT):
+        self.retry_budget = retry_budget
+        self.acquire_timeout = acquire_timeout
+        self._limiters: Dict[str, AIMDLimiter] = {}
+        self._hedgers: Dict[str, Hedger] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+        self._budget = RetryBudget(retry_budget)
+        self._pool = None
+
+    def start_request(self):
+        """Give the next request a fresh retry budget"""
+        self._budget = RetryBudget(self.retry_budget)
+
+    def limiter(self, model_id: str) -> AIMDLimiter:
+        limiter = self._limiters.get(model_id)
+        if limiter is None:
+            with self._lock:
+                limiter = self._limiters.setdefault(model_id, AIMDLimiter(model_id))
+        return limiter
+
+    def hedger(self, model_id: str) -> Hedger:
+        hedger = self._hedgers.get(model_id)
+        if hedger is None:
+            with self._lock:
+                hedger = self._hedgers.setdefault(model_id, Hedger(model_id))
+        return hedger
+
+    def breaker(self, model_id: str) -> CircuitBreaker:
+        breaker = self._breakers.get(model_id)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(model_id, CircuitBreaker(model_id))
+        return breaker
+
+    def is_available(self, model_id: str) -> bool:
+        """False while the model's breaker is open"""
+        return self.breaker(model_id).state != CircuitBreaker.OPEN
+
+    def call(self, model_id: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run fn(*args, **kwargs) under the model's limiter, retrying
+        throttling and transient errors while the request's budget lasts"""
+        return self._call(model_id, fn, args, kwargs, self.acquire_timeout, self._budget)
+
+    def call_hedged(self, model_id: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Like call(), but send a second identical request if the first is
+        slower than the model's recent p95 (when BEDROCK_HEDGING is on)"""
+        hedger = self.hedger(model_id)
+        delay = hedger.hedge_delay() if HEDGING_ENABLED else None
+        start_time = time.monotonic()
+        if delay is None:
+            result = self.call(model_id, fn, *args, **kwargs)
+            hedger.record(time.monotonic() - start_time)
+            return result
+        
+        futures = lazy_import('concurrent.futures')
+        budget = self._budget
+        pool = self._get_pool()
+        primary = pool.submit(self._call, model_id, fn, args, kwargs, self.acquire_timeout, budget)
+        # The first request to succeed wins. Done-callbacks can run after a
+        # waiter has already woken up, so both this thread and the primary's
+        # callback claim the win under the lock
+        outcome = {'winner': None, 'elapsed': None}
+        outcome_lock = threading.Lock()
+
+        def claim(name) -> Dict[str, Any]:
+            with outcome_lock:
+                if outcome['winner'] is None:
+                    outcome.update(winner=name, elapsed=time.monotonic() - start_time)
+                return dict(outcome)
+
+        def on_primary_done(future):
+            if future.cancelled() or future.exception() is not None:
+                return
+            latency = time.monotonic() - start_time
+            hedger.record(latency)
+            won = claim('primary')
+            if won['winner'] == 'hedge':
+                hedger.record_win(saved_seconds=latency - won['elapsed'])
+
+        primary.add_done_callback(on_primary_done)
+        done, _ = futures.wait([primary], timeout=delay)
+        # The hedge only runs if a slot is free right now; it must not add
+        # load to a model that is already at its limit
+        if done or not self.limiter(model_id).has_capacity() or not hedger.try_hedge():
+            return primary.result()
+        
+        launched = threading.Event()
+
+        def hedged_fn(*fn_args, **fn_kwargs):
+            launched.set()
+            return fn(*fn_args, **fn_kwargs)
+
+        def run_hedge():
+            try:
+                return self._call(model_id, hedged_fn, args, kwargs, 0, budget, count_rejection=False)
+            except (BedrockCapacityError, BedrockCircuitOpenError):
+                # Lost the slot (or the breaker opened) since the check
+                if not launched.is_set():
+                    hedger.discard_hedge()
+                raise
+
+        logger.info(f"Hedging {model_id} call after {delay * 1000:.0f}ms")
+        hedge = pool.submit(run_hedge)
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = futures.wait(pending, return_when=futures.FIRST_COMPLETED)
+            for future in sorted(done, key=lambda f: f is not primary):
+                if future.exception() is not None:
+                    if error is None or future is primary:
+                        error = future.exception()
+                    continue
+                winner = claim('primary' if future is primary else 'hedge')['winner']
+                winning, losing = (hedge, primary) if winner == 'hedge' else (primary, hedge)
+                if winner == 'hedge':
+                    hedger.record_win()
+                if losing.cancel() and losing is hedge:
+                    # Still queued, so it never reached Bedrock
+                    hedger.discard_hedge()
+                return winning.result()
+        raise error
+
+    def _get_pool(self):
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = lazy_import('concurrent.futures').ThreadPoolExecutor(
+                        max_workers=HEDGE_WORKERS,
+                        thread_name_prefix='bedrock-hedge'
+                    )
+        return self._pool
+
+    def shutdown(self):
+        """Drop the hedging thread pool; it is recreated on next use"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False)
+
+    def _call(self, model_id: str, fn: Callable[..., Any], args, kwargs,
+              acquire_timeout: float, budget: RetryBudget, count_rejection: bool = True) -> Any:
+        breaker = self.breaker(model_id)
+        if not breaker.allow():
+            raise BedrockCircuitOpenError(f"circuit for {model_id} is {breaker.state}")
+        try:
+            result = self._call_with_retries(model_id, fn, args, kwargs, acquire_timeout, budget,
+                                             count_rejection)
+        except BedrockCapacityError:
+            breaker.abandon()
+            raise
+        except Exception as e:
+            # Only signs of a degraded service count against the breaker;
+            # e.g. a validation error still means Bedrock answered
+            if is_retryable(e):
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            raise
+        breaker.record_success()
+        return result
+
+    def _call_with_retries(self, model_id: str, fn: Callable[..., Any], args, kwargs,
+                           acquire_timeout: float, budget: RetryBudget, count_rejection: bool = True) -> Any:
+        limiter = self.limiter(model_id)
+        attempt = 0
+        while True:
+            limiter.acquire(acquire_timeout, count_rejection)
+            start_time = time.monotonic()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                limiter.release(time.monotonic() - start_time, throttled=is_throttling(e))
+                if not is_retryable(e) or not budget.take():
+                    raise
+                delay = random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * (2 ** attempt)))
+                logger.warning(f"Retrying {model_id} after {error_code(e) or type(e).__name__} "
+                               f"in {delay * 1000:.0f}ms (retry {budget.used}/{budget.limit})")
+                time.sleep(delay)
+                attempt += 1
+                continue
+            limiter.release(time.monotonic() - start_time)
+            return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Retry budget of the current request and state of every model"""
+        with self._lock:
+            limiters = dict(self._limiters)
+            hedgers = dict(self._hedgers)
+            breakers = dict(self._breakers)
+        models = {model_id: limiter.stats() for model_id, limiter in limiters.items()}
+        for model_id, hedger in hedgers.items():
+            models.setdefault(model_id, {})['hedging'] = hedger.stats()
+        for model_id, breaker in breakers.items():
+            models.setdefault(model_id, {})['breaker'] = breaker.stats()
+        return {
+            'retry_budget': self._budget.stats(),
+            'models': models
+        }
@@ -0,0 +1,156 @@
+"""
+Lazy imports and import-time reporting for the Lambda handlers.
+
+Heavy dependencies (opensearchpy, pg8000, boto3) are loaded through
+lazy_import() the first time a code path needs them, so OPTIONS preflights
+and requests that fail validation never pay for them. Each first load is
+timed and can be surfaced in the response metadata.
+
+The module also works as a build-time report: it runs
+``python -X importtime`` against a handler module in a fresh interpreter
+and emits the result as JSON, aggregated per top-level package, so cold-start
+import cost can be tracked from build to build.
+
+Usage:
+    python import_timing.py lambda_function --top 15 --budget-ms 400
+"""
+import argparse
+import importlib
+import json
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+_lazy_import_timings: Dict[str, float] = {}
+_lock = threading.Lock()
+
+# Lines look like: "import time:       412 |       1873 |     opensearchpy.client"
+_IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$')
+
+
+def lazy_import(module_name: str):
+    """Import a module on first use and record how long the first load took"""
+    module = sys.modules.get(module_name)
+    if module is not None:
+        return module
+
+    with _lock:
+        module = sys.modules.get(module_name)
+        if module is None:
+            start_time = time.perf_counter()
+            module = importlib.import_module(module_name)
+            _lazy_import_timings[module_name] = round((time.perf_counter() - start_time) * 1000, 2)
+    return module
+
+
+def pop_lazy_import_timings() -> Dict[str, float]:
+    """Return lazy imports loaded since the last call, in milliseconds"""
+    with _lock:
+        timings = dict(_lazy_import_timings)
+        _lazy_import_timings.clear()
+    return timings
+
+
+def parse_importtime(output: str) -> List[Dict[str, Any]]:
+    """Parse ``python -X importtime`` stderr into structured entries
+
+    Returns one dict per imported module with self and cumulative time in
+    microseconds and its nesting depth in the import tree.
+    """
+    entries = []
+    for line in output.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, module = match.groups()
+        entries.append({
+            'module': module,
+            'self_us': int(self_us),
+            'cumulative_us': int(cumulative_us),
+            'depth': len(indent) // 2
+        })
+    return entries
+
+
+def measure_import(module_name: str, search_path: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Import a module in a fresh interpreter with -X importtime and parse the result"""
+    env = dict(os.environ)
+    if search_path:
+        env['PYTHONPATH'] = os.pathsep.join(filter(None, [search_path, env.get('PYTHONPATH')]))
+
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module_name}'],
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=search_path or None
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing {module_name} failed:\n{completed.stderr[-2000:]}")
+    return parse_importtime(completed.stderr)
+
+
+def build_report(module_name: str, entries: List[Dict[str, Any]], top: int = 15,
+                 budget_ms: Optional[float] = None) -> Dict[str, Any]:
+    """Summarise importtime entries into a per-package cold-start report"""
+    packages: Dict[str, Dict[str, Any]] = {}
+    for entry in entries:
+        package = entry['module'].split('.', 1)[0]
+        summary = packages.setdefault(package, {'package': package, 'self_ms': 0.0, 'modules': 0})
+        summary['self_ms'] += entry['self_us'] / 1000
+        summary['modules'] += 1
+
+    for summary in packages.values():
+        summary['self_ms'] = round(summary['self_ms'], 2)
+
+    target = next((e for e in reversed(entries) if e['module'] == module_name), None)
+    total_ms = round((target['cumulative_us'] if target else sum(e['self_us'] for e in entries)) / 1000, 2)
+
+    report = {
+        'module': module_name,
+        'python': sys.version.split()[0],
+        'total_ms': total_ms,
+        'module_count': len(entries),
+        'packages': sorted(packages.values(), key=lambda p: p['self_ms'], reverse=True)[:top],
+        'slowest_modules': [
+            {'module': e['module'], 'self_ms': round(e['self_us'] / 1000, 2),
+             'cumulative_ms': round(e['cumulative_us'] / 1000, 2)}
+            for e in sorted(entries, key=lambda e: e['self_us'], reverse=True)[:top]
+        ]
+    }
+    if budget_ms is not None:
+        report['budget_ms'] = budget_ms
+        report['over_budget'] = total_ms > budget_ms
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Report import-time cost of a Lambda handler module')
+    parser.add_argument('module', nargs='?', default='lambda_function', help='Module to import')
+    parser.add_argument('--path', default=os.path.dirname(os.path.abspath(__file__)),
+                        help='Directory to import the module from (default: this directory)')
+    parser.add_argument('--top', type=int, default=15, help='Number of packages and modules to list')
+    parser.add_argument('--budget-ms', type=float, default=None,
+                        help='Exit with status 1 if total import time exceeds this budget')
+    parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+    args = parser.parse_args(argv)
+
+    entries = measure_import(args.module, args.path)
+    report = build_report(args.module, entries, top=args.top, budget_ms=args.budget_ms)
+
+    report_json = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(report_json)
+    else:
+        print(report_json)
+
+    return 1 if report.get('over_budget') else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,275 @@
+"""
+Deterministic fast-path parser for job descriptions.
+
+Many of the JDs we receive are templated ("Job Title: ...", "5+ years of
+experience", a bulleted requirements list), and for those the LLM extraction
+adds latency without adding information. JDParser extracts the same fields
+as the LLM tool call with a single scan of the text:
+
+- job_title: a labelled "Title:" line, a "looking for a ..." phrase or a
+  title-like first line
+- required_experience: the minimum of ranges ("5-7 years"), open ranges
+  ("5+ years", "at least 5 years") and "N years of experience" mentions
+- required_education, seniority_level, job_type
+- required_skills and nice_to_have_skills from a fixed skill vocabulary,
+  split by "Requirements" / "Nice to have" style section headers
+
+Every field gets a confidence score in [0, 1] and the result carries a
+weighted overall confidence, which callers compare with a threshold to
+decide whether the LLM is needed at all.
+
+All patterns are compiled when the parser is built, so build it once per
+container.
+"""
+import re
+from typing import Any, Dict, Iterable, Mapping, Optional
+
+# Vocabulary words that are also ordinary English; they only count as
+# skills when written with a capital letter ("REST", "Excel", "Less")
+AMBIGUOUS_SKILLS = frozenset({
+    'rest', 'word', 'excel', 'less', 'chef', 'puppet', 'unity', 'swift',
+    'spring', 'apache', 'dynamics', 'ai', 'api', 'ts', 'py', 'js'
+})
+
+# Relative weight of each field in the overall confidence
+FIELD_WEIGHTS = {
+    'required_skills': 0.35,
+    'job_title': 0.2,
+    'required_experience': 0.2,
+    'seniority_level': 0.1,
+    'required_education': 0.075,
+    'job_type': 0.075
+}
+
+_YEARS = r'(?:years?|yrs?)'
+
+_EDUCATION_LEVELS = [
+    # (pattern, label, rank) - a lower rank is a lower degree
+    (r'high\s+school|ged', 'High school', 0),
+    (r"associate(?:'s|s)?\s+degree", "Associate's", 1),
+    (r"bachelor(?:'s|s)?|b\.?\s?s\.?c?\b|b\.?\s?a\.?\b|b\.?\s?tech|b\.?\s?e\.?\b|undergraduate\s+degree", "Bachelor's", 2),
+    (r"master(?:'s|s)?|m\.?\s?s\.?c?\b|mba|m\.?\s?tech|graduate\s+degree", "Master's", 3),
+    (r'ph\.?\s?d|doctorate|doctoral', 'PhD', 4),
+]
+
+_JOB_TYPES = [
+    (r'full[\s-]?time', 'Full-time'),
+    (r'part[\s-]?time', 'Part-time'),
+    (r'contract[\s-]to[\s-]hire', 'Contract-to-hire'),
+    (r'contract(?:or)?|freelance', 'Contract'),
+    (r'intern(?:ship)?', 'Internship'),
+    (r'temporary', 'Temporary'),
+    (r'remote', 'Remote'),
+    (r'hybrid', 'Hybrid'),
+    (r'on[\s-]?site', 'On-site'),
+]
+
+_SENIORITY_LEVELS = [
+    (r'principal|distinguished|architect', 'Principal'),
+    (r'lead|staff|head\s+of|manager', 'Lead'),
+    (r'senior|sr\.?', 'Senior'),
+    (r'mid[\s-]?level|intermediate', 'Mid-level'),
+    (r'junior|jr\.?|entry[\s-]?level|graduate|associate', 'Junior'),
+]
+
+_ROLE_NOUNS = (
+    r'engineer|developer|programmer|architect|analyst|scientist|manager|'
+    r'designer|administrator|consultant|specialist|lead|director|tester|'
+    r'devops|sre|technician|officer|coordinator|intern'
+)
+
+_REQUIRED_SECTION = r'requirements?|required(?:\s+skills)?|qualifications|must[\s-]haves?|what\s+you(?:\'ll)?\s+(?:need|bring)|skills'
+_NICE_SECTION = r'nice[\s-]to[\s-]haves?|preferred(?:\s+(?:skills|qualifications))?|bonus(?:\s+points)?|pluses|desired(?:\s+skills)?'
+
+
+class JDParseResult:
+    """Fields extracted by JDParser with a confidence score per field"""
+    __slots__ = ('info', 'field_confidence', 'confidence')
+
+    def __init__(self, info: Dict[str, Any], field_confidence: Dict[str, float]):
+        self.info = info
+        self.field_confidence = field_confidence
+        self.confidence = round(sum(FIELD_WEIGHTS[field] * field_confidence.get(field, 0.0)
+                                    for field in FIELD_WEIGHTS), 3)
+
+    def summary(self) -> Dict[str, Any]:
+        """Confidence figures for response metadata"""
+        return {
+            'confidence': self.confidence,
+            'field_confidence': {field: round(value, 2) for field, value in self.field_confidence.items()}
+        }
+
+
+class JDParser:
+    """Single-pass, rule-based job description parser
+
+    Args:
+        skills: Skill vocabulary, lower case
+        aliases: Maps alternative spellings (e.g. 'k8s') to vocabulary names;
+            aliases are matched too
+        ambiguous: Skills that only count when capitalised in the text
+    """
+
+    def __init__(self, skills: Iterable[str], aliases: Optional[Mapping[str, str]] = None,
+                 ambiguous: Iterable[str] = AMBIGUOUS_SKILLS):
+        self.aliases = dict(aliases or {})
+        self.ambiguous = frozenset(ambiguous)
+        vocabulary = set(skills) | set(self.aliases)
+        # Longest first so "react native" wins over "react"
+        skill_alternation = '|'.join(re.escape(skill) for skill in sorted(vocabulary, key=len, reverse=True))
+
+        self._education = [(re.compile(pattern, re.IGNORECASE), label, rank)
+                           for pattern, label, rank in _EDUCATION_LEVELS]
+        self._job_types = [(re.compile(pattern, re.IGNORECASE), label) for pattern, label in _JOB_TYPES]
+        self._seniority = re.compile(
+            '|'.join(rf'\b(?P<s{i}>{pattern})(?!\w)' for i, (pattern, _) in enumerate(_SENIORITY_LEVELS)),
+            re.IGNORECASE
+        )
+        self._role_noun = re.compile(rf'\b(?:{_ROLE_NOUNS})s?\b', re.IGNORECASE)
+
+        # One alternation for everything found in the body; finditer walks
+        # the text once and the named group says what matched
+        self._scanner = re.compile(
+            '|'.join([
+                rf'(?m:^[ \t]*(?:job\s+title|title|position|role)[ \t]*[:\-][ \t]*(?P<title>[^\n]{{3,100}}))',
+                rf'(?m:^[ \t#*_-]*(?:(?P<nice_section>{_NICE_SECTION})|(?P<req_section>{_REQUIRED_SECTION}))[ \t*_]*:?[ \t*_]*$)',
+                r'(?:looking\s+for|hiring|seeking)\s+(?:an?\s+)?(?P<title_phrase>(?-i:[A-Z][\w/+#.-]*(?:[ \t]+[A-Z][\w/+#.-]*){0,5}))',
+                rf'(?P<exp_lo>\d{{1,2}})\s*(?:-|–|to)\s*(?P<exp_hi>\d{{1,2}})\s*\+?\s*{_YEARS}',
+                rf'(?P<exp_plus>\d{{1,2}})\s*\+\s*{_YEARS}',
+                rf'(?:minimum|at\s+least|min\.?)\s+(?:of\s+)?(?P<exp_min>\d{{1,2}})\s*{_YEARS}',
+                rf'(?P<exp_n>\d{{1,2}})\s*{_YEARS}(?:\s+of)?(?:\s+[\w/+#.-]+){{0,3}}?\s+experience',
+                rf'\b(?P<edu>{"|".join(pattern for pattern, _, _ in _EDUCATION_LEVELS)})',
+                rf'(?<!\w)(?P<job_type>{"|".join(pattern for pattern, _ in _JOB_TYPES)})(?!\w)',
+                r'(?P<degree>\bdegree\b)',
+                rf'(?<![\w+#./-])(?P<skill>{skill_alternation})(?![\w+#]|\.\w)',
+            ]),
+            re.IGNORECASE
+        )
+
+    def parse(self, text: str) -> JDParseResult:
+        """Extract the JD fields from text in one scan"""
+        labelled_title = None
+        phrase_title = None
+        experience = []
+        education_rank = None
+        saw_degree = False
+        job_types = []
+        required_skills = []
+        nice_skills = []
+        section = None
+        saw_required_section = False
+
+        for match in self._scanner.finditer(text):
+            kind = match.lastgroup
+            value = match.group(kind)
+            if kind == 'skill':
+                if value.lower() in self.ambiguous and not value[0].isupper():
+                    continue
+                skill = self.aliases.get(value.lower(), value.lower())
+                target = nice_skills if section == 'nice' else required_skills
+                if skill not in required_skills and skill not in nice_skills:
+                    target.append(skill)
+            elif kind in ('exp_lo', 'exp_hi'):
+                low, high = int(match.group('exp_lo')), int(match.group('exp_hi'))
+                if low <= high:
+                    experience.append((low, high))
+            elif kind in ('exp_plus', 'exp_min', 'exp_n'):
+                experience.append((int(value), None))
+            elif kind == 'req_section':
+                section = 'required'
+                saw_required_section = True
+            elif kind == 'nice_section':
+                section = 'nice'
+            elif kind == 'title' and labelled_title is None:
+                labelled_title = value.strip()
+            elif kind == 'title_phrase' and phrase_title is None:
+                phrase_title = value.strip()
+            elif kind == 'edu':
+                rank = next(rank for pattern, _, rank in self._education if pattern.fullmatch(value))
+                education_rank = rank if education_rank is None else min(education_rank, rank)
+            elif kind == 'degree':
+                saw_degree = True
+            elif kind == 'job_type':
+                label = next(label for pattern, label in self._job_types if pattern.fullmatch(value))
+                if label not in job_types:
+                    job_types.append(label)
+
+        info = {}
+        confidence = {}
+
+        info['job_title'], confidence['job_title'] = self._pick_title(text, labelled_title, phrase_title)
+
+        if experience:
+            # The strictest requirement mentioned is the one that applies
+            required_years = max(low for low, _ in experience)
+            info['required_experience'] = required_years
+            ranges = [(low, high) for low, high in experience if high is not None and low == required_years]
+            if ranges:
+                info['experience_range'] = {'min': ranges[0][0], 'max': ranges[0][1]}
+            distinct = {low for low, _ in experience}
+            confidence['required_experience'] = 0.9 if len(distinct) == 1 else 0.75
+        else:
+            info['required_experience'] = 0
+            confidence['required_experience'] = 0.3
+
+        info['seniority_level'], confidence['seniority_level'] = self._pick_seniority(
+            info['job_title'], info['required_experience'] if experience else None)
+
+        if education_rank is not None:
+            info['required_education'] = next(label for _, label, rank in self._education if rank == education_rank)
+            confidence['required_education'] = 0.9
+        elif saw_degree:
+            info['required_education'] = "Bachelor's"
+            confidence['required_education'] = 0.6
+        else:
+            info['required_education'] = 'Not specified'
+            confidence['required_education'] = 0.5
+
+        info['job_type'] = ', '.join(job_types) if job_types else 'Not specified'
+        confidence['job_type'] = 0.9 if job_types else 0.5
+
+        info['required_skills'] = required_skills
+        info['nice_to_have_skills'] = nice_skills
+        confidence['required_skills'] = self._skills_confidence(len(required_skills), saw_required_section)
+
+        return JDParseResult(info, confidence)
+
+    def _pick_title(self, text: str, labelled: Optional[str], phrase: Optional[str]):
+        if labelled:
+            return labelled, 0.95
+        first_line = next((line.strip(' \t#*-') for line in text.splitlines() if line.strip()), '')
+        if first_line and len(first_line) <= 80 and len(first_line.split()) <= 10 \
+                and not first_line.endswith('.') and self._role_noun.search(first_line):
+            return first_line, 0.85
+        if phrase and self._role_noun.search(phrase):
+            return phrase, 0.75
+        if first_line:
+            return first_line[:100], 0.3
+        return 'Not specified', 0.0
+
+    def _pick_seniority(self, title: str, years: Optional[int]):
+        match = self._seniority.search(title)
+        if match:
+            return _SENIORITY_LEVELS[int(match.lastgroup[1:])][1], 0.95
+        if years is None:
+            return 'Not specified', 0.4
+        if years < 2:
+            return 'Junior', 0.7
+        if years < 5:
+            return 'Mid-level', 0.7
+        if years < 8:
+            return 'Senior', 0.7
+        return 'Lead', 0.6
+
+    @staticmethod
+    def _skills_confidence(count: int, in_section: bool) -> float:
+        if count >= 5:
+            score = 0.9
+        elif count >= 3:
+            score = 0.75
+        elif count >= 1:
+            score = 0.4
+        else:
+            return 0.0
+        return min(1.0, score + (0.05 if in_section else 0.0))
+
@@ -0,0 +1,214 @@
+"""
+Optional DynamoDB-backed second-tier cache shared by all containers.
+
+The in-process caches only help the warm container that filled them; under
+bursty load every new container would call Bedrock again for the same JD.
+L2Cache sits behind those caches:
+
+- Reads are read-through: a local miss looks the key up in DynamoDB with
+  BatchGetItem and a short timeout. Any error is treated as a miss.
+- Writes are write-behind: put() only enqueues the item. A daemon thread
+  drains the queue with BatchWriteItem, so the cache never adds to a
+  request's critical path. Handlers call flush() with a short timeout before
+  returning, because Lambda freezes the container (and the writer thread)
+  once the response is sent. Writes that miss that window complete on the
+  next invocation, or are lost with the container, which is acceptable for
+  a cache.
+
+Items carry an ``expires_at`` epoch-seconds attribute. Enable DynamoDB TTL on
+that attribute to have expired items deleted. Because TTL deletion lags,
+reads also ignore expired items.
+
+Table layout (partition key only):
+    cache_key  (S)  "<namespace>#<key>"
+    value      (B)  cached bytes, encoded by the caller
+    expires_at (N)  expiry time, the table's TTL attribute
+
+Environment variables:
+- L2_CACHE_TABLE: table name; the cache is disabled when unset
+- L2_CACHE_ENDPOINT: endpoint URL override, e.g. http://localhost:8000 for
+  DynamoDB Local
+- L2_CACHE_REGION: region of the table (default AWS_REGION)
+- L2_CACHE_TIMEOUT: connect/read timeout in seconds for reads (default 0.5)
+- L2_CACHE_FLUSH_TIMEOUT: seconds a handler waits for queued writes before
+  returning (default 0.25)
+"""
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from aws_clients import get_client
+
+logger = logging.getLogger()
+
+L2_CACHE_TABLE = os.environ.get('L2_CACHE_TABLE', '')
+L2_CACHE_ENDPOINT = os.environ.get('L2_CACHE_ENDPOINT') or None
+L2_CACHE_REGION = os.environ.get('L2_CACHE_REGION', os.environ.get('AWS_REGION', 'us-east-1'))
+L2_CACHE_TIMEOUT = float(os.environ.get('L2_CACHE_TIMEOUT', '0.5'))
+L2_CACHE_FLUSH_TIMEOUT = float(os.environ.get('L2_CACHE_FLUSH_TIMEOUT', '0.25'))
+
+# DynamoDB API limits
+_BATCH_GET_LIMIT = 100
+_BATCH_WRITE_LIMIT = 25
+_MAX_UNPROCESSED_RETRIES = 3
+
+
+class L2Cache:
+    """Read-through, write-behind cache backed by a DynamoDB table"""
+
+    def __init__(self, table_name: str = L2_CACHE_TABLE, endpoint_url: Optional[str] = L2_CACHE_ENDPOINT,
+                 region_name: str = L2_CACHE_REGION, timeout: float = L2_CACHE_TIMEOUT):
+        self.table_name = table_name
+        self.endpoint_url = endpoint_url
+        self.region_name = region_name
+        self.timeout = timeout
+        self._queue: 'queue.Queue[Tuple[str, bytes, int]]' = queue.Queue()
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.writes = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.table_name)
+
+    def _client(self):
+        # One attempt with short timeouts: a slow L2 read must never cost
+        # more than the Bedrock call it is meant to save
+        return get_client(
+            'dynamodb',
+            self.region_name,
+            endpoint_url=self.endpoint_url,
+            connect_timeout=self.timeout,
+            read_timeout=self.timeout,
+            retries={'mode': 'standard', 'total_max_attempts': 1}
+        )
+
+    @staticmethod
+    def _item_key(namespace: str, key: str) -> str:
+        return f"{namespace}#{key}"
+
+    def get(self, namespace: str, key: str) -> Optional[bytes]:
+        """Return the cached bytes for key, or None on a miss"""
+        return self.get_many([(namespace, key)]).get((namespace, key))
+
+    def get_many(self, keys: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], bytes]:
+        """Look up several (namespace, key) pairs with BatchGetItem
+
+        The pairs may span namespaces, so one round trip can serve lookups
+        of different kinds. Missing keys are omitted from the result.
+        """
+        keys = list(dict.fromkeys(keys))
+        if not self.enabled or not keys:
+            return {}
+
+        found: Dict[Tuple[str, str], bytes] = {}
+        by_item_key = {self._item_key(namespace, key): (namespace, key) for namespace, key in keys}
+        now = int(time.time())
+        try:
+            client = self._client()
+            item_keys = list(by_item_key)
+            for start in range(0, len(item_keys), _BATCH_GET_LIMIT):
+                request = {self.table_name: {
+                    'Keys': [{'cache_key': {'S': item_key}} for item_key in item_keys[start:start + _BATCH_GET_LIMIT]],
+                    'ProjectionExpression': 'cache_key, #v, expires_at',
+                    'ExpressionAttributeNames': {'#v': 'value'}
+                }}
+                for attempt in range(_MAX_UNPROCESSED_RETRIES):
+                    response = client.batch_get_item(RequestItems=request)
+                    for item in response.get('Responses', {}).get(self.table_name, []):
+                        # DynamoDB TTL deletes lazily, so check expiry ourselves
+                        if int(item.get('expires_at', {}).get('N', '0')) <= now:
+                            continue
+                        key = by_item_key.get(item['cache_key']['S'])
+                        if key is not None:
+                            found[key] = item['value']['B']
+                    request = response.get('UnprocessedKeys') or {}
+                    if not request:
+                        break
+                    time.sleep(0.05 * (2 ** attempt))
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"L2 cache read failed, treating as miss: {str(e)}")
+
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def put(self, namespace: str, key: str, value: bytes, ttl_seconds: float):
+        """Queue value for writing; returns immediately"""
+        if not self.enabled:
+            return
+        self._queue.put((self._item_key(namespace, key), value, int(time.time() + ttl_seconds)))
+        self._ensure_writer()
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until queued writes are done; returns False on timeout"""
+        deadline = time.time() + timeout
+        while self._queue.unfinished_tasks:
+            if time.time() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def _ensure_writer(self):
+        if self._writer is not None and self._writer.is_alive():
+            return
+        with self._writer_lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(target=self._write_loop, name='l2-cache-writer', daemon=True)
+                self._writer.start()
+
+    def _write_loop(self):
+        while True:
+            batch = [self._queue.get()]
+            # Collect whatever else is already queued, up to one request's worth
+            while len(batch) < _BATCH_WRITE_LIMIT:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._write_batch(batch)
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"L2 cache write of {len(batch)} items failed: {str(e)}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write_batch(self, batch: List[Tuple[str, bytes, int]]):
+        # Later writes of the same key win; BatchWriteItem rejects duplicates
+        items = {item_key: (value, expires_at) for item_key, value, expires_at in batch}
+        request = {self.table_name: [
+            {'PutRequest': {'Item': {
+                'cache_key': {'S': item_key},
+                'value': {'B': value},
+                'expires_at': {'N': str(expires_at)}
+            }}}
+            for item_key, (value, expires_at) in items.items()
+        ]}
+        client = self._client()
+        for attempt in range(_MAX_UNPROCESSED_RETRIES):
+            response = client.batch_write_item(RequestItems=request)
+            request = response.get('UnprocessedItems') or {}
+            if not request:
+                break
+            time.sleep(0.05 * (2 ** attempt))
+        else:
+            logger.warning(f"L2 cache dropped {len(request.get(self.table_name, []))} unprocessed writes")
+        self.writes += len(items)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'errors': self.errors,
+            'writes': self.writes,
+            'pending_writes': self._queue.unfinished_tasks
+        }
@@ -9,10 +9,12 @@ Model Usage:
   (typically amazon.titan-embed-text-v2:0)
 - MODEL_ID (accessed via BEDROCK_MODEL_ID): Used exclusively for LLM-based parsing and analysis
   (typically anthropic.claude-*, meta.llama-*, etc.)
+- JD_MODEL_TIERS: Optional comma-separated models tried in order for JD
+  extraction, cheapest first (defaults to MODEL_ID alone)
 
 Key Functions:
 - lambda_handler: Main entry point for AWS Lambda
-- vector_search: Performs semantic search with optional reranking
+- hybrid_search: Combines kNN and keyword search, then reranks the hits
 - generate_embedding: Creates vector embeddings for text using BEDROCK_EMBEDDINGS_MODEL
 - analyze_jd: Extracts structured information from job descriptions using MODEL_ID
 - extract_skills_llm: Extracts skills from text using MODEL_ID
@@ -20,21 +22,27 @@ Key Functions:
 """
 import json
 import os
+import copy
+import html
 import math
-import boto3
 from datetime import datetime, timedelta
 import logging
 import re
 from typing import Dict, Any, List, Optional, Union
-from opensearchpy import OpenSearch, RequestsHttpConnection, AWSV4SignerAuth
-from requests_aws4auth import AWS4Auth
 import hashlib
 import time
 import random
-import concurrent.futures
-from concurrent.futures import ThreadPoolExecutor, TimeoutError
-import pg8000
+import select
 import uuid
+from array import array
+from aws_clients import get_client, get_session, reset_clients
+from snapstart import before_snapshot, after_restore, reseed_random
+# Heavy dependencies (opensearchpy, pg8000, boto3) are loaded on first use
+from import_timing import lazy_import, pop_lazy_import_timings
+from lru_cache import LRUTTLCache, MISSING
+from l2_cache import L2_CACHE_FLUSH_TIMEOUT, L2Cache
+from jd_parser import JDParser
+from bedrock_control import BedrockController, BedrockCapacityError, BedrockCircuitOpenError, error_code, is_throttling
 
 # VERY DISTINCTIVE START MARKER
 # print("!!!!!! LAMBDA LOADING - V5-SUPER-DIAGNOSTIC-MODE !!!!!!")
@@ -66,7 +74,7 @@ def validate_environment():
         raise EnvironmentError(f"Missing required environment variables: {', '.join(missing_vars)}")
     
     # Log warning if MODEL_ID is missing
-    if not os.environ.get('MODEL_ID'):
+    if not os.environ.get('MODEL_ID') and not os.environ.get('JD_MODEL_TIERS'):
         logger.warning("MODEL_ID environment variable not set - LLM functionality will use fallbacks")
     
     # Log warning if BEDROCK_EMBEDDINGS_MODEL is not set
@@ -82,6 +90,7 @@ def validate_environment():
     logger.info(f"Bedrock Configuration:")
     logger.info(f"- Embedding Model: {os.environ.get('BEDROCK_EMBEDDINGS_MODEL', 'amazon.titan-embed-text-v2:0')}")
     logger.info(f"- LLM Model: {os.environ.get('MODEL_ID', 'Not set')}")
+    logger.info(f"- JD Model Tiers: {os.environ.get('JD_MODEL_TIERS', 'Not set')}")
     
     logger.info("Environment variables validated")
     
@@ -111,16 +120,29 @@ logger.info(f"OpenSearch index: {OPENSEARCH_INDEX}")
 BEDROCK_EMBEDDINGS_MODEL = os.environ.get('BEDROCK_EMBEDDINGS_MODEL', 'amazon.titan-embed-text-v2:0')
 # MODEL_ID (accessed via BEDROCK_MODEL_ID) is used ONLY for LLM-based parsing (JD analysis, skill extraction)
 BEDROCK_MODEL_ID = os.environ.get('MODEL_ID')
+# JD extraction models, cheapest first; later tiers only see JDs the earlier
+# ones answered invalidly or with low confidence
+JD_MODEL_TIERS = [model.strip() for model in os.environ.get('JD_MODEL_TIERS', '').split(',') if model.strip()] \
+    or ([BEDROCK_MODEL_ID] if BEDROCK_MODEL_ID else [])
+_JD_TIER_MIN_CONFIDENCE = float(os.environ.get('JD_TIER_MIN_CONFIDENCE', '0.6'))
+# Vector size of the resume_embedding field (Titan v2 default)
+EMBEDDING_DIMENSIONS = int(os.environ.get('EMBEDDING_DIMENSIONS', '1024'))
 
-# Enhance embedding cache with expiry time
-_embedding_cache = {}
-_embedding_cache_timestamps = {}
-_CACHE_EXPIRY_SECONDS = 3600  # Cache expires after 1 hour
+# OpenSearch client kept alive across warm invocations
+_opensearch_client = None
+_opensearch_index_health = {'checked_at': 0.0, 'exists': None}
+_INDEX_HEALTH_TTL_SECONDS = int(os.environ.get('OPENSEARCH_INDEX_HEALTH_TTL', '300'))
+
+# Query embeddings, bounded by total size rather than entry count
+_EMBEDDING_CACHE_MAX_BYTES = int(os.environ.get('EMBEDDING_CACHE_MAX_BYTES', str(32 * 1024 * 1024)))
+_EMBEDDING_CACHE_MAX_ENTRIES = int(os.environ.get('EMBEDDING_CACHE_MAX_ENTRIES', '10000'))
+_EMBEDDING_CACHE_TTL_SECONDS = float(os.environ.get('EMBEDDING_CACHE_TTL', '3600'))
+# Stands in for the query vector in a serialised search body
+_QUERY_VECTOR_PLACEHOLDER = '__query_vector__'
 
 # Add analysis cache to avoid redundant LLM calls
-_analysis_cache = {}
-_analysis_cache_timestamps = {}
-_ANALYSIS_CACHE_EXPIRY = 86400  # Analysis cache expires after 1 day
+_ANALYSIS_CACHE_EXPIRY = int(os.environ.get('JD_ANALYSIS_CACHE_TTL', '86400'))  # 1 day by default
+_ANALYSIS_CACHE_MAX_ENTRIES = int(os.environ.get('JD_ANALYSIS_CACHE_MAX_ENTRIES', '2000'))
 
 # PostgreSQL configuration
 DB_HOST = os.environ.get('DB_HOST')
@@ -129,6 +151,63 @@ DB_NAME = os.environ.get('DB_NAME', 'resume_parser')
 DB_USER = os.environ.get('DB_USER')
 DB_PASSWORD = os.environ.get('DB_PASSWORD')
 
+# PostgreSQL connection kept alive across warm invocations
+_db_connection = None
+_db_connection_created_at = 0.0
+_DB_CONNECTION_MAX_AGE_SECONDS = int(os.environ.get('DB_CONNECTION_MAX_AGE', '3600'))
+
+# Single PII lookup statement for any number of IDs. Prepared once per
+# connection; pg8000 uses :name placeholders for prepared statements
+PII_LOOKUP_SQL = """
+    SELECT 
+        resume_id,
+        name,
+        email,
+        phone_number,
+        address,
+        linkedin_url,
+        s3_bucket,
+        s3_key,
+        original_filename,
+        file_type
+    FROM resume_pii 
+    WHERE resume_id = ANY(CAST(:resume_ids AS uuid[]))
+"""
+_pii_statement = None
+
+# Read-through PII cache keyed by resume_id. A cached None means the ID was
+# looked up and has no PII row; those entries expire sooner so newly
+# processed resumes show up quickly.
+_PII_CACHE_MAX_ENTRIES = int(os.environ.get('PII_CACHE_MAX_ENTRIES', '5000'))
+_PII_CACHE_TTL_SECONDS = float(os.environ.get('PII_CACHE_TTL', '300'))
+_PII_NEGATIVE_CACHE_TTL_SECONDS = float(os.environ.get('PII_NEGATIVE_CACHE_TTL', '60'))
+_pii_cache = LRUTTLCache(_PII_CACHE_MAX_ENTRIES, _PII_CACHE_TTL_SECONDS, name='pii')
+_analysis_cache = LRUTTLCache(_ANALYSIS_CACHE_MAX_ENTRIES, _ANALYSIS_CACHE_EXPIRY, name='jd_analysis')
+
+# Optional DynamoDB tier behind the embedding and JD analysis caches, shared
+# by all containers (disabled unless L2_CACHE_TABLE is set)
+_l2_cache = L2Cache()
+
+# Per-model AIMD concurrency limits, latency hedging and the per-request
+# retry budget for every Bedrock call made by this container
+_bedrock_controller = BedrockController()
+
+# Shared worker pool for overlapping I/O-bound work within a request
+_executor = None
+_EXECUTOR_MAX_WORKERS = int(os.environ.get('SEARCH_WORKER_THREADS', '8'))
+
+# Upper bound for a warm-up invocation
+_PREWARM_TIMEOUT_SECONDS = float(os.environ.get('PREWARM_TIMEOUT_SECONDS', '10'))
+
+# Speculative retrieval: search with a pattern-based JD analysis while the
+# LLM analysis is still running, and keep those hits if the two agree
+_SPECULATIVE_RETRIEVAL = os.environ.get('SPECULATIVE_RETRIEVAL', 'true').lower() == 'true'
+_SPECULATIVE_CONFIRM_THRESHOLD = float(os.environ.get('SPECULATIVE_CONFIRM_THRESHOLD', '0.5'))
+
+# JDs the rule-based parser handles with at least this confidence skip the
+# LLM entirely (set above 1 to always call the LLM)
+_JD_FAST_PATH_THRESHOLD = float(os.environ.get('JD_FAST_PATH_THRESHOLD', '0.85'))
+
 def get_aws_credentials():
     """Return AWS credentials for services to use"""
     credentials = {}
@@ -136,11 +215,106 @@ def get_aws_credentials():
     credentials['aws_secret_access_key'] = os.environ.get('AWS_SECRET_ACCESS_KEY')
     return credentials
 
-def get_opensearch_client():
-    """Create and return an OpenSearch client"""
+def get_executor():
+    """Return the container-wide thread pool, creating it on first use"""
+    global _executor
+    if _executor is None:
+        futures = lazy_import('concurrent.futures')
+        _executor = futures.ThreadPoolExecutor(
+            max_workers=_EXECUTOR_MAX_WORKERS,
+            thread_name_prefix='search-worker'
+        )
+    return _executor
+
+def get_opensearch_client(metrics: Optional[Dict[str, Any]] = None):
+    """Return the container-wide OpenSearch client, creating it on first use
+    
+    The client (and its TLS connection pool) is kept at module scope so warm
+    invocations skip the handshake. It is only rebuilt after
+    reset_opensearch_client() has been called for a real connection failure.
+    
+    Args:
+        metrics: Optional dict that receives 'opensearch_connection_reused'
+    """
+    global _opensearch_client
+    
+    client = _opensearch_client
+    reused = client is not None
+    if client is None:
+        client = _create_opensearch_client()
+        _opensearch_client = client
+    
+    if metrics is not None:
+        metrics['opensearch_connection_reused'] = reused
+    
+    try:
+        check_index_health(client)
+    except Exception as e:
+        if _is_connection_failure(e):
+            reset_opensearch_client(f"index health check failed: {str(e)}")
+        raise e
+    
+    return client
+
+def reset_opensearch_client(reason: str = ""):
+    """Drop the cached OpenSearch client so the next call builds a new one"""
+    global _opensearch_client
+    
+    if _opensearch_client is not None:
+        logger.warning(f"Discarding cached OpenSearch client: {reason}")
+        try:
+            _opensearch_client.transport.close()
+        except Exception as close_error:
+            logger.debug(f"Error closing OpenSearch transport: {str(close_error)}")
+    _opensearch_client = None
+    _opensearch_index_health['checked_at'] = 0.0
+
+def _is_connection_failure(error: Exception) -> bool:
+    """Return True if the error means the underlying connection is unusable"""
+    # ConnectionTimeout and SSLError are subclasses of ConnectionError
+    exceptions = lazy_import('opensearchpy.exceptions')
+    return isinstance(error, exceptions.ConnectionError)
+
+def check_index_health(client) -> bool:
+    """Verify the search index is reachable, caching the result for a TTL
+    
+    Returns True if the index exists. A missing index is cached as well so a
+    misconfigured deployment does not pay for the check on every request.
+    """
+    current_time = time.time()
+    if (_opensearch_index_health['checked_at'] and
+        current_time - _opensearch_index_health['checked_at'] < _INDEX_HEALTH_TTL_SECONDS):
+        return _opensearch_index_health['exists']
+    
+    try:
+        logger.info(f"Verifying index existence: {OPENSEARCH_INDEX}")
+        index_exists = bool(client.indices.exists(index=OPENSEARCH_INDEX))
+    except Exception as idx_error:
+        if _is_connection_failure(idx_error):
+            raise idx_error
+        logger.warning(f"Index check failed: {str(idx_error)}")
+        
+        # Try direct HTTP request to root endpoint as fallback
+        logger.info("Trying direct HTTP GET request to '/'")
+        client.transport.perform_request('GET', '/')
+        logger.info(f"Connection successful, but index may not exist")
+        index_exists = False
+    
+    if index_exists:
+        logger.info(f"Successfully verified index exists: {OPENSEARCH_INDEX}")
+    else:
+        logger.error(f"Index does not exist: {OPENSEARCH_INDEX}")
+    
+    _opensearch_index_health['exists'] = index_exists
+    _opensearch_index_health['checked_at'] = current_time
+    return index_exists
+
+def _create_opensearch_client():
+    """Create a new OpenSearch client with retry logic"""
+    opensearchpy = lazy_import('opensearchpy')
+    
     max_retries = 3
     retry_delay = 1  # starting delay in seconds
-    last_exception = None
     
     # Only log essential environment variables - remove the verbose logging
     logger.info("OpenSearch Configuration:")
@@ -157,21 +331,15 @@ def get_opensearch_client():
                 service = 'es'
                 logger.info(f"Using 'es' service name for standard OpenSearch")
             
-            # Create AWS auth for OpenSearch
-            session = boto3.Session()
-            credentials = session.get_credentials()
+            # Pass the botocore credentials object itself rather than frozen keys,
+            # so the signer picks up refreshed credentials on every request
+            credentials = get_session().get_credentials()
             
             if credentials is None:
                 logger.error("AWS credentials not available - cannot authenticate to OpenSearch")
                 raise ValueError("No AWS credentials available")
             
-            auth = AWS4Auth(
-                credentials.access_key,
-                credentials.secret_key,
-                OPENSEARCH_REGION,
-                service,
-                session_token=credentials.token
-            )
+            auth = opensearchpy.AWSV4SignerAuth(credentials, OPENSEARCH_REGION, service)
             
             # Extract the domain name from the endpoint if it's a full URL
             host = OPENSEARCH_ENDPOINT
@@ -180,48 +348,22 @@ def get_opensearch_client():
             
             # Create OpenSearch client
             logger.info(f"Creating OpenSearch client with host: {host}")
-            client = OpenSearch(
+            client = opensearchpy.OpenSearch(
                 hosts=[{'host': host, 'port': 443}],
                 http_auth=auth,
                 use_ssl=True,
                 verify_certs=True,
-                connection_class=RequestsHttpConnection,
+                connection_class=opensearchpy.RequestsHttpConnection,
                 retry_on_timeout=True,
                 max_retries=3,
                 timeout=30
             )
             
-            # Test specific index availability directly rather than general health checks
-            try:
-                # Check if the index exists directly
-                logger.info(f"Verifying index existence: {OPENSEARCH_INDEX}")
-                index_exists = client.indices.exists(index=OPENSEARCH_INDEX)
-                
-                if index_exists:
-                    logger.info(f"Successfully verified index exists: {OPENSEARCH_INDEX}")
-                    return client
-                else:
-                    logger.error(f"Index does not exist: {OPENSEARCH_INDEX}")
-                    raise ValueError(f"Index {OPENSEARCH_INDEX} not found")
-                    
-            except Exception as idx_error:
-                logger.warning(f"Index check failed: {str(idx_error)}")
-                
-                # Try direct HTTP request to root endpoint as fallback
-                try:
-                    logger.info("Trying direct HTTP GET request to '/'")
-                    raw_response = client.transport.perform_request(
-                        'GET',
-                        '/'
-                    )
-                    logger.info(f"Connection successful, but index may not exist")
-                    return client
-                except Exception as direct_error:
-                    logger.warning(f"Direct HTTP request failed: {str(direct_error)}")
-                    raise direct_error
+            # Fail fast here if the endpoint cannot be reached at all
+            check_index_health(client)
+            return client
             
         except Exception as e:
-            last_exception = e
             if attempt == max_retries - 1:  # Last attempt
                 logger.error(f"All {max_retries} OpenSearch connection attempts failed: {str(e)}")
                 if "404" in str(e):
@@ -237,13 +379,14 @@ def get_opensearch_client():
             time.sleep(wait_time)
 
 def get_bedrock_client():
-    """Create and return a Bedrock client"""
+    """Return the shared Bedrock runtime client for this container
+    
+    botocore retries are off; _bedrock_controller retries throttling itself
+    so it can adjust concurrency and charge the request's retry budget.
+    """
     try:
-        session = boto3.Session()
-        return session.client(
-            service_name='bedrock-runtime', 
-            region_name=OPENSEARCH_REGION
-        )
+        return get_client('bedrock-runtime', OPENSEARCH_REGION,
+                          retries={'mode': 'standard', 'total_max_attempts': 1})
     except Exception as e:
         logger.error(f"Error creating Bedrock client: {str(e)}")
         # Add specific error handling for common Bedrock issues
@@ -253,64 +396,143 @@ def get_bedrock_client():
             logger.error("Bedrock resource not found - check region and model availability")
         raise e
 
+# Skill tables are built once per container rather than on every call
+SKILL_MAPPING = {
+    'js': 'javascript',
+    'react.js': 'react',
+    'reactjs': 'react',
+    'node.js': 'node',
+    'nodejs': 'node',
+    'vue.js': 'vue',
+    'vuejs': 'vue',
+    'py': 'python',
+    'aws cloud': 'aws',
+    'amazon web services': 'aws',
+    'azure cloud': 'azure',
+    'ms azure': 'azure',
+    'google cloud': 'gcp',
+    'google cloud platform': 'gcp',
+    'k8s': 'kubernetes',
+    'next.js': 'nextjs',
+    'postgres': 'postgresql',
+    'mongo': 'mongodb',
+    'ts': 'typescript',
+}
+
+# Common tech skills dictionary - more comprehensive than the basic one in original code
+COMMON_SKILLS = [
+    "python", "java", "javascript", "react", "angular", "node", "aws",
+    "azure", "gcp", "docker", "kubernetes", "sql", "nosql", "mongodb",
+    "postgresql", "mysql", "oracle", "rest", "api", "microservices",
+    "ci/cd", "devops", "agile", "scrum", "git", "machine learning", "ai",
+    "data science", "big data", "hadoop", "spark", "tableau", "power bi",
+    "excel", "word", "powerpoint", "jira", "confluence", "linux", "unix",
+    "windows", "c#", "c++", "ruby", "php", "html", "css", "sass", "less",
+    "typescript", "vue", "redux", "graphql", "django", "flask", "spring",
+    "hibernate", "jenkins", "terraform", "ansible", "puppet", "chef",
+    "blockchain", "ethereum", "solidity", "ios", "android", "swift",
+    "kotlin", "react native", "flutter", "xamarin", "unity", "unreal",
+    "sap", "salesforce", "dynamics", "sharepoint", "azure devops",
+    "aws lambda", "serverless", "kafka", "rabbitmq", "redis", "elasticsearch",
+    "kibana", "logstash", "grafana", "prometheus", "datadog", "new relic",
+    "splunk", "sumo logic", "nginx", "apache", "tomcat", "iis", "weblogic",
+    "websphere", "jboss", "wildfly", "maven", "gradle", "npm", "yarn",
+    "webpack", "babel", "jest", "mocha", "cypress", "selenium", "appium",
+    "junit", "testng", "nunit", "xunit", "pytest", "rspec", "cucumber"
+]
+
+# Precompiled patterns and prompt templates, built once at init (and
+# therefore captured in the SnapStart snapshot)
+_JD_TITLE_PATTERN = re.compile(r'^([^.:\n]{5,100})')
+_EXPERIENCE_PATTERN = re.compile(r'(\d+)(?:\s*[-+]?\s*\d*)?\s+years?\s+(?:of\s+)?experience', re.IGNORECASE)
+_jd_parser = JDParser(COMMON_SKILLS, SKILL_MAPPING)
+# JD extraction is a single Converse call that must answer through this
+# tool. Compact keys keep the output (and therefore latency) small; they are
+# mapped back to the long names used everywhere else.
+JD_EXTRACTION_TOOL_NAME = 'record_jd'
+JD_EXTRACTION_KEYS = {
+    't': 'job_title',
+    'exp': 'required_experience',
+    'req': 'required_skills',
+    'nice': 'nice_to_have_skills',
+    'sen': 'seniority_level',
+    'edu': 'required_education',
+    'jt': 'job_type',
+    'ind': 'industry'
+}
+JD_EXTRACTION_TOOL = {
+    'toolSpec': {
+        'name': JD_EXTRACTION_TOOL_NAME,
+        'description': 'Record the structured requirements of a job description.',
+        'inputSchema': {
+            'json': {
+                'type': 'object',
+                'properties': {
+                    't': {'type': 'string', 'description': 'Job title'},
+                    'exp': {'type': 'integer', 'minimum': 0, 'description': 'Minimum years of experience, 0 if not stated'},
+                    'req': {'type': 'array', 'items': {'type': 'string'}, 'description': 'Required technical skills, short names'},
+                    'nice': {'type': 'array', 'items': {'type': 'string'}, 'description': 'Nice-to-have skills, short names'},
+                    'sen': {'type': 'string', 'enum': ['Junior', 'Mid-level', 'Senior', 'Lead', 'Principal', 'Not specified']},
+                    'edu': {'type': 'string', 'description': "Required education, e.g. Bachelor's, or Not specified"},
+                    'jt': {'type': 'string', 'description': 'Job type, e.g. Full-time, Contract, Remote'},
+                    'ind': {'type': 'string', 'description': 'Industry'}
+                },
+                'required': ['t', 'exp', 'req', 'nice', 'sen', 'edu'],
+                'additionalProperties': False
+            }
+        }
+    }
+}
+JD_EXTRACTION_PROMPT = (
+    "Extract the requirements from the job description below by calling the "
+    f"{JD_EXTRACTION_TOOL_NAME} tool. List only concrete skills, tools and technologies.\n\n"
+    "Job Description:\n{job_description}"
+)
+JD_EXTRACTION_MAX_TOKENS = int(os.environ.get('JD_EXTRACTION_MAX_TOKENS', '512'))
+# Converse models without tool use, matched as substrings of the model or
+# inference profile ID; Bedrock rejects a toolConfig for them with a
+# ValidationException. These models are asked for the record_jd input as a
+# plain JSON answer instead. Models found to reject tools at runtime are added
+# to _jd_json_prompt_models.
+JD_NO_TOOL_USE_MODELS = (
+    'meta.llama2', 'meta.llama3-8b-instruct', 'meta.llama3-70b-instruct',
+    'amazon.titan-text', 'mistral.mistral-7b', 'mistral.mixtral',
+    'cohere.command-text', 'cohere.command-light', 'ai21.j2'
+)
+_jd_json_prompt_models = set()
+
+
+def _jd_key_hint(spec: Dict[str, Any]) -> str:
+    if 'enum' in spec:
+        return 'one of ' + ', '.join(spec['enum'])
+    if spec['type'] == 'array':
+        return f"{spec['description']} (list of strings)"
+    return f"{spec['description']} ({spec['type']})"
+
+
+JD_EXTRACTION_JSON_PROMPT = (
+    "Extract the requirements from the job description below. List only concrete "
+    "skills, tools and technologies. Answer with a single JSON object and nothing else, "
+    "using these keys:\n"
+    + "\n".join(f'- "{key}": {_jd_key_hint(spec)}'
+                for key, spec in JD_EXTRACTION_TOOL['toolSpec']['inputSchema']['json']['properties'].items())
+    + "\n\nJob Description:\n{job_description}"
+)
+
 def normalize_skill(skill: str) -> str:
     """Normalize skill name to handle variations"""
     skill = skill.lower().strip()
     
     # Handle common skill variations and abbreviations
-    skill_mapping = {
-        'js': 'javascript',
-        'react.js': 'react',
-        'reactjs': 'react',
-        'node.js': 'node',
-        'nodejs': 'node',
-        'vue.js': 'vue',
-        'vuejs': 'vue',
-        'py': 'python',
-        'aws cloud': 'aws',
-        'amazon web services': 'aws',
-        'azure cloud': 'azure',
-        'ms azure': 'azure',
-        'google cloud': 'gcp',
-        'google cloud platform': 'gcp',
-        'k8s': 'kubernetes',
-        'next.js': 'nextjs',
-        'postgres': 'postgresql',
-        'mongo': 'mongodb',
-        'ts': 'typescript',
-    }
-    
-    return skill_mapping.get(skill, skill)
+    return SKILL_MAPPING.get(skill, skill)
 
 def extract_skills_pattern_matching(job_description: str) -> List[str]:
     """Extract skills from job description using pattern matching"""
-    # Common tech skills dictionary - more comprehensive than the basic one in original code
-    common_skills = [
-        "python", "java", "javascript", "react", "angular", "node", "aws",
-        "azure", "gcp", "docker", "kubernetes", "sql", "nosql", "mongodb",
-        "postgresql", "mysql", "oracle", "rest", "api", "microservices",
-        "ci/cd", "devops", "agile", "scrum", "git", "machine learning", "ai",
-        "data science", "big data", "hadoop", "spark", "tableau", "power bi",
-        "excel", "word", "powerpoint", "jira", "confluence", "linux", "unix",
-        "windows", "c#", "c++", "ruby", "php", "html", "css", "sass", "less",
-        "typescript", "vue", "redux", "graphql", "django", "flask", "spring",
-        "hibernate", "jenkins", "terraform", "ansible", "puppet", "chef",
-        "blockchain", "ethereum", "solidity", "ios", "android", "swift",
-        "kotlin", "react native", "flutter", "xamarin", "unity", "unreal",
-        "sap", "salesforce", "dynamics", "sharepoint", "azure devops",
-        "aws lambda", "serverless", "kafka", "rabbitmq", "redis", "elasticsearch",
-        "kibana", "logstash", "grafana", "prometheus", "datadog", "new relic",
-        "splunk", "sumo logic", "nginx", "apache", "tomcat", "iis", "weblogic",
-        "websphere", "jboss", "wildfly", "maven", "gradle", "npm", "yarn",
-        "webpack", "babel", "jest", "mocha", "cypress", "selenium", "appium",
-        "junit", "testng", "nunit", "xunit", "pytest", "rspec", "cucumber"
-    ]
-    
     # Extract skills from job description
     jd_lower = job_description.lower()
     found_skills = []
     
-    for skill in common_skills:
+    for skill in COMMON_SKILLS:
         if skill in jd_lower:
             found_skills.append(skill)
     
@@ -373,112 +595,257 @@ Summary: {summary}"""
 
 def extract_skills_llm(job_description: str) -> List[str]:
     """Extract skills from job description using LLM"""
+    # If no model ID is provided, fall back to pattern matching
+    if not JD_MODEL_TIERS:
+        logger.warning("No MODEL_ID provided, falling back to pattern matching")
+        return extract_skills_pattern_matching(job_description)
+    
     try:
-        # Use ONLY the LLM model (MODEL_ID) for skill extraction
-        bedrock = get_bedrock_client()
-        model_id = BEDROCK_MODEL_ID
-        
-        # If no model ID is provided, fall back to pattern matching
-        if not model_id:
-            logger.warning("No MODEL_ID provided, falling back to pattern matching")
-            return extract_skills_pattern_matching(job_description)
-        
-        # Craft prompt for skill extraction
-        prompt = f"""You are a skilled technical recruiter with expertise in identifying technical skills from job descriptions.
-        
-        Extract all technical skills, tools, technologies, frameworks, programming languages, and domain knowledge 
-        from the following job description. Return ONLY a JSON array of strings containing the skills.
-        Only include specific skills, not general concepts or responsibilities.
-        
-        Job Description:
-        {job_description}
-        """
-        
-        # Call Bedrock model with model-specific parameters
-        request_body = {}
-        
-        # Adapt request format by model
-        if "claude" in model_id.lower():
-            request_body = {
-                "anthropic_version": "bedrock-2023-05-31",
-                "max_tokens": 1000,
-                "temperature": 0.1,
-                "messages": [
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ]
-            }
-        elif "titan" in model_id.lower():
-            request_body = {
-                "inputText": prompt,
-                "textGenerationConfig": {
-                    "maxTokenCount": 1000,
-                    "temperature": 0.1
-                }
-            }
-        elif "llama" in model_id.lower():
-            request_body = {
-                "prompt": prompt,
-                "max_gen_len": 1000,
-                "temperature": 0.1
-            }
-        else:
-            # Default format for other models
-            request_body = {
-                "prompt": prompt,
-                "max_tokens_to_sample": 1000,
-                "temperature": 0.1
-            }
-            
-        # Call Bedrock model
-        logger.info(f"Calling Bedrock LLM model (MODEL_ID): {model_id} for skill extraction")
-        response = bedrock.invoke_model(
-            modelId=model_id,
-            body=json.dumps(request_body)
-        )
-        
-        # Parse response based on model type
-        response_body = json.loads(response.get("body").read())
-        completion = ""
-        
-        if "claude" in model_id.lower() and "content" in response_body:
-            completion = response_body.get("content", [{}])[0].get("text", "")
-        elif "llama" in model_id.lower():
-            completion = response_body.get("generation", "")
-        elif "titan" in model_id.lower():
-            completion = response_body.get("results", [{}])[0].get("outputText", "")
-        else:
-            completion = response_body.get("completion", "")
-        
-        logger.debug(f"LLM response: {completion[:100]}...")
-        
-        # Extract JSON array from completion
-        skills_match = re.search(r'\[(.*?)\]', completion, re.DOTALL)
-        if skills_match:
-            skills_json = f"[{skills_match.group(1)}]"
-            try:
-                # Clean up the JSON string
-                skills_json = skills_json.replace("'", '"')
-                skills_json = re.sub(r',\s*]', ']', skills_json)
-                skills = json.loads(skills_json)
-                return [skill.strip() for skill in skills if skill.strip()]
-            except json.JSONDecodeError as e:
-                logger.error(f"Failed to parse skills JSON: {str(e)}")
-        
-        # Try a more aggressive approach to extract any array-like structure
-        any_skills = re.findall(r'"([^"]+)"', completion)
-        if any_skills:
-            logger.info(f"Extracted {len(any_skills)} skills using regex fallback")
-            return [skill.strip() for skill in any_skills if skill.strip()]
-                
+        # Skills come from the same single extraction call as the rest of the JD
+        return extract_jd_fields_tiered(job_description).get('required_skills', [])
     except Exception as e:
         logger.error(f"Error extracting skills with LLM: {str(e)}")
     
     # If we couldn't extract skills, return empty list
     return []
 
+def jd_model_supports_tool_use(model_id: str) -> bool:
+    """Whether JD extraction can ask the model for a record_jd tool call"""
+    model = model_id.lower()
+    return model_id not in _jd_json_prompt_models \
+        and not any(prefix in model for prefix in JD_NO_TOOL_USE_MODELS)
+
+for _model_id in JD_MODEL_TIERS:
+    if not jd_model_supports_tool_use(_model_id):
+        logger.warning(f"JD model {_model_id} does not support Converse tool use; "
+                       f"JD extraction asks it for a plain JSON answer instead")
+
+def _jd_tool_choice(model_id: str) -> Dict[str, Any]:
+    """Strongest tool choice the model supports through Converse"""
+    model = model_id.lower()
+    if 'anthropic' in model or 'claude' in model:
+        return {'tool': {'name': JD_EXTRACTION_TOOL_NAME}}
+    if 'mistral' in model or 'nova' in model:
+        return {'any': {}}
+    return {'auto': {}}
+
+def _clean_string_list(values) -> List[str]:
+    cleaned = []
+    for value in values:
+        if not isinstance(value, str):
+            raise ValueError(f"expected a list of strings, got item {value!r}")
+        value = value.strip()
+        if value and value not in cleaned:
+            cleaned.append(value)
+    return cleaned
+
+def validate_jd_extraction(payload: Any) -> Dict[str, Any]:
+    """Check a record_jd tool input against the schema and map it to long keys
+    
+    Raises:
+        ValueError: if a required key is missing or has the wrong type
+    """
+    if not isinstance(payload, dict):
+        raise ValueError("tool input is not an object")
+    required = JD_EXTRACTION_TOOL['toolSpec']['inputSchema']['json']['required']
+    missing = [key for key in required if key not in payload]
+    if missing:
+        raise ValueError(f"missing keys: {missing}")
+    
+    jd_info = {}
+    for key, long_name in JD_EXTRACTION_KEYS.items():
+        if key not in payload:
+            continue
+        value = payload[key]
+        if key == 'exp':
+            # Some models send numbers as strings or floats despite the schema
+            try:
+                value = int(float(value))
+            except (TypeError, ValueError):
+                raise ValueError(f"exp is not a number: {value!r}")
+            if value < 0:
+                raise ValueError(f"exp is negative: {value}")
+        elif key in ('req', 'nice'):
+            if not isinstance(value, list):
+                raise ValueError(f"{key} is not a list")
+            value = _clean_string_list(value)
+        elif not isinstance(value, str):
+            raise ValueError(f"{key} is not a string")
+        else:
+            value = value.strip()
+        jd_info[long_name] = value
+    return jd_info
+
+def _is_tool_use_unsupported(error: Exception) -> bool:
+    message = str(getattr(error, 'response', {}).get('Error', {}).get('Message', '')).lower()
+    return error_code(error) == 'ValidationException' and 'tool' in message
+
+def parse_jd_json_answer(text: str) -> Dict[str, Any]:
+    """Validate the first JSON object in a plain-text JD extraction answer
+    
+    Raises:
+        ValueError: if the text holds no valid record_jd object
+    """
+    start = text.find('{')
+    if start < 0:
+        raise ValueError("answer has no JSON object")
+    try:
+        payload, _ = json.JSONDecoder().raw_decode(text, start)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"answer is not valid JSON: {e}")
+    return validate_jd_extraction(payload)
+
+def extract_jd_fields_llm(job_description: str, model_id: str) -> Dict[str, Any]:
+    """Run the single schema-constrained JD extraction call
+    
+    Models with tool use answer through the record_jd tool; the others are
+    asked for the same object as plain JSON.
+    
+    Returns:
+        The validated fields under their long names
+    
+    Raises:
+        ValueError: if the model did not answer with a valid record_jd object
+    """
+    bedrock = get_bedrock_client()
+    logger.info(f"Calling Bedrock LLM model (MODEL_ID): {model_id} for JD analysis")
+    use_tool = jd_model_supports_tool_use(model_id)
+    prompt = JD_EXTRACTION_PROMPT if use_tool else JD_EXTRACTION_JSON_PROMPT
+    request = {
+        'modelId': model_id,
+        'messages': [{
+            'role': 'user',
+            'content': [{'text': prompt.format(job_description=job_description)}]
+        }],
+        'inferenceConfig': {'maxTokens': JD_EXTRACTION_MAX_TOKENS, 'temperature': 0}
+    }
+    if use_tool:
+        request['toolConfig'] = {'tools': [JD_EXTRACTION_TOOL], 'toolChoice': _jd_tool_choice(model_id)}
+    try:
+        response = _bedrock_controller.call_hedged(model_id, bedrock.converse, **request)
+    except Exception as e:
+        if not (use_tool and _is_tool_use_unsupported(e)):
+            raise
+        logger.warning(f"JD model {model_id} rejected tool use ({str(e)}); "
+                       f"asking it for a plain JSON answer from now on")
+        _jd_json_prompt_models.add(model_id)
+        return extract_jd_fields_llm(job_description, model_id)
+    
+    usage = response.get('usage', {})
+    logger.info(f"JD extraction used {usage.get('inputTokens')} input and {usage.get('outputTokens')} output tokens")
+    
+    content = response.get('output', {}).get('message', {}).get('content', [])
+    if not use_tool:
+        return parse_jd_json_answer(''.join(block.get('text', '') for block in content))
+    for block in content:
+        tool_use = block.get('toolUse')
+        if tool_use and tool_use.get('name') == JD_EXTRACTION_TOOL_NAME:
+            return validate_jd_extraction(tool_use.get('input'))
+    raise ValueError(f"model did not call {JD_EXTRACTION_TOOL_NAME} (stopReason: {response.get('stopReason')})")
+
+def score_jd_extraction(jd_info: Dict[str, Any], parsed) -> float:
+    """Plausibility (0-1) of an LLM extraction, checked against the rule-based parse
+    
+    Skills the rule-based parser found in the text should also be in the LLM
+    answer; a missing title or an experience figure that contradicts an
+    explicit "N years" statement also lowers the score.
+    """
+    skills = [normalize_skill(skill) for skill in
+              (jd_info.get('required_skills') or []) + (jd_info.get('nice_to_have_skills') or [])]
+    rule_skills = set(parsed.info['required_skills'] + parsed.info['nice_to_have_skills'])
+    if not jd_info.get('required_skills'):
+        skills_score = 0.0
+    elif rule_skills:
+        recalled = sum(1 for rule_skill in rule_skills
+                       if any(rule_skill == skill or rule_skill in skill.split() for skill in skills))
+        skills_score = recalled / len(rule_skills)
+    else:
+        skills_score = 1.0 if len(skills) >= 3 else 0.6
+    
+    title = jd_info.get('job_title')
+    title_score = 1.0 if title and title != 'Not specified' else 0.0
+    
+    experience_score = 1.0
+    if parsed.field_confidence.get('required_experience', 0) >= 0.9 \
+            and jd_info.get('required_experience') != parsed.info['required_experience']:
+        experience_score = 0.5
+    
+    return 0.5 * skills_score + 0.25 * title_score + 0.25 * experience_score
+
+def bedrock_failure_reason(error: Exception) -> str:
+    """Short reason for a failed Bedrock call, as reported in processing_metadata"""
+    if isinstance(error, BedrockCircuitOpenError):
+        return 'circuit_open'
+    if isinstance(error, BedrockCapacityError):
+        return 'capacity'
+    if is_throttling(error):
+        return 'throttled'
+    if isinstance(error, ValueError):
+        return 'invalid'
+    return 'error'
+
+def _record_bedrock_fallback(metrics, operation, reason):
+    if metrics is not None:
+        metrics.setdefault('bedrock_fallbacks', []).append({'operation': operation, 'reason': reason})
+
+def extract_jd_fields_tiered(job_description: str, metrics: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Run the JD extraction call through JD_MODEL_TIERS, cheapest first
+    
+    A tier's answer is accepted when it passes schema validation and
+    score_jd_extraction reaches JD_TIER_MIN_CONFIDENCE; otherwise the next
+    tier is asked. If no tier qualifies, the best valid answer is used.
+    
+    Args:
+        job_description: Job description text
+        metrics: Optional dict; 'jd_model_tier' receives the answering tier,
+            its call duration and every attempt with its outcome
+    
+    Raises:
+        The last error if no tier returned a valid answer
+    """
+    attempts = []
+    report = {'tier': None, 'model_id': None, 'duration_ms': None, 'total_ms': None, 'attempts': attempts}
+    if metrics is not None:
+        metrics['jd_model_tier'] = report
+    
+    parsed = None
+    best = None
+    last_error = ValueError("no JD extraction model configured")
+    total_start = time.time()
+    for tier, model_id in enumerate(JD_MODEL_TIERS):
+        attempt = {'tier': tier, 'model_id': model_id}
+        attempts.append(attempt)
+        call_start = time.time()
+        try:
+            jd_info = extract_jd_fields_llm(job_description, model_id)
+        except Exception as e:
+            attempt['duration_ms'] = round((time.time() - call_start) * 1000)
+            attempt['outcome'] = bedrock_failure_reason(e)
+            logger.warning(f"JD extraction tier {tier} ({model_id}) failed: {str(e)}")
+            last_error = e
+            continue
+        attempt['duration_ms'] = round((time.time() - call_start) * 1000)
+        
+        if parsed is None:
+            parsed = _jd_parser.parse(job_description)
+        confidence = score_jd_extraction(jd_info, parsed)
+        attempt['confidence'] = round(confidence, 3)
+        if best is None or confidence > best[0]:
+            best = (confidence, attempt, jd_info)
+        if confidence >= _JD_TIER_MIN_CONFIDENCE:
+            break
+        attempt['outcome'] = 'low_confidence'
+        logger.info(f"JD extraction tier {tier} ({model_id}) confidence {confidence:.2f}, escalating")
+    
+    report['total_ms'] = round((time.time() - total_start) * 1000)
+    if best is None:
+        raise last_error
+    _, attempt, jd_info = best
+    attempt['outcome'] = 'accepted'
+    report.update(tier=attempt['tier'], model_id=attempt['model_id'], duration_ms=attempt['duration_ms'])
+    logger.info(f"JD extraction answered by tier {attempt['tier']} ({attempt['model_id']})")
+    return jd_info
+
 def extract_skills_from_jd(job_description: str) -> List[str]:
     """Extract skills from job description using LLM with pattern matching as fallback"""
     try:
@@ -494,13 +861,16 @@ def extract_skills_from_jd(job_description: str) -> List[str]:
     logger.info("Falling back to pattern matching for skill extraction")
     return extract_skills_pattern_matching(job_description)
 
-def extract_jd_info_llm(job_description: str) -> Dict[str, Any]:
+def extract_jd_info_llm(job_description: str, metrics: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """Extract comprehensive information from job description using LLM
     
     Uses MODEL_ID (via BEDROCK_MODEL_ID) for LLM-based analysis.
     
     Args:
         job_description: Job description text
+        metrics: Optional dict; 'jd_analysis_source' is set to 'llm' or
+            'pattern' depending on which result was returned, and
+            'jd_model_tier' describes the model tiers that were asked
         
     Returns:
         Dictionary with extracted information or fallback data
@@ -514,186 +884,192 @@ def extract_jd_info_llm(job_description: str) -> Dict[str, Any]:
     }
     
     # Extract job title using regex as fallback
-    title_match = re.search(r'^([^.:\n]{5,100})', job_description)
+    title_match = _JD_TITLE_PATTERN.search(job_description)
     if title_match:
         default_info['job_title'] = title_match.group(1).strip()
     
     # Extract required experience using regex as fallback
-    experience_match = re.search(r'(\d+)(?:\s*[-+]?\s*\d*)?\s+years?\s+(?:of\s+)?experience', job_description, re.IGNORECASE)
+    experience_match = _EXPERIENCE_PATTERN.search(job_description)
     if experience_match:
         default_info['required_experience'] = int(experience_match.group(1))
     
+    if metrics is not None:
+        metrics['jd_analysis_source'] = 'pattern'
+    
     # Skip LLM if MODEL_ID is not provided
-    if not BEDROCK_MODEL_ID:
+    if not JD_MODEL_TIERS:
         logger.warning("No MODEL_ID provided for LLM analysis, using pattern matching")
         return default_info
     
     try:
-        bedrock = get_bedrock_client()
-        model_id = BEDROCK_MODEL_ID
-        
-        # Craft prompt for JD information extraction
-        prompt = f"""You are an expert job description analyzer. Extract the following information from the job description below:
-
-1. Job Title
-2. Required Years of Experience (as a number only)
-3. Required Skills (as a list)
-4. Nice-to-Have Skills (as a list)
-5. Seniority Level (e.g., Junior, Mid-level, Senior, Lead)
-6. Job Type (e.g., Full-time, Contract, Remote)
-7. Industry
-8. Required Education (e.g., Bachelor's, Master's)
-
-Return ONLY a valid JSON object with the following format (no other text):
-{{
-  "job_title": "string",
-  "required_experience": number,
-  "required_skills": ["skill1", "skill2"],
-  "nice_to_have_skills": ["skill1", "skill2"],
-  "seniority_level": "string",
-  "job_type": "string",
-  "industry": "string", 
-  "required_education": "string"
-}}
-
-Make sure:
-- All keys are double-quoted
-- required_experience is a number (not a string)
-- All arrays use square brackets
-- No trailing commas
-- All strings are properly quoted with double quotes
-
-Job Description:
-{job_description}
-"""
-        
-        # Prepare request body based on model type
-        if "claude" in model_id.lower():
-            request_body = {
-                "anthropic_version": "bedrock-2023-05-31",
-                "max_tokens": 1000,
-                "temperature": 0.1,
-                "messages": [
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ]
-            }
-        elif "titan" in model_id.lower():
-            request_body = {
-                "inputText": prompt,
-                "textGenerationConfig": {
-                    "maxTokenCount": 1000,
-                    "temperature": 0.1
-                }
-            }
-        elif "llama" in model_id.lower():
-            # Llama models use a different parameter format
-            request_body = {
-                "prompt": prompt,
-                "max_gen_len": 1000,
-                "temperature": 0.1
-            }
-        else:
-            # Default format for other models
-            request_body = {
-                "prompt": prompt,
-                "max_tokens_to_sample": 1000,
-                "temperature": 0.1
-            }
+        jd_info = extract_jd_fields_tiered(job_description, metrics)
+        logger.info(f"Successfully extracted JD info using LLM")
         
-        # Call Bedrock LLM model
-        logger.info(f"Calling Bedrock LLM model (MODEL_ID): {model_id} for JD analysis")
-        response = bedrock.invoke_model(
-            modelId=model_id,
-            body=json.dumps(request_body)
-        )
+        # Merge with default info to ensure all fields exist
+        # This ensures we have pattern-matched fallbacks for any missing values
+        merged_info = default_info.copy()
+        for key, value in jd_info.items():
+            if value or key not in merged_info:
+                merged_info[key] = value
         
-        # Parse response based on model type
-        response_body = json.loads(response.get("body").read())
-        completion = ""
-        
-        if "claude" in model_id.lower() and "content" in response_body:
-            completion = response_body.get("content", [{}])[0].get("text", "")
-        elif "llama" in model_id.lower():
-            # Llama models return 'generation' field
-            completion = response_body.get("generation", "")
-        elif "titan" in model_id.lower():
-            completion = response_body.get("results", [{}])[0].get("outputText", "")
-        else:
-            # Default to completion field
-            completion = response_body.get("completion", "")
-        
-        # Extract JSON from the completion
-        json_match = re.search(r'\{[\s\S]*\}', completion, re.DOTALL)
+        if metrics is not None:
+            metrics['jd_analysis_source'] = 'llm'
+        return merged_info
         
-        if json_match:
-            json_str = json_match.group(0)
-            try:
-                jd_info = json.loads(json_str)
-                logger.info(f"Successfully extracted JD info using LLM")
-                
-                # Merge with default info to ensure all fields exist
-                # This ensures we have pattern-matched fallbacks for any missing values
-                merged_info = default_info.copy()
-                
-                # Update with LLM-extracted values if they exist
-                if 'job_title' in jd_info and jd_info['job_title']:
-                    merged_info['job_title'] = jd_info['job_title']
-                    
-                if 'required_experience' in jd_info and jd_info['required_experience']:
-                    merged_info['required_experience'] = jd_info['required_experience']
-                    
-                if 'required_skills' in jd_info and jd_info['required_skills']:
-                    merged_info['required_skills'] = jd_info['required_skills']
-                    
-                if 'nice_to_have_skills' in jd_info and jd_info['nice_to_have_skills']:
-                    merged_info['nice_to_have_skills'] = jd_info['nice_to_have_skills']
-                    
-                if 'seniority_level' in jd_info:
-                    merged_info['seniority_level'] = jd_info['seniority_level']
-                    
-                if 'job_type' in jd_info:
-                    merged_info['job_type'] = jd_info['job_type']
-                    
-                if 'industry' in jd_info:
-                    merged_info['industry'] = jd_info['industry']
-                    
-                if 'required_education' in jd_info:
-                    merged_info['required_education'] = jd_info['required_education']
-                
-                return merged_info
-                
-            except json.JSONDecodeError as e:
-                logger.error(f"Failed to parse JD info JSON from LLM response: {str(e)}")
-                logger.debug(f"Problematic JSON: {json_str}")
-                # Return fallback info
-                return default_info
-        else:
-            logger.warning("Could not find JSON object in LLM response")
-            # Return fallback info
-            return default_info
-                
     except Exception as e:
         logger.error(f"Error extracting JD info using LLM: {str(e)}")
         # Return fallback info
         return default_info
 
-def analyze_jd(jd_text):
+_HTML_TAG_PATTERN = re.compile(r'<[^>]+>')
+
+def canonicalize_jd(jd_text: str) -> str:
+    """Normalise a job description for cache lookups
+    
+    Pasted JDs differ in markup, entities, whitespace and case without
+    differing in content, so all of those are removed.
+    """
+    text = html.unescape(_HTML_TAG_PATTERN.sub(' ', jd_text))
+    return ' '.join(text.lower().split())
+
+def get_jd_analysis_cache_key(jd_text: str) -> str:
+    """Cache key for an LLM analysis: canonical JD text plus the model tiers"""
+    canonical = f"{','.join(JD_MODEL_TIERS)}\n{canonicalize_jd(jd_text)}"
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+def analyze_jd(jd_text, use_cache=True, metrics=None):
     """Analyze job description to extract structured information
     
-    Uses MODEL_ID (via BEDROCK_MODEL_ID) for LLM-based analysis.
+    Uses MODEL_ID (via BEDROCK_MODEL_ID) for LLM-based analysis. Successful
+    LLM results are cached by canonical JD text and model; pass
+    use_cache=False to force a fresh analysis. The cache outcome ('hit',
+    'l2_hit', 'miss' or 'bypass') is stored in metrics['jd_analysis_cache'].
+    
+    On a cache miss the rule-based parser runs first, and the LLM is skipped
+    when its confidence reaches JD_FAST_PATH_THRESHOLD. The path taken
+    ('cache', 'fast_path', 'llm' or 'pattern') is stored in
+    metrics['jd_analysis_path'].
+    """
+    if use_cache:
+        cached, cache_status = lookup_jd_analysis(jd_text)
+    else:
+        cached, cache_status = None, 'bypass'
+    if metrics is not None:
+        metrics['jd_analysis_cache'] = cache_status
+    if cached is not None:
+        _record_jd_analysis_path(metrics, 'cache')
+        return cached
+    
+    parsed = parse_jd_fast(jd_text, metrics)
+    if use_fast_path(parsed, metrics):
+        return parsed.info
+    return analyze_jd_uncached(jd_text, metrics)
+
+def use_fast_path(parsed, metrics=None) -> bool:
+    """Decide whether the rule-based analysis is used instead of the LLM
+    
+    True when the parser is confident enough, or when the circuit breaker
+    of every JD model is open, so a degraded Bedrock costs no waiting.
+    """
+    if parsed.confidence >= _JD_FAST_PATH_THRESHOLD:
+        logger.info(f"Rule-based JD analysis confident ({parsed.confidence}), skipping LLM")
+    elif JD_MODEL_TIERS and not any(_bedrock_controller.is_available(model_id) for model_id in JD_MODEL_TIERS):
+        logger.warning("Bedrock circuit open for every JD model, using rule-based JD analysis")
+        _record_bedrock_fallback(metrics, 'jd_extraction', 'circuit_open')
+    else:
+        return False
+    _record_jd_analysis_path(metrics, 'fast_path')
+    return True
+
+def parse_jd_fast(jd_text, metrics=None):
+    """Parse a JD with the rule-based parser and record its confidence
+    
+    The confidence figures are stored in metrics['jd_fast_path'] whether or
+    not the result is used, so the threshold can be tuned from real traffic.
+    """
+    parse_start = time.time()
+    parsed = _jd_parser.parse(jd_text)
+    if metrics is not None:
+        metrics['jd_fast_path'] = dict(
+            parsed.summary(),
+            threshold=_JD_FAST_PATH_THRESHOLD,
+            duration_ms=round((time.time() - parse_start) * 1000, 2)
+        )
+    return parsed
+
+def _record_jd_analysis_path(metrics, path):
+    if metrics is not None:
+        metrics['jd_analysis_path'] = path
+
+# processing_metadata.model_id for JD analyses that no model tier answered
+_JD_PATH_MODEL_LABELS = {
+    'cache': 'cached-analysis',
+    'fast_path': 'rule-based-fast-path',
+    'pattern': 'template-based-analysis'
+}
+
+def jd_analysis_model_id(metrics):
+    """Name what produced the request's JD analysis
+    
+    The model ID of the tier that answered for an LLM analysis, otherwise a
+    label for the cache, the rule-based fast path or pattern extraction.
+    """
+    path = metrics.get('jd_analysis_path')
+    if path == 'llm':
+        model_id = (metrics.get('jd_model_tier') or {}).get('model_id')
+        if model_id:
+            return model_id
+    return _JD_PATH_MODEL_LABELS.get(path, 'template-based-analysis')
+
+def lookup_jd_analysis(jd_text, embedding_text=None):
+    """Return (analysis, status) from the JD analysis caches
+    
+    status is 'hit' (local), 'l2_hit' (DynamoDB tier) or 'miss'; the
+    analysis is a private copy, or None on a miss.
+    
+    When embedding_text is given and its embedding is not cached locally,
+    the L2 lookup fetches that embedding in the same BatchGetItem call and
+    stores it in the local embedding cache, so a later get_query_embedding
+    does not pay for a second round trip.
+    """
+    cache_key = get_jd_analysis_cache_key(jd_text)
+    cached = _analysis_cache.get(cache_key)
+    cache_status = 'hit'
+    if cached is None:
+        l2_keys = [('jd_analysis', cache_key)]
+        embedding_keys = get_embedding_cache_keys(embedding_text) if embedding_text else None
+        if embedding_keys and _embedding_cache.get(embedding_keys[0]) is None:
+            l2_keys.append(('embedding', embedding_keys[1]))
+        else:
+            embedding_keys = None
+        l2_found = _l2_cache.get_many(l2_keys)
+        if embedding_keys and ('embedding', embedding_keys[1]) in l2_found:
+            _embedding_cache.put(embedding_keys[0], CachedEmbedding.from_bytes(l2_found['embedding', embedding_keys[1]]))
+        l2_data = l2_found.get(('jd_analysis', cache_key))
+        if not l2_data:
+            return None, 'miss'
+        cached = json.loads(l2_data)
+        _analysis_cache.put(cache_key, cached)
+        cache_status = 'l2_hit'
+    logger.info(f"Using cached JD analysis ({cache_status})")
+    return copy.deepcopy(cached), cache_status
+
+def analyze_jd_uncached(jd_text, metrics=None):
+    """Analyze a JD with the LLM (falling back to patterns) and cache the result
+    
+    metrics['jd_analysis_path'] is set to 'llm' or 'pattern'.
     """
+    cache_key = get_jd_analysis_cache_key(jd_text)
     try:
         # Try to use LLM for detailed extraction - this uses MODEL_ID not the embedding model
-        jd_info = extract_jd_info_llm(jd_text)
+        extraction = {}
+        jd_info = extract_jd_info_llm(jd_text, extraction)
         
         # If LLM extraction provided some data, use it
         if jd_info and isinstance(jd_info, dict) and len(jd_info) > 0:
             # If no required experience found, try to extract it with regex
             if 'required_experience' not in jd_info or not jd_info['required_experience']:
-                experience_match = re.search(r'(\d+)(?:\s*[-+]?\s*\d*)?\s+years?\s+(?:of\s+)?experience', jd_text, re.IGNORECASE)
+                experience_match = _EXPERIENCE_PATTERN.search(jd_text)
                 if experience_match:
                     jd_info['required_experience'] = int(experience_match.group(1))
                 else:
@@ -705,18 +1081,34 @@ def analyze_jd(jd_text):
                 
             # If no job title found, try to extract it
             if 'job_title' not in jd_info or not jd_info['job_title']:
-                title_match = re.search(r'^([^.:\n]{5,100})', jd_text)
+                title_match = _JD_TITLE_PATTERN.search(jd_text)
                 if title_match:
                     jd_info['job_title'] = title_match.group(1).strip()
                 else:
                     jd_info['job_title'] = "Not specified"
             
+            # Only real LLM results are worth caching; bypassed requests
+            # still refresh the entry for later ones
+            if extraction.get('jd_analysis_source') == 'llm':
+                _analysis_cache.put(cache_key, copy.deepcopy(jd_info))
+                _l2_cache.put('jd_analysis', cache_key, json.dumps(jd_info).encode('utf-8'), _ANALYSIS_CACHE_EXPIRY)
+            _record_jd_analysis_path(metrics, extraction.get('jd_analysis_source', 'pattern'))
+            if metrics is not None and 'jd_model_tier' in extraction:
+                metrics['jd_model_tier'] = extraction['jd_model_tier']
+            if JD_MODEL_TIERS and extraction.get('jd_analysis_source') != 'llm':
+                attempts = extraction.get('jd_model_tier', {}).get('attempts') or [{}]
+                _record_bedrock_fallback(metrics, 'jd_extraction', attempts[-1].get('outcome', 'error'))
             return jd_info
     except Exception as e:
         logger.warning(f"Error analyzing JD with LLM: {str(e)}")
     
     # Fallback to regex-based extraction
     logger.info("Using fallback regex-based JD analysis")
+    _record_jd_analysis_path(metrics, 'pattern')
+    return analyze_jd_patterns(jd_text)
+
+def analyze_jd_patterns(jd_text):
+    """Extract title, experience and skills from a JD with regex and skill tables"""
     default_info = {
         "job_title": "Not specified",
         "required_experience": 0,
@@ -725,12 +1117,12 @@ def analyze_jd(jd_text):
     }
     
     # Extract job title using regex
-    title_match = re.search(r'^([^.:\n]{5,100})', jd_text)
+    title_match = _JD_TITLE_PATTERN.search(jd_text)
     if title_match:
         default_info['job_title'] = title_match.group(1).strip()
     
     # Extract required experience using regex
-    experience_match = re.search(r'(\d+)(?:\s*[-+]?\s*\d*)?\s+years?\s+(?:of\s+)?experience', jd_text, re.IGNORECASE)
+    experience_match = _EXPERIENCE_PATTERN.search(jd_text)
     if experience_match:
         default_info['required_experience'] = int(experience_match.group(1))
     
@@ -815,20 +1207,74 @@ def calculate_experience_match(resume_exp: float, jd_required_exp: float) -> flo
     # Partial match
     return round((resume_exp / jd_required_exp) * 100, 2) if jd_required_exp > 0 else 0
 
+class CachedEmbedding:
+    """A query embedding stored compactly for reuse across requests
+    
+    The vector is kept as packed float32 (4 bytes per dimension instead of a
+    list of Python floats), together with its JSON serialisation so it can be
+    spliced into a kNN query body without encoding it again. '.9g' round-trips
+    float32 values exactly.
+    """
+    __slots__ = ('vector', 'json_fragment')
+    
+    def __init__(self, values):
+        self.vector = array('f', values)
+        self.json_fragment = '[' + ','.join(format(v, '.9g') for v in self.vector) + ']'
+    
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'CachedEmbedding':
+        vector = array('f')
+        vector.frombytes(data)
+        return cls(vector)
+    
+    def tolist(self) -> List[float]:
+        return self.vector.tolist()
+    
+    def nbytes(self) -> int:
+        return self.vector.itemsize * len(self.vector) + len(self.json_fragment)
+
+_embedding_cache = LRUTTLCache(
+    _EMBEDDING_CACHE_MAX_ENTRIES,
+    _EMBEDDING_CACHE_TTL_SECONDS,
+    name='embedding',
+    max_bytes=_EMBEDDING_CACHE_MAX_BYTES,
+    sizeof=CachedEmbedding.nbytes
+)
+
 def generate_embedding(text):
     """Generate embedding for the given text using AWS Bedrock"""
+    return get_query_embedding(text).tolist()
+
+def get_embedding_cache_keys(text):
+    """Return the (local, L2) cache keys for the embedding of text"""
+    # Implement a quick hash for text to handle minor variations
+    normalized_text = ' '.join(text.lower().split())  # Simple normalization
+    cache_key = (BEDROCK_EMBEDDINGS_MODEL, EMBEDDING_DIMENSIONS,
+                 hashlib.md5(normalized_text.encode()).hexdigest())
+    return cache_key, ':'.join(str(part) for part in cache_key)
+
+def get_query_embedding(text, use_cache=True) -> CachedEmbedding:
+    """Return the cached embedding for text, calling Bedrock on a miss
+    
+    With use_cache=False Bedrock is always called and the result is not
+    cached, e.g. for warm-up calls whose text no search will ask for.
+    """
     try:
-        # Implement a quick hash for text to handle minor variations
-        normalized_text = ' '.join(text.lower().split())  # Simple normalization
-        cache_key = hashlib.md5(normalized_text.encode()).hexdigest()
-        current_time = time.time()
+        cache_key, l2_key = get_embedding_cache_keys(text)
         
         # Check if embedding is cached and not expired
-        if (cache_key in _embedding_cache and 
-            cache_key in _embedding_cache_timestamps and 
-            current_time - _embedding_cache_timestamps[cache_key] < _CACHE_EXPIRY_SECONDS):
+        cached = _embedding_cache.get(cache_key) if use_cache else None
+        if cached is not None:
             logger.debug("Using cached embedding")
-            return _embedding_cache[cache_key]
+            return cached
+        
+        # Another container may already have paid for this embedding
+        l2_data = _l2_cache.get('embedding', l2_key) if use_cache else None
+        if l2_data:
+            logger.debug("Using embedding from L2 cache")
+            entry = CachedEmbedding.from_bytes(l2_data)
+            _embedding_cache.put(cache_key, entry)
+            return entry
         
         # Use ONLY the embedding model for generating embeddings
         bedrock = get_bedrock_client()
@@ -839,7 +1285,7 @@ def generate_embedding(text):
         if "titan-embed-text-v2" in model_id.lower():
             request_body = {
                 "inputText": text,
-                "dimensions": 1024  # Pass dimension parameter correctly
+                "dimensions": EMBEDDING_DIMENSIONS  # Pass dimension parameter correctly
             }
         elif "titan-embed" in model_id.lower():
             request_body = {
@@ -865,7 +1311,9 @@ def generate_embedding(text):
         
         # Call the model
         logger.info(f"Calling Bedrock embedding model: {model_id}")
-        response = bedrock.invoke_model(
+        response = _bedrock_controller.call_hedged(
+            model_id,
+            bedrock.invoke_model,
             modelId=model_id,
             body=json.dumps(request_body)
         )
@@ -882,12 +1330,13 @@ def generate_embedding(text):
         else:
             embedding = response_body.get('embedding', [])
         
-        # Cache the embedding with timestamp
-        _embedding_cache[cache_key] = embedding
-        _embedding_cache_timestamps[cache_key] = current_time
+        entry = CachedEmbedding(embedding or [])
+        if use_cache and len(entry.vector):
+            _embedding_cache.put(cache_key, entry)
+            _l2_cache.put('embedding', l2_key, entry.vector.tobytes(), _EMBEDDING_CACHE_TTL_SECONDS)
         
-        logger.info(f"Successfully generated embedding with {len(embedding) if embedding else 0} dimensions")
-        return embedding
+        logger.info(f"Successfully generated embedding with {len(entry.vector)} dimensions")
+        return entry
     except Exception as e:
         logger.error(f"Error generating embedding: {str(e)}")
         raise e
@@ -935,6 +1384,8 @@ def create_focused_search_query(job_description: str, jd_info: Dict[str, Any]) -
 
 def create_db_connection():
     """Create a connection to the PostgreSQL database with retry logic"""
+    pg8000 = lazy_import('pg8000')
+    
     max_retries = 3
     retry_delay = 1  # starting delay in seconds
     
@@ -953,18 +1404,16 @@ def create_db_connection():
                 timeout=15  # Set a reasonable timeout
             )
             
+            # Each lookup is a single SELECT; autocommit keeps the persistent
+            # connection from sitting idle inside an open transaction
+            conn.autocommit = True
+            
             elapsed = time.time() - start_time
             logger.info(f"Database connection successful, took {elapsed:.2f}s")
             
-            # Test the connection with a simple query
-            cursor = conn.cursor()
-            cursor.execute("SELECT 1")
-            cursor.fetchone()
-            cursor.close()
+            return conn
             
-        return conn
-            
-    except Exception as e:
+        except Exception as e:
             elapsed = time.time() - start_time
             logger.error(f"Database connection attempt {attempt+1} failed after {elapsed:.2f}s: {str(e)}")
             
@@ -980,22 +1429,108 @@ def create_db_connection():
             logger.warning(f"Retrying database connection in {wait_time:.2f} seconds...")
             time.sleep(wait_time)
 
-def validate_uuid(uuid_string: str) -> bool:
-    """Validate if a string is a valid UUID"""
+def _is_db_connection_alive(conn) -> bool:
+    """Check a pg8000 connection for liveness without a round trip
+    
+    An idle connection has nothing to read. If its socket is readable, the
+    server has closed it (EOF) or sent an unsolicited termination message,
+    so either way it cannot be reused.
+    """
+    sock = getattr(conn, '_usock', None)
+    if sock is None:
+        return False
     try:
-        uuid_obj = uuid.UUID(uuid_string)
-        return str(uuid_obj) == uuid_string
-    except ValueError:
+        if sock.fileno() < 0:
+            return False
+        readable, _, errored = select.select([sock], [], [sock], 0)
+        return not readable and not errored
+    except (OSError, ValueError):
         return False
 
-def get_pii_data(resume_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+def close_db_connection():
+    """Close and forget the persistent database connection"""
+    global _db_connection, _pii_statement
+    conn = _db_connection
+    _db_connection = None
+    # Server-side prepared statements die with their connection
+    _pii_statement = None
+    if conn is not None:
+        try:
+            conn.close()
+        except Exception as e:
+            logger.debug(f"Error closing database connection: {str(e)}")
+
+def _is_db_disconnect(error: Exception) -> bool:
+    """Return True if a query failed because the connection itself is gone"""
+    pg8000 = lazy_import('pg8000')
+    return isinstance(error, (pg8000.InterfaceError, OSError, EOFError))
+
+def get_db_connection(metrics: Optional[Dict[str, Any]] = None):
+    """Return the persistent database connection, reconnecting if needed
+    
+    The connection is kept across warm invocations. It is replaced when the
+    server has closed it or when it is older than DB_CONNECTION_MAX_AGE.
+    
+    Args:
+        metrics: Optional dict that receives 'db_connection_reused' and 'db_connect_ms'
+    """
+    global _db_connection, _db_connection_created_at
+    
+    conn = _db_connection
+    if conn is not None:
+        too_old = time.time() - _db_connection_created_at > _DB_CONNECTION_MAX_AGE_SECONDS
+        if not too_old and _is_db_connection_alive(conn):
+            if metrics is not None:
+                metrics['db_connection_reused'] = True
+                metrics['db_connect_ms'] = 0
+            return conn
+        logger.info("Persistent database connection is closed or expired, reconnecting")
+        close_db_connection()
+    
+    connect_start = time.time()
+    conn = create_db_connection()
+    if metrics is not None:
+        metrics['db_connection_reused'] = False
+        metrics['db_connect_ms'] = round((time.time() - connect_start) * 1000)
+    
+    if conn is not None:
+        _db_connection = conn
+        _db_connection_created_at = time.time()
+    return conn
+
+def _get_pii_statement(conn):
+    """Return the named prepared PII lookup statement for this connection
+    
+    The statement is parsed and planned once per connection. Because it
+    takes the IDs as one uuid[] parameter, the same plan serves lookups of
+    1 or 1,000 IDs.
+    """
+    global _pii_statement
+    if _pii_statement is None or _pii_statement[0] is not conn:
+        _pii_statement = (conn, conn.prepare(PII_LOOKUP_SQL))
+    return _pii_statement[1]
+
+def canonical_resume_id(resume_id: Any) -> Optional[str]:
+    """Return the canonical lowercase form of a UUID resume ID, or None if invalid
+    
+    Postgres returns UUIDs in this form, so the PII cache and the query both
+    use it whatever case or braces the caller sent.
+    """
+    try:
+        return str(uuid.UUID(str(resume_id)))
+    except ValueError:
+        return None
+
+def get_pii_data(resume_ids: List[str], metrics: Optional[Dict[str, Any]] = None) -> Dict[str, Dict[str, Any]]:
     """Get PII data for a list of resume IDs
     
     Args:
         resume_ids: List of resume IDs to fetch PII data for
+        metrics: Optional dict that receives connection and query timings
+            and PII cache hit/miss counts
         
     Returns:
-        Dictionary mapping resume_id to PII data
+        Dictionary mapping resume_id (as passed in) to PII data
     """
     if not resume_ids:
         return {}
@@ -1006,61 +1541,90 @@ def get_pii_data(resume_ids: List[str]) -> Dict[str, Dict[str, Any]]:
         
     result = {}
     try:
-        logger.info(f"Attempting to retrieve PII data for {len(resume_ids)} resume IDs")
+        # Only well-formed UUIDs can be cast to uuid[]; anything else is
+        # reported as missing rather than failing the whole lookup
+        requested = {}  # canonical ID -> the IDs the caller used for it
+        invalid_count = 0
+        for resume_id in dict.fromkeys(resume_ids):
+            canonical_id = canonical_resume_id(resume_id)
+            if canonical_id is None:
+                invalid_count += 1
+                continue
+            requested.setdefault(canonical_id, []).append(resume_id)
+        if invalid_count:
+            logger.warning(f"Skipping {invalid_count} resume IDs that are not valid UUIDs")
+        
+        def add_result(canonical_id, pii):
+            for resume_id in requested[canonical_id]:
+                result[resume_id] = _copy_pii(pii)
+        
+        # Serve what we can from the cache, including confirmed-missing IDs
+        uncached_ids = []
+        cache_hits = 0
+        for canonical_id in requested:
+            cached = _pii_cache.get(canonical_id, MISSING)
+            if cached is MISSING:
+                uncached_ids.append(canonical_id)
+                continue
+            cache_hits += 1
+            if cached is not None:
+                add_result(canonical_id, cached)
+        
+        if metrics is not None:
+            metrics['pii_cache_hits'] = cache_hits
+            metrics['pii_cache_misses'] = len(uncached_ids)
+        
+        if not uncached_ids:
+            logger.info(f"Served PII data for {len(resume_ids)} resume IDs from cache")
+            return result
+        
+        logger.info(f"Attempting to retrieve PII data for {len(uncached_ids)} resume IDs "
+                    f"({cache_hits} served from cache)")
         logger.info(f"Database connection info: Host={DB_HOST}, DB={DB_NAME}, User={DB_USER}")
         
         # Log the first few resume IDs for debugging
-        if resume_ids and len(resume_ids) > 0:
-            sample_ids = resume_ids[:min(5, len(resume_ids))]
+        if uncached_ids:
+            sample_ids = uncached_ids[:5]
             logger.info(f"Sample resume IDs being queried: {sample_ids}")
 
-        # Connect to database
-        conn = create_db_connection()
-        if not conn:
-            logger.error("Failed to create database connection")
-            return {}
-
-        # Build parameterized query with correct number of placeholders
-        placeholders = ', '.join(['%s'] * len(resume_ids))
-        query = f"""
-            SELECT 
-                resume_id,
-                name,
-                email,
-                phone_number,
-                address,
-                linkedin_url,
-                s3_bucket,
-                s3_key,
-                original_filename,
-                file_type
-            FROM resume_pii 
-            WHERE resume_id IN ({placeholders})
-        """
-        
-        # Execute query and fetch results
-        cursor = conn.cursor()
+        lookup_ids = [uuid.UUID(canonical_id) for canonical_id in uncached_ids]
+        
+        # Execute query on the persistent connection. A connection that died
+        # between the liveness check and the query is replaced once.
         rows = []  # Initialize rows to empty list in case of exception
-        try:
-            cursor.execute(query, resume_ids)
-            rows = cursor.fetchall() or []  # Ensure rows is never None
-            logger.info(f"Database query returned {len(rows)} rows")
-        except Exception as db_error:
-            logger.error(f"Database query error: {str(db_error)}")
-            logger.error(f"Query was: {query} with {len(resume_ids)} parameters")
-            return {}
-        finally:
-            cursor.close()
-        conn.close()
+        for attempt in range(2):
+            conn = get_db_connection(metrics)
+            if not conn:
+                logger.error("Failed to create database connection")
+                return result
+            
+            query_start = time.time()
+            try:
+                statement = _get_pii_statement(conn)
+                rows = statement.run(resume_ids=lookup_ids) or []  # Ensure rows is never None
+                logger.info(f"Database query returned {len(rows)} rows")
+                break
+            except Exception as db_error:
+                if attempt == 0 and _is_db_disconnect(db_error):
+                    logger.warning(f"Database connection lost, reconnecting: {str(db_error)}")
+                    close_db_connection()
+                    continue
+                logger.error(f"Database query error: {str(db_error)}")
+                logger.error(f"Query was: {PII_LOOKUP_SQL} with {len(lookup_ids)} IDs")
+                return result
+            finally:
+                if metrics is not None:
+                    metrics['db_query_ms'] = round((time.time() - query_start) * 1000)
 
         # Process results
+        fetched = {}
         for row in rows:  # This is now safe because rows is always a list
             if not row or len(row) < 10:  # Check row has enough elements
                 logger.warning(f"Incomplete row data: {row}")
                 continue
                 
             resume_id = str(row[0]) if row[0] is not None else "unknown"
-            result[resume_id] = {
+            fetched[resume_id] = {
                 'name': row[1] or "",
                 'email': row[2] or "",
                 'phone_number': row[3] or "",
@@ -1074,6 +1638,15 @@ def get_pii_data(resume_ids: List[str]) -> Dict[str, Dict[str, Any]]:
                 }
             }
         
+        # Cache every ID the database answered for, found or not
+        for canonical_id in uncached_ids:
+            pii = fetched.get(canonical_id)
+            if pii is not None:
+                _pii_cache.put(canonical_id, pii)
+                add_result(canonical_id, pii)
+            else:
+                _pii_cache.put(canonical_id, None, ttl_seconds=_PII_NEGATIVE_CACHE_TTL_SECONDS)
+        
         # Log which IDs weren't found - make sure resume_ids is iterable
         missing_ids = [id for id in resume_ids if id not in result]
         if missing_ids:
@@ -1088,9 +1661,46 @@ def get_pii_data(resume_ids: List[str]) -> Dict[str, Dict[str, Any]]:
         
     except Exception as e:
         logger.error(f"Error retrieving PII data: {str(e)}")
-        return {}
+        return result
+
+def _copy_pii(pii: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy a cached PII record so callers cannot modify the cache"""
+    pii_copy = dict(pii)
+    pii_copy['file_info'] = dict(pii.get('file_info') or {})
+    return pii_copy
 
-def hybrid_search(jd_text, max_results=30, min_experience=0, jd_analysis=None):
+def invalidate_pii_cache(resume_ids: Optional[List[str]] = None) -> int:
+    """Drop cached PII for the given resume IDs, or for all IDs if None
+    
+    Call this after a resume's PII row is inserted, updated or deleted.
+    IDs are canonicalised the same way get_pii_data keys the cache; invalid
+    ones are ignored. Returns the number of entries removed.
+    """
+    if resume_ids is not None:
+        resume_ids = {canonical_resume_id(resume_id) for resume_id in resume_ids} - {None}
+    removed = _pii_cache.invalidate(resume_ids)
+    logger.info(f"Invalidated {removed} PII cache entries")
+    return removed
+
+def evict_expired_pii_cache() -> int:
+    """Remove expired PII cache entries and return how many were removed
+    
+    Runs on scheduled warm-up pings, so an idle container does not hold
+    expired PII until the entries happen to be read again.
+    """
+    return _pii_cache.evict_expired()
+
+
+def _timed_pii_lookup(resume_ids: List[str], metrics: Optional[Dict[str, Any]] = None):
+    """Run get_pii_data and return (pii_data, elapsed_ms) for overlap accounting"""
+    lookup_start = time.time()
+    pii_data = get_pii_data(resume_ids, metrics)
+    return pii_data, (time.time() - lookup_start) * 1000
+
+class SearchUnavailableError(Exception):
+    """OpenSearch could not be queried, even after retrying"""
+
+def hybrid_search(jd_text, max_results=30, min_experience=0, jd_analysis=None, metrics=None):
     """
     Perform hybrid search combining vector similarity and text search
     
@@ -1099,9 +1709,13 @@ def hybrid_search(jd_text, max_results=30, min_experience=0, jd_analysis=None):
         max_results: Maximum number of results to return
         min_experience: Minimum experience required
         jd_analysis: Pre-computed job description analysis
+        metrics: Optional dict that collects per-request connection metrics
     
     Returns:
         List of resume objects with scores matching the job description
+    
+    Raises:
+        SearchUnavailableError: If every OpenSearch attempt failed
     """
     try:
         # Parse JD info to get more structured data - reuse analysis if provided
@@ -1110,318 +1724,563 @@ def hybrid_search(jd_text, max_results=30, min_experience=0, jd_analysis=None):
         # Create a more focused query from the job description
         focused_query = create_focused_search_query(jd_text, jd_info)
         
-        # Generate embedding for the query
-        query_embedding = generate_embedding(focused_query)
-        
-        # Get OpenSearch client
-        client = get_opensearch_client()
-        
-        # Use the confirmed working index
-        working_index = OPENSEARCH_INDEX  # This should be 'resume-embeddings'
-        logger.info(f"Using index: {working_index} for hybrid search")
+        hits = retrieve_hybrid_hits(focused_query, jd_info, max_results, metrics)
+        if not hits:
+            logger.warning("No hybrid search results found")
+            return []
         
-        # Extract key terms for better text matching
-        key_terms = []
-        if jd_info.get("required_skills"):
-            key_terms.extend(jd_info["required_skills"])
-        if jd_info.get("job_title"):
-            key_terms.append(jd_info["job_title"])
+        deduplicated_results = rank_hybrid_hits(hits, jd_info, max_results, min_experience, metrics)
         
-        # Get more results than needed for filtering
-        initial_size = min(max(max_results * 3, 30), 100)
-            
-        # Build optimized hybrid query combining vector and text search
-        search_query = {
-            "size": initial_size,
-            "query": {
-                "bool": {
-                    "should": [
-                        # Vector search component with higher weight for semantic matching
-                        {
-                            "knn": {
-                                "resume_embedding": {
-                                    "vector": query_embedding,
-                                    "k": initial_size,
-                                    "boost": 3.0  # Higher weight for semantic matching
-                                }
-                            }
-                        },
-                        # Text search components for keyword matching
-                        {
-                            "multi_match": {
-                                "query": focused_query,
-                                "fields": [
-                                    "skills^3",       # Higher weight for skills
-                                    "positions^2.5",  # High weight for job titles
-                                    "summary^1.5",    # Medium weight for summary
-                                    "companies.description^1", 
-                                    "projects.description^1",
-                                    "education.degree^1"
-                                ],
-                                "type": "best_fields",
-                                "tie_breaker": 0.3,
-                                "fuzziness": "AUTO:4,7",
-                                "boost": 1.0
+    except Exception as e:
+        logger.error(f"Error in hybrid search: {str(e)}")
+        raise e
+
+    return deduplicated_results
+
+def retrieve_hybrid_hits(focused_query, jd_info, max_results=30, metrics=None, embedding_text=None):
+    """Run the hybrid kNN + text query and return the raw OpenSearch hits
+    
+    Args:
+        focused_query: Text for the keyword part of the query
+        jd_info: JD analysis supplying skill and title boosts
+        max_results: Number of results the caller will keep
+        metrics: Optional dict that collects per-request connection metrics
+        embedding_text: Text to embed for the kNN part (default: focused_query)
+    
+    Returns:
+        List of hits; empty if the search matched nothing
+    
+    Raises:
+        SearchUnavailableError: If every search attempt failed
+    """
+    # Generate embedding for the query; while Bedrock's breaker is open a
+    # keyword-only query is better than no results
+    try:
+        query_embedding = get_query_embedding(embedding_text or focused_query)
+    except BedrockCircuitOpenError:
+        logger.warning("Bedrock circuit open for the embedding model, running keyword-only search")
+        _record_bedrock_fallback(metrics, 'embedding', 'circuit_open')
+        query_embedding = None
+    
+    # Use the confirmed working index
+    working_index = OPENSEARCH_INDEX  # This should be 'resume-embeddings'
+    logger.info(f"Using index: {working_index} for hybrid search")
+    
+    # Extract key terms for better text matching
+    key_terms = []
+    if jd_info.get("required_skills"):
+        key_terms.extend(jd_info["required_skills"])
+    if jd_info.get("job_title"):
+        key_terms.append(jd_info["job_title"])
+    
+    # Get more results than needed for filtering
+    initial_size = min(max(max_results * 3, 30), 100)
+        
+    # Build optimized hybrid query combining vector and text search
+    search_query = {
+        "size": initial_size,
+        "query": {
+            "bool": {
+                "should": [
+                    # Vector search component with higher weight for semantic matching
+                    {
+                        "knn": {
+                            "resume_embedding": {
+                                "vector": _QUERY_VECTOR_PLACEHOLDER,  # spliced in below
+                                "k": initial_size,
+                                "boost": 3.0  # Higher weight for semantic matching
                             }
                         }
-                    ],
-                    "minimum_should_match": 1,
-                }
-            },
-            "_source": ["resume_id", "skills", "total_experience", "positions"]
-        }
-        
-        # Add boost for specific skills if available
-        if key_terms and len(key_terms) > 0:
-            term_queries = []
-            for term in key_terms[:10]:  # Limit to top 10 terms
-                if len(term) >= 3:  # Skip very short terms
-                    term_queries.append({
-                        "match_phrase": {
-                            "skills": {
-                                "query": term,
-                                "boost": 1.5  # Boost for specific skill matches
-                            }
+                    },
+                    # Text search components for keyword matching
+                    {
+                        "multi_match": {
+                            "query": focused_query,
+                            "fields": [
+                                "skills^3",       # Higher weight for skills
+                                "positions^2.5",  # High weight for job titles
+                                "summary^1.5",    # Medium weight for summary
+                                "companies.description^1", 
+                                "projects.description^1",
+                                "education.degree^1"
+                            ],
+                            "type": "best_fields",
+                            "tie_breaker": 0.3,
+                            "fuzziness": "AUTO:4,7",
+                            "boost": 1.0
                         }
-                    })
-            
-            # Add term queries if we have any valid ones
-            if term_queries:
-                search_query["query"]["bool"]["should"].extend(term_queries)
-        
-        # Implement retry mechanism with exponential backoff
-        max_retries = 3
-        retry_delay = 1  # starting delay in seconds
-        
-        for attempt in range(max_retries):
-            try:
-                # Execute search with retry
-                logger.info(f"OpenSearch hybrid search attempt {attempt+1}/{max_retries}")
-                start_time = time.time()
-                
-                response = client.search(
-                    body=search_query,
-                    index=working_index,
-                    request_timeout=30  # Extended timeout
-                )
-                
-                elapsed = time.time() - start_time
-                logger.info(f"Hybrid search successful, took {elapsed:.2f}s")
-                break  # Success, exit retry loop
-                
-            except Exception as e:
-                logger.error(f"Hybrid search attempt {attempt+1} failed: {str(e)}")
-                
-                if attempt == max_retries - 1:  # Last attempt
-                    logger.error(f"All {max_retries} hybrid search attempts failed")
-                    
-                    # Fall back to regular vector search
-                    logger.info("Falling back to regular vector search")
-                    return vector_search(jd_text, max_results, min_experience, True, jd_analysis)
-                
-                # Calculate exponential backoff with jitter
-                jitter = random.uniform(0, 0.5)
-                wait_time = (2 ** attempt * retry_delay) + jitter
-                
-                logger.warning(f"Retrying in {wait_time:.2f} seconds...")
-                time.sleep(wait_time)
-        
-        # Process results
-        hits = response.get('hits', {}).get('hits', [])
-        total_hits = response.get('hits', {}).get('total', {})
-        if isinstance(total_hits, dict):
-            total_count = total_hits.get('value', 0)
-        else:
-            total_count = total_hits
-            
-        logger.info(f"Hybrid search returned {len(hits)} hits out of {total_count} total matches")
-        
-        if not hits:
-            logger.warning("No hybrid search results found, falling back to vector search")
-            return vector_search(jd_text, max_results, min_experience, True, jd_analysis)
-        
-        # Process initial results - similar to vector_search reranking
-        initial_results = []
-        
-        # Find min and max scores for normalization
-        scores = [hit.get('_score', 0) for hit in hits]
-        max_score = max(scores) if scores else 1.0
-        min_score = min(scores) if scores else 0.0
-        score_range = max(max_score - min_score, 0.0001)  # Avoid division by zero
+                    }
+                ],
+                "minimum_should_match": 1,
+            }
+        },
+        "_source": ["resume_id", "skills", "total_experience", "positions"]
+    }
+    
+    # Add boost for specific skills if available
+    if key_terms and len(key_terms) > 0:
+        term_queries = []
+        for term in key_terms[:10]:  # Limit to top 10 terms
+            if len(term) >= 3:  # Skip very short terms
+                term_queries.append({
+                    "match_phrase": {
+                        "skills": {
+                            "query": term,
+                            "boost": 1.5  # Boost for specific skill matches
+                        }
+                    }
+                })
         
-        for hit in hits:
-            doc = hit.get('_source', {})
-            
-            # Apply experience filter
-            resume_exp = float(doc.get('total_experience', 0))
-            if min_experience > 0 and resume_exp < min_experience:
-                continue  # Skip resumes that don't meet minimum experience
-                
-            # Normalize score
-            raw_score = hit.get('_score', 0)
-            normalized_score = ((raw_score - min_score) / score_range) * 100
-            
-            # Apply sigmoid normalization
-            relevance_factor = 12.0  # Adjusted for hybrid search
-            normalized_score = 100 * (1 / (1 + math.exp(-((normalized_score/100 - 0.5) * relevance_factor))))
-            normalized_score = min(round(normalized_score, 2), 100)
-            
-            doc['score'] = normalized_score
-            doc['raw_score'] = raw_score
+        # Add term queries if we have any valid ones
+        if term_queries:
+            search_query["query"]["bool"]["should"].extend(term_queries)
+    
+    if query_embedding is None:
+        # Drop the kNN clause, which is always first
+        search_query["query"]["bool"]["should"].pop(0)
+        search_body = json.dumps(search_query)
+    else:
+        # Serialise once and splice in the cached vector JSON, so the
+        # 1024 floats are not re-encoded on every search or retry
+        search_body = json.dumps(search_query).replace(
+            f'"{_QUERY_VECTOR_PLACEHOLDER}"', query_embedding.json_fragment, 1)
+    
+    # Implement retry mechanism with exponential backoff
+    max_retries = 3
+    retry_delay = 1  # starting delay in seconds
+    client = None
+    
+    for attempt in range(max_retries):
+        try:
+            # Get the OpenSearch client (reused across warm invocations), or
+            # a new one after a connection failure reset it. Creating it can
+            # fail too, so it is part of the attempt.
+            if client is None or _opensearch_client is None:
+                client = get_opensearch_client(metrics)
             
-            initial_results.append(doc)
-        
-        # Apply reranking with skill match and experience match
-        reranked_results = []
-        jd_skills = jd_info.get("required_skills", [])
-        
-        for resume in initial_results:
-            # Extract skills
-            resume_skills = []
-            if 'skills' in resume:
-                if isinstance(resume['skills'], list):
-                    resume_skills = resume['skills']
-                elif isinstance(resume['skills'], str):
-                    resume_skills = [resume['skills']]
+            # Execute search with retry
+            logger.info(f"OpenSearch hybrid search attempt {attempt+1}/{max_retries}")
+            start_time = time.time()
             
-            # Calculate skill match
-            skill_score = 0
-            if jd_skills and resume_skills:
-                skill_score = calculate_skill_match_score(resume_skills, jd_skills)
+            response = client.search(
+                body=search_body,
+                index=working_index,
+                request_timeout=30  # Extended timeout
+            )
             
-            # Calculate experience match
-            exp_score = 0
-            if 'total_experience' in resume and jd_info.get('required_experience', 0) > 0:
-                resume_exp = float(resume.get('total_experience', 0))
-                jd_exp = float(jd_info.get('required_experience', 0))
-                exp_score = calculate_experience_match(resume_exp, jd_exp)
+            elapsed = time.time() - start_time
+            logger.info(f"Hybrid search successful, took {elapsed:.2f}s")
+            break  # Success, exit retry loop
             
-            # Calculate position match
-            position_score = 0
-            if jd_info.get('job_title') and 'positions' in resume:
-                job_title = jd_info.get('job_title', '').lower()
-                resume_positions = resume['positions'] if isinstance(resume['positions'], list) else [resume['positions']]
-                
-                for position in resume_positions:
-                    position_lower = position.lower() if position else ""
-                    if job_title == position_lower:
-                        position_score = 100
-                        break
-                    elif position_lower and (job_title in position_lower or position_lower in job_title):
-                        position_score = max(position_score, 70)
+        except Exception as e:
+            logger.error(f"Hybrid search attempt {attempt+1} failed: {str(e)}")
             
-            # Calculate combined rerank score - weights adjusted for hybrid search
-            # Since hybrid search already includes text matching
-            hybrid_weight = 0.55    # Higher weight for hybrid score
-            skill_weight = 0.25     # Slightly reduced from vector search
-            position_weight = 0.10  # Same as vector search
-            exp_weight = 0.10       # Slightly reduced from vector search
+            # Only a broken connection justifies building a new client
+            if _is_connection_failure(e):
+                reset_opensearch_client(f"search failed: {str(e)}")
             
-            rerank_score = (
-                resume['score'] * hybrid_weight +
-                skill_score * skill_weight +
-                position_score * position_weight +
-                exp_score * exp_weight
-            )
+            if attempt == max_retries - 1:  # Last attempt
+                logger.error(f"All {max_retries} hybrid search attempts failed")
+                raise SearchUnavailableError(str(e)) from e
             
-            # Store scores in the result
-            resume['rerank_score'] = min(round(rerank_score, 2), 100)
-            resume['skill_score'] = skill_score
-            resume['exp_score'] = exp_score
-            resume['position_score'] = position_score
+            # Calculate exponential backoff with jitter
+            jitter = random.uniform(0, 0.5)
+            wait_time = (2 ** attempt * retry_delay) + jitter
             
-            reranked_results.append(resume)
-        
-        # Sort by reranked score
-        reranked_results.sort(key=lambda x: x['rerank_score'], reverse=True)
-        
-        # Return full resume info with scores instead of just IDs
-        final_results = reranked_results[:max_results]
+            logger.warning(f"Retrying in {wait_time:.2f} seconds...")
+            time.sleep(wait_time)
+    
+    # Process results
+    hits = response.get('hits', {}).get('hits', [])
+    total_hits = response.get('hits', {}).get('total', {})
+    if isinstance(total_hits, dict):
+        total_count = total_hits.get('value', 0)
+    else:
+        total_count = total_hits
         
-        # Make sure final_results is never None
-        if final_results is None:
-            logger.error("final_results in vector_search is None, initializing to empty list")
-            final_results = []
+    logger.info(f"Hybrid search returned {len(hits)} hits out of {total_count} total matches")
+    
+    return hits
+
+def rank_hybrid_hits(hits, jd_info, max_results=30, min_experience=0, metrics=None):
+    """Normalise, rerank and enrich hybrid search hits with PII data
+    
+    Returns:
+        The top max_results resumes with scores and personal_info
+    """
+    # Start the PII lookup for every retrieved hit now, so the database
+    # round trip overlaps with the reranking below
+    hit_ids = [hit.get('_source', {}).get('resume_id') for hit in hits]
+    pii_future = get_executor().submit(_timed_pii_lookup, [rid for rid in dict.fromkeys(hit_ids) if rid], metrics)
+    rerank_start = time.time()
+    
+    # Process initial results
+    initial_results = []
+    
+    # Find min and max scores for normalization
+    scores = [hit.get('_score', 0) for hit in hits]
+    max_score = max(scores) if scores else 1.0
+    min_score = min(scores) if scores else 0.0
+    score_range = max(max_score - min_score, 0.0001)  # Avoid division by zero
+    
+    for hit in hits:
+        doc = hit.get('_source', {})
         
-        # Get PII data for all matches
-        resume_ids = []
-        try:
-            resume_ids = [match.get('resume_id') for match in final_results if isinstance(match, dict)]
-        except Exception as e:
-            logger.error(f"Error extracting resume IDs: {str(e)}")
+        # Apply experience filter
+        resume_exp = float(doc.get('total_experience', 0))
+        if min_experience > 0 and resume_exp < min_experience:
+            continue  # Skip resumes that don't meet minimum experience
             
-        pii_data = get_pii_data(resume_ids)
-        
-        # Enrich matches with PII data
-        for match in final_results:
-            resume_id = match.get('resume_id')
-            if resume_id in pii_data:
-                match['personal_info'] = {
-                    'name': pii_data[resume_id].get('name'),
-                    'email': pii_data[resume_id].get('email'),
-                    'phone_number': pii_data[resume_id].get('phone_number'),
-                    'address': pii_data[resume_id].get('address'),
-                    'linkedin_url': pii_data[resume_id].get('linkedin_url')
-                }
-                match['file_info'] = pii_data[resume_id].get('file_info')
-            else:
-                # Create fallback personal info using position for candidates without PII data
-                id_hash = resume_id[:8] if resume_id and len(resume_id) >= 8 else resume_id
-                
-                # Try to extract job title from positions if available
-                position_title = None
-                if match.get('positions') and isinstance(match['positions'], list) and len(match['positions']) > 0:
-                    position_title = match['positions'][0]
-                
-                # Create fallback personal info
-                match['personal_info'] = {
-                    'name': position_title if position_title else f"Candidate {id_hash}",
-                    'email': f"candidate-{id_hash.lower()}@example.com" if id_hash else "",
-                    'phone_number': f"(555) {id_hash[:3]}-{id_hash[3:6]}" if id_hash and len(id_hash) >= 6 else "",
-                    'address': "Address information not available",
-                    'linkedin_url': ""
-                }
-                
-                # Create fallback file info if needed
-                if not match.get('file_info'):
-                    match['file_info'] = {
-                        'original_filename': f"resume-{id_hash}.pdf" if id_hash else "resume.pdf",
-                        'file_type': 'pdf',
-                        's3_bucket': 'tg-ai-rec',  # Default bucket - should be configured as env var
-                        's3_key': f"processed/resumes/{resume_id}.pdf" if resume_id else "",
-                    }
+        # Normalize score
+        raw_score = hit.get('_score', 0)
+        normalized_score = ((raw_score - min_score) / score_range) * 100
         
-        # NO DEDUPLICATION - Return all results even if there are duplicates
-        # Just log the number of results and continue
+        # Apply sigmoid normalization
+        relevance_factor = 12.0  # Adjusted for hybrid search
+        normalized_score = 100 * (1 / (1 + math.exp(-((normalized_score/100 - 0.5) * relevance_factor))))
+        normalized_score = min(round(normalized_score, 2), 100)
         
-        # Count how many unique resume IDs we have for logging purposes
-        unique_resume_ids = set()
+        doc['score'] = normalized_score
+        doc['raw_score'] = raw_score
         
-        # Ensure final_results is not None before iterating
-        if final_results is None:
-            logger.error("final_results is None, initializing to empty list")
-            final_results = []
+        initial_results.append(doc)
+    
+    # Apply reranking with skill match and experience match
+    reranked_results = []
+    jd_skills = jd_info.get("required_skills", [])
+    
+    for resume in initial_results:
+        # Extract skills
+        resume_skills = []
+        if 'skills' in resume:
+            if isinstance(resume['skills'], list):
+                resume_skills = resume['skills']
+            elif isinstance(resume['skills'], str):
+                resume_skills = [resume['skills']]
+        
+        # Calculate skill match
+        skill_score = 0
+        if jd_skills and resume_skills:
+            skill_score = calculate_skill_match_score(resume_skills, jd_skills)
+        
+        # Calculate experience match
+        exp_score = 0
+        if 'total_experience' in resume and jd_info.get('required_experience', 0) > 0:
+            resume_exp = float(resume.get('total_experience', 0))
+            jd_exp = float(jd_info.get('required_experience', 0))
+            exp_score = calculate_experience_match(resume_exp, jd_exp)
+        
+        # Calculate position match
+        position_score = 0
+        if jd_info.get('job_title') and 'positions' in resume:
+            job_title = jd_info.get('job_title', '').lower()
+            resume_positions = resume['positions'] if isinstance(resume['positions'], list) else [resume['positions']]
             
-        for match in final_results:
-            if not isinstance(match, dict):
-                logger.warning(f"Unexpected match type: {type(match)}, skipping")
-                continue
-                
-            resume_id = match.get('resume_id')
-            if resume_id:
-                unique_resume_ids.add(resume_id)
+            for position in resume_positions:
+                position_lower = position.lower() if position else ""
+                if job_title == position_lower:
+                    position_score = 100
+                    break
+                elif position_lower and (job_title in position_lower or position_lower in job_title):
+                    position_score = max(position_score, 70)
+        
+        # Calculate combined rerank score - weights adjusted for hybrid search
+        # Since hybrid search already includes text matching
+        hybrid_weight = 0.55    # Higher weight for hybrid score
+        skill_weight = 0.25     # Slightly reduced from vector search
+        position_weight = 0.10  # Same as vector search
+        exp_weight = 0.10       # Slightly reduced from vector search
+        
+        rerank_score = (
+            resume['score'] * hybrid_weight +
+            skill_score * skill_weight +
+            position_score * position_weight +
+            exp_score * exp_weight
+        )
         
-        logger.info(f"Found {len(final_results)} total results with {len(unique_resume_ids)} unique resume IDs")
-        # No deduplication - use all results
-        deduplicated_results = final_results
+        # Store scores in the result
+        resume['rerank_score'] = min(round(rerank_score, 2), 100)
+        resume['skill_score'] = skill_score
+        resume['exp_score'] = exp_score
+        resume['position_score'] = position_score
         
+        reranked_results.append(resume)
+    
+    # Sort by reranked score
+    reranked_results.sort(key=lambda x: x['rerank_score'], reverse=True)
+    
+    # Return full resume info with scores instead of just IDs
+    final_results = reranked_results[:max_results]
+    
+    # Make sure final_results is never None
+    if final_results is None:
+        logger.error("final_results in rank_hybrid_hits is None, initializing to empty list")
+        final_results = []
+    
+    # Collect the prefetched PII data for all matches
+    rerank_ms = (time.time() - rerank_start) * 1000
+    try:
+        pii_data, pii_lookup_ms = pii_future.result()
     except Exception as e:
-        logger.error(f"Error in hybrid search: {str(e)}")
-        # Fall back to regular vector search
-        logger.error(f"Error performing vector search: {str(e)}")
-        raise e
+        logger.error(f"Error retrieving prefetched PII data: {str(e)}")
+        pii_data, pii_lookup_ms = {}, 0.0
+    if metrics is not None:
+        # Sequential cost minus the wall time the two steps actually took
+        overlap_wall_ms = (time.time() - rerank_start) * 1000
+        metrics['pii_overlap_saved_ms'] = round(max(rerank_ms + pii_lookup_ms - overlap_wall_ms, 0.0), 2)
+    
+    # Enrich matches with PII data
+    for match in final_results:
+        resume_id = match.get('resume_id')
+        if resume_id in pii_data:
+            match['personal_info'] = {
+                'name': pii_data[resume_id].get('name'),
+                'email': pii_data[resume_id].get('email'),
+                'phone_number': pii_data[resume_id].get('phone_number'),
+                'address': pii_data[resume_id].get('address'),
+                'linkedin_url': pii_data[resume_id].get('linkedin_url')
+            }
+            match['file_info'] = pii_data[resume_id].get('file_info')
+        else:
+            # Create fallback personal info using position for candidates without PII data
+            id_hash = resume_id[:8] if resume_id and len(resume_id) >= 8 else resume_id
+            
+            # Try to extract job title from positions if available
+            position_title = None
+            if match.get('positions') and isinstance(match['positions'], list) and len(match['positions']) > 0:
+                position_title = match['positions'][0]
+            
+            # Create fallback personal info
+            match['personal_info'] = {
+                'name': position_title if position_title else f"Candidate {id_hash}",
+                'email': f"candidate-{id_hash.lower()}@example.com" if id_hash else "",
+                'phone_number': f"(555) {id_hash[:3]}-{id_hash[3:6]}" if id_hash and len(id_hash) >= 6 else "",
+                'address': "Address information not available",
+                'linkedin_url': ""
+            }
+            
+            # Create fallback file info if needed
+            if not match.get('file_info'):
+                match['file_info'] = {
+                    'original_filename': f"resume-{id_hash}.pdf" if id_hash else "resume.pdf",
+                    'file_type': 'pdf',
+                    's3_bucket': 'tg-ai-rec',  # Default bucket - should be configured as env var
+                    's3_key': f"processed/resumes/{resume_id}.pdf" if resume_id else "",
+                }
+    
+    # NO DEDUPLICATION - Return all results even if there are duplicates
+    # Just log the number of results and continue
+    
+    # Count how many unique resume IDs we have for logging purposes
+    unique_resume_ids = set()
+    
+    # Ensure final_results is not None before iterating
+    if final_results is None:
+        logger.error("final_results is None, initializing to empty list")
+        final_results = []
+        
+    for match in final_results:
+        if not isinstance(match, dict):
+            logger.warning(f"Unexpected match type: {type(match)}, skipping")
+            continue
+            
+        resume_id = match.get('resume_id')
+        if resume_id:
+            unique_resume_ids.add(resume_id)
+    
+    logger.info(f"Found {len(final_results)} total results with {len(unique_resume_ids)} unique resume IDs")
+    # No deduplication - use all results
+    return final_results
 
-    return deduplicated_results
+def skill_set_similarity(skills_a: List[str], skills_b: List[str]) -> float:
+    """Jaccard similarity of two skill lists after normalisation"""
+    set_a = {normalize_skill(skill) for skill in skills_a or [] if skill}
+    set_b = {normalize_skill(skill) for skill in skills_b or [] if skill}
+    if not set_a and not set_b:
+        return 1.0
+    return len(set_a & set_b) / len(set_a | set_b)
+
+def analyze_jd_speculatively(jd_text, max_results=30, use_cache=True, metrics=None):
+    """Analyze the JD while a pattern-based retrieval runs in parallel
+    
+    On a cache miss the rule-based parser runs first; if it is confident
+    enough, its result is returned without calling the LLM. Otherwise, with
+    an LLM configured, analyze_jd_uncached runs on the worker pool while this
+    thread embeds the raw JD and runs the hybrid query built from the
+    rule-based analysis.
+    
+    Returns:
+        (jd_analysis, speculation) where speculation holds the pattern
+        analysis and its hits, or is None if no speculative search ran.
+        When OpenSearch was unavailable it also holds the 'error'.
+    """
+    if use_cache:
+        # A miss is likely followed by the speculative search, which embeds
+        # the raw JD, so fetch that embedding from L2 in the same call
+        embedding_text = jd_text if _SPECULATIVE_RETRIEVAL and JD_MODEL_TIERS else None
+        cached, cache_status = lookup_jd_analysis(jd_text, embedding_text)
+    else:
+        cached, cache_status = None, 'bypass'
+    if metrics is not None:
+        metrics['jd_analysis_cache'] = cache_status
+    if cached is not None:
+        _record_jd_analysis_path(metrics, 'cache')
+        return cached, None
+    
+    parsed = parse_jd_fast(jd_text, metrics)
+    if use_fast_path(parsed, metrics):
+        return parsed.info, None
+    
+    if not _SPECULATIVE_RETRIEVAL or not JD_MODEL_TIERS:
+        return analyze_jd_uncached(jd_text, metrics), None
+    
+    # The worker gets its own dict; it is merged once the analysis is done
+    analysis_metrics = {}
+    analysis_future = get_executor().submit(analyze_jd_uncached, jd_text, analysis_metrics)
+    speculation = None
+    try:
+        pattern_info = copy.deepcopy(parsed.info)
+        focused_query = create_focused_search_query(jd_text, pattern_info)
+        hits = retrieve_hybrid_hits(focused_query, pattern_info, max_results, metrics, embedding_text=jd_text)
+        speculation = {'jd_info': pattern_info, 'hits': hits}
+    except SearchUnavailableError as e:
+        # Searching again with the LLM analysis would only repeat the retries
+        logger.warning(f"Speculative retrieval failed, OpenSearch unavailable: {str(e)}")
+        speculation = {'jd_info': pattern_info, 'hits': [], 'error': str(e)}
+    except Exception as e:
+        logger.warning(f"Speculative retrieval failed: {str(e)}")
+    
+    jd_analysis = analysis_future.result()
+    if metrics is not None:
+        fallbacks = analysis_metrics.pop('bedrock_fallbacks', [])
+        metrics.update(analysis_metrics)
+        metrics.setdefault('bedrock_fallbacks', []).extend(fallbacks)
+    return jd_analysis, speculation
+
+def complete_speculative_search(jd_text, speculation, jd_analysis, max_results=30, min_experience=0, metrics=None):
+    """Confirm the speculative hits against the LLM analysis or search again
+    
+    The speculative hits are kept (and reranked with the LLM analysis) when
+    the required skills of both analyses agree; otherwise a refined hybrid
+    search runs with the LLM analysis.
+    
+    Raises:
+        SearchUnavailableError: If the speculative search already found
+            OpenSearch unavailable; it is not retried
+    """
+    if speculation.get('error'):
+        if metrics is not None:
+            metrics['speculative_retrieval'] = {'outcome': 'failed', 'error': speculation['error']}
+        raise SearchUnavailableError(speculation['error'])
+    
+    similarity = skill_set_similarity(speculation['jd_info'].get('required_skills', []),
+                                      jd_analysis.get('required_skills', []))
+    confirmed = bool(speculation['hits']) and similarity >= _SPECULATIVE_CONFIRM_THRESHOLD
+    if metrics is not None:
+        metrics['speculative_retrieval'] = {
+            'outcome': 'confirmed' if confirmed else 'refined',
+            'skill_similarity': round(similarity, 3)
+        }
+    
+    if confirmed:
+        logger.info(f"Speculative results confirmed (skill similarity {similarity:.2f})")
+        return rank_hybrid_hits(speculation['hits'], jd_analysis, max_results, min_experience, metrics)
+    
+    logger.info(f"Speculative results rejected (skill similarity {similarity:.2f}), running refined search")
+    return hybrid_search(jd_text, max_results=max_results, min_experience=min_experience,
+                         jd_analysis=jd_analysis, metrics=metrics)
+
+def is_warmup_event(event) -> bool:
+    """Return True for scheduled warm-up pings rather than real searches
+    
+    Recognises EventBridge scheduled events and explicit {"warmup": true} or
+    {"action": "warmup"} payloads.
+    """
+    if not isinstance(event, dict):
+        return False
+    if event.get('source') == 'aws.events' or event.get('detail-type') == 'Scheduled Event':
+        return True
+    if event.get('warmup') is True or str(event.get('warmup', '')).lower() == 'true':
+        return True
+    return event.get('action') == 'warmup'
+
+def _touch_knn_graph(client):
+    """Load the kNN graph of the search index into memory"""
+    if not OPENSEARCH_SERVERLESS:
+        # Managed OpenSearch exposes an explicit warm-up API for k-NN indices
+        client.transport.perform_request('GET', f'/_plugins/_knn/warmup/{OPENSEARCH_INDEX}')
+        return
+    
+    # Serverless has no warm-up API, so run the smallest possible kNN query
+    unit_vector = [1.0 / math.sqrt(EMBEDDING_DIMENSIONS)] * EMBEDDING_DIMENSIONS
+    client.search(
+        index=OPENSEARCH_INDEX,
+        body={
+            "size": 1,
+            "query": {"knn": {"resume_embedding": {"vector": unit_vector, "k": 1}}},
+            "_source": False
+        },
+        request_timeout=_PREWARM_TIMEOUT_SECONDS
+    )
+
+def _prewarm_opensearch():
+    client = get_opensearch_client()
+    _touch_knn_graph(client)
+
+def _prewarm_bedrock():
+    # A tiny embedding call opens the TLS connection to bedrock-runtime. It
+    # bypasses the caches: a cached result would skip the call on the next
+    # warm-up, and no search needs this embedding
+    get_bedrock_client()
+    get_query_embedding("warm-up", use_cache=False)
+
+def _prewarm_postgres():
+    if not DB_HOST or not DB_USER or not DB_PASSWORD:
+        return 'skipped'
+    if get_db_connection() is None:
+        raise ConnectionError("Could not connect to PostgreSQL")
+
+def _prewarm_skill_tables():
+    normalize_skill("warm-up")
+    extract_skills_pattern_matching(" ".join(COMMON_SKILLS))
+
+def prewarm() -> Dict[str, Any]:
+    """Open OpenSearch, Bedrock and Postgres connections in parallel
+    
+    Each component is timed separately; failures are reported rather than
+    raised so one unreachable dependency does not fail the warm-up.
+    """
+    futures = lazy_import('concurrent.futures')
+    tasks = {
+        'opensearch': _prewarm_opensearch,
+        'bedrock': _prewarm_bedrock,
+        'postgres': _prewarm_postgres,
+        'skill_tables': _prewarm_skill_tables,
+    }
+    
+    def run(task):
+        task_start = time.time()
+        try:
+            outcome = task()
+            result = {'ok': True, 'duration_ms': round((time.time() - task_start) * 1000)}
+            if outcome == 'skipped':
+                result['skipped'] = True
+            return result
+        except Exception as e:
+            logger.warning(f"Warm-up task {task.__name__} failed: {str(e)}")
+            return {'ok': False, 'duration_ms': round((time.time() - task_start) * 1000), 'error': str(e)}
+    
+    executor = get_executor()
+    pending = {name: executor.submit(run, task) for name, task in tasks.items()}
+    futures.wait(pending.values(), timeout=_PREWARM_TIMEOUT_SECONDS)
+    
+    report = {}
+    for name, future in pending.items():
+        if future.done():
+            report[name] = future.result()
+        else:
+            report[name] = {'ok': False, 'error': f'Timed out after {_PREWARM_TIMEOUT_SECONDS}s'}
+    return report
 
 def is_allowed_origin(origin):
     """Check if the origin is allowed for CORS"""
@@ -1447,10 +2306,30 @@ def is_allowed_origin(origin):
     # In production, you should return a specific origin or None
     return '*'
 
+def get_request_flag(event, name: str, default: bool = False) -> bool:
+    """Read a boolean request option from query parameters, JSON body or event"""
+    value = None
+    query_params = event.get('queryStringParameters') or {}
+    if name in query_params:
+        value = query_params[name]
+    elif isinstance(event.get('body'), str):
+        try:
+            body = json.loads(event['body'])
+            if isinstance(body, dict):
+                value = body.get(name)
+        except ValueError:
+            pass
+    if value is None:
+        value = event.get(name, default)
+    if isinstance(value, str):
+        return value.lower() in ('true', '1', 'yes')
+    return bool(value)
+
 def lambda_handler(event, context):
     """AWS Lambda handler function for resume matching API"""
     # Capture start time for performance tracking
     start_time = time.time()
+    _bedrock_controller.start_request()
     
     # Get origin from request headers
     request_headers = event.get('headers', {}) or {}
@@ -1468,6 +2347,21 @@ def lambda_handler(event, context):
         'Access-Control-Max-Age': '86400'  # Cache preflight request for 24 hours
     }
     
+    # Scheduled warm-up: open connections and return without searching
+    if is_warmup_event(event):
+        warmup_report = prewarm()
+        warmup_report['pii_cache_evicted'] = evict_expired_pii_cache()
+        processing_time_ms = round((time.time() - start_time) * 1000)
+        logger.info(f"Warm-up completed in {processing_time_ms}ms: {json.dumps(warmup_report)}")
+        return {
+            'statusCode': 200,
+            'body': json.dumps({
+                'message': 'Warm-up complete',
+                'warmup': warmup_report,
+                'processing_time_ms': processing_time_ms
+            })
+        }
+    
     # Handle OPTIONS request (preflight)
     if event.get('httpMethod') == 'OPTIONS':
         return {
@@ -1565,8 +2459,18 @@ def lambda_handler(event, context):
         except (TypeError, ValueError):
             min_experience = 0
         
-        # Analyze the JD to extract requirements (uses MODEL_ID via BEDROCK_MODEL_ID)
-        jd_analysis = analyze_jd(jd_text)
+        # Recruiters can force a fresh analysis, e.g. after editing the JD prompt
+        bypass_cache = get_request_flag(event, 'bypass_cache')
+        
+        # Analyze the JD to extract requirements (uses MODEL_ID via BEDROCK_MODEL_ID).
+        # On a cache miss, a speculative search runs while the LLM works.
+        search_metrics = {}
+        jd_analysis, speculation = analyze_jd_speculatively(
+            jd_text,
+            max_results=max_results,
+            use_cache=not bypass_cache,
+            metrics=search_metrics
+        )
         required_experience = jd_analysis.get('required_experience', 0)
         required_skills = jd_analysis.get('required_skills', [])
         job_title = jd_analysis.get('job_title', 'Not specified')
@@ -1583,19 +2487,30 @@ def lambda_handler(event, context):
         
         # Use hybrid search by default - combines vector similarity and text matching for best results
         try:
-            resume_matches = hybrid_search(
-                jd_text, 
-                max_results=max_results, 
-                min_experience=required_experience,
-                jd_analysis=jd_analysis
-            )
+            if speculation is not None:
+                resume_matches = complete_speculative_search(
+                    jd_text,
+                    speculation,
+                    jd_analysis,
+                    max_results=max_results,
+                    min_experience=required_experience,
+                    metrics=search_metrics
+                )
+            else:
+                resume_matches = hybrid_search(
+                    jd_text, 
+                    max_results=max_results, 
+                    min_experience=required_experience,
+                    jd_analysis=jd_analysis,
+                    metrics=search_metrics
+                )
             
             # Ensure resume_matches is never None
             if resume_matches is None:
                 logger.error("resume_matches is None, initializing to empty list")
                 resume_matches = []
 
-    except Exception as e:
+        except Exception as e:
             logger.error(f"Error in search: {str(e)}")
             resume_matches = []  # Initialize to empty list on error
         
@@ -1685,6 +2600,7 @@ def lambda_handler(event, context):
         
         # Create a summary of most common missing skills across candidates
         skill_gap_analysis = {}
+        skill_gap_list = []
         if results_with_metrics:
             # Count missing skills across all results
             for result in results_with_metrics:
@@ -1705,10 +2621,28 @@ def lambda_handler(event, context):
         processing_metadata = {
             "timestamp": datetime.now().isoformat(),
             "processing_time_ms": processing_time_ms,
-            "model_id": BEDROCK_MODEL_ID or "template-based-analysis",
+            "model_id": jd_analysis_model_id(search_metrics),
+            "jd_model_tier": search_metrics.get('jd_model_tier'),
             "analyzed_candidates_count": len(results_with_metrics),
+            "opensearch_connection_reused": search_metrics.get('opensearch_connection_reused', False),
+            "db_connection_reused": search_metrics.get('db_connection_reused', False),
+            "jd_analysis_cache": search_metrics.get('jd_analysis_cache'),
+            "jd_analysis": dict(search_metrics.get('jd_fast_path', {}),
+                                path=search_metrics.get('jd_analysis_path')),
+            "speculative_retrieval": search_metrics.get('speculative_retrieval', {'outcome': 'skipped'}),
+            "bedrock": dict(_bedrock_controller.stats(),
+                            fallbacks=search_metrics.get('bedrock_fallbacks', [])),
+            "pii_cache": {
+                "hits": search_metrics.get('pii_cache_hits', 0),
+                "misses": search_metrics.get('pii_cache_misses', 0),
+                "entries": len(_pii_cache)
+            },
             "performance": {
                 "total_duration_ms": processing_time_ms,
+                "lazy_imports_ms": pop_lazy_import_timings(),
+                "db_connect_ms": search_metrics.get('db_connect_ms'),
+                "db_query_ms": search_metrics.get('db_query_ms'),
+                "pii_overlap_saved_ms": search_metrics.get('pii_overlap_saved_ms'),
                 "candidates_per_second": round(len(results_with_metrics) / (processing_time_ms/1000), 2) if processing_time_ms > 0 else 0
             }
         }
@@ -1754,4 +2688,44 @@ def lambda_handler(event, context):
             'body': json.dumps({
                 'message': f'An error occurred: {error_msg}'
             })
-        } 
\ No newline at end of file
+        }
+    finally:
+        # Lambda freezes the writer thread once the response is returned
+        _l2_cache.flush(L2_CACHE_FLUSH_TIMEOUT)
+
+@before_snapshot
+def prepare_snapshot():
+    """Do expensive, deterministic init work before the SnapStart snapshot
+    
+    Imports and loaded service models end up in the snapshot; the clients
+    created here are discarded again after restore because they hold
+    credentials and sockets.
+    """
+    for module_name in ('opensearchpy', 'opensearchpy.exceptions', 'pg8000',
+                        'concurrent.futures', 'boto3', 'botocore.config'):
+        lazy_import(module_name)
+    get_bedrock_client()
+    _prewarm_skill_tables()
+    logger.info("Snapshot preparation complete")
+
+@after_restore
+def restore_from_snapshot():
+    """Rebuild per-container state after a SnapStart restore"""
+    global _executor
+    reseed_random()
+    reset_opensearch_client("restored from snapshot")
+    close_db_connection()
+    reset_clients()
+    _bedrock_controller.shutdown()
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
+    logger.info("Per-container state rebuilt after snapshot restore")
+
+# Provisioned concurrency initialises containers ahead of traffic, so warm
+# the connections during init instead of on the first recruiter search
+if os.environ.get('AWS_LAMBDA_INITIALIZATION_TYPE') == 'provisioned-concurrency':
+    try:
+        prewarm()
+    except Exception as e:
+        logger.warning(f"Provisioned concurrency warm-up failed: {str(e)}")
@@ -0,0 +1,139 @@
+"""
+Bounded in-process caches for the resume matching Lambdas.
+
+A warm Lambda container lives for hours and serves thousands of requests,
+so anything cached at module scope has to be bounded. LRUTTLCache combines
+a least-recently-used size limit with a per-entry time-to-live, and can also
+keep the total size of its values under a byte budget when given a sizeof
+function. Expired entries are dropped when they are read and by
+evict_expired(). The cache is safe to share between the handler thread and
+worker threads.
+
+None is a valid cached value, which lets callers remember "looked up, does
+not exist" (negative caching). Use the MISSING sentinel to tell a cache miss
+apart from a cached None:
+
+    value = cache.get(key, MISSING)
+    if value is MISSING:
+        ...
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional
+
+MISSING = object()
+
+
+class LRUTTLCache:
+    """Least-recently-used cache with per-entry expiry and optional byte budget
+
+    Args:
+        max_entries: Maximum number of entries kept
+        ttl_seconds: Default time-to-live of an entry
+        name: Label reported by stats()
+        max_bytes: Optional limit on the summed sizeof() of all values
+        sizeof: Returns the size of a value in bytes; required with max_bytes
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, name: str = 'cache',
+                 max_bytes: Optional[int] = None, sizeof: Optional[Callable[[Any], int]] = None):
+        if max_bytes is not None and sizeof is None:
+            raise ValueError("sizeof is required when max_bytes is set")
+        self.max_entries = max(int(max_entries), 1)
+        self.ttl_seconds = ttl_seconds
+        self.name = name
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._bytes = 0
+        self._entries: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for key, or default if absent or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            value, expires_at, _ = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None):
+        """Store value under key, evicting least recently used entries if full
+
+        A value larger than the whole byte budget is not cached.
+        """
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        size = self._sizeof(value) if self._sizeof is not None else 0
+        with self._lock:
+            self._remove(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                return
+            self._entries[key] = (value, time.monotonic() + ttl, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or (
+                    self.max_bytes is not None and self._bytes > self.max_bytes):
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, keys: Optional[Iterable[Hashable]] = None) -> int:
+        """Remove the given keys, or every entry if keys is None
+
+        Returns the number of entries removed.
+        """
+        with self._lock:
+            if keys is None:
+                removed = len(self._entries)
+                self._entries.clear()
+                self._bytes = 0
+                return removed
+            return sum(1 for key in keys if self._remove(key))
+
+    def evict_expired(self) -> int:
+        """Remove every expired entry and return how many were removed"""
+        now = time.monotonic()
+        with self._lock:
+            expired = [key for key, (_, expires_at, _) in self._entries.items() if expires_at <= now]
+            for key in expired:
+                self._remove(key)
+            self.expirations += len(expired)
+            return len(expired)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return lifetime counters for this container"""
+        with self._lock:
+            return {
+                'name': self.name,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
+
+    def _remove(self, key: Hashable) -> bool:
+        """Remove key if present; the caller must hold the lock"""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self._bytes -= entry[2]
+        return True
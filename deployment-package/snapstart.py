@@ -0,0 +1,49 @@
+"""
+Lambda SnapStart runtime hooks shared by the resume matching Lambdas.
+
+With SnapStart, init runs once, the memory of the initialised execution
+environment is snapshotted, and new containers are restored from it. Work
+done in a before-snapshot hook is therefore paid once per published
+version: imports, compiled patterns and loaded service models. Anything
+that must not be shared between restored containers (open sockets, cached
+credentials, random state) is rebuilt in an after-restore hook.
+
+The hooks come from the snapshot_restore_py package that ships with the
+Lambda Python runtime. Outside that runtime (local runs, older runtimes)
+registration is a no-op, so the decorated functions are simply never called.
+"""
+import logging
+import os
+import random
+
+try:
+    from snapshot_restore_py import register_before_snapshot as _register_before_snapshot
+    from snapshot_restore_py import register_after_restore as _register_after_restore
+except ImportError:  # not running on a SnapStart-capable runtime
+    _register_before_snapshot = None
+    _register_after_restore = None
+
+logger = logging.getLogger()
+
+
+def before_snapshot(func):
+    """Register func to run before the execution environment is snapshotted"""
+    if _register_before_snapshot is not None:
+        _register_before_snapshot(func)
+    return func
+
+
+def after_restore(func):
+    """Register func to run after the execution environment is restored"""
+    if _register_after_restore is not None:
+        _register_after_restore(func)
+    return func
+
+
+def reseed_random():
+    """Give every restored container its own random state
+
+    All containers restored from one snapshot start with identical PRNG
+    state, which would make retry jitter perfectly correlated across them.
+    """
+    random.seed(os.urandom(32))
@@ -0,0 +1,25 @@
+"""Put the Lambda source directories on sys.path for the unit tests
+
+Both Lambdas are deployed as a module named lambda_function, so tests load
+them by path with load_module instead of importing them.
+"""
+import importlib.util
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEPLOYMENT_PACKAGE = os.path.join(ROOT, 'deployment-package')
+
+if DEPLOYMENT_PACKAGE not in sys.path:
+    sys.path.insert(0, DEPLOYMENT_PACKAGE)
+
+
+def load_module(name, relative_path):
+    """Import the file at relative_path (from the repo root) as module name"""
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, os.path.join(ROOT, relative_path))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
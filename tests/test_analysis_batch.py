@@ -0,0 +1,58 @@
+import threading
+import time
+
+import pytest
+
+from conftest import load_module
+
+analysis_lambda = load_module('analysis_lambda', 'bedrock-analysis-lambda/lambda_function.py')
+
+JOB_INFO = {'title': 'Backend Engineer', 'description': 'Python and AWS'}
+
+
+@pytest.fixture
+def executor(monkeypatch):
+    monkeypatch.setattr(analysis_lambda, '_executor', None)
+    monkeypatch.setattr(analysis_lambda, 'BATCH_MAX_WORKERS', 1)
+    monkeypatch.setattr(analysis_lambda, 'create_candidate_prompt', lambda candidate, *args: candidate['id'])
+    yield
+    if analysis_lambda._executor is not None:
+        analysis_lambda._executor.shutdown(wait=True)
+
+
+def fake_analysis(release):
+    def analyze_candidate(prompt, temperature, max_gen_len, top_p, use_cache, output_format):
+        if prompt == 'slow':
+            release.wait(5)
+        return {'rawText': prompt, 'sections': {}}, 1, 'miss'
+    return analyze_candidate
+
+
+def test_abandoned_call_does_not_hold_the_next_batch(executor, monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(analysis_lambda, 'analyze_candidate', fake_analysis(release))
+    monkeypatch.setattr(analysis_lambda, 'BATCH_ITEM_TIMEOUT_SECONDS', 0.2)
+
+    try:
+        first_pool = analysis_lambda.get_executor()
+        results = analysis_lambda.analyze_batch([{'id': 'slow'}], JOB_INFO, 0.5, 512, 0.9, time.time() + 5,
+                                                use_cache=False)
+        assert results[0]['error'] == 'Timed out'
+        assert analysis_lambda.get_executor() is not first_pool
+
+        # The abandoned call still runs, yet the next batch gets a free worker at once
+        results = analysis_lambda.analyze_batch([{'id': 'fast'}], JOB_INFO, 0.5, 512, 0.9, time.time() + 1,
+                                                use_cache=False)
+        assert results[0]['success'] is True
+    finally:
+        release.set()
+
+
+def test_pool_is_kept_when_nothing_was_abandoned(executor, monkeypatch):
+    monkeypatch.setattr(analysis_lambda, 'analyze_candidate', fake_analysis(threading.Event()))
+    pool = analysis_lambda.get_executor()
+
+    results = analysis_lambda.analyze_batch([{'id': 'fast'}], JOB_INFO, 0.5, 512, 0.9, time.time() + 5, use_cache=False)
+
+    assert results[0]['success'] is True
+    assert analysis_lambda.get_executor() is pool
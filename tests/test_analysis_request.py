@@ -0,0 +1,37 @@
+import json
+
+import pytest
+
+from conftest import load_module
+
+analysis_lambda = load_module('analysis_lambda', 'bedrock-analysis-lambda/lambda_function.py')
+
+
+@pytest.mark.parametrize('value, expected', [
+    (True, True), (False, False), ('true', True), ('TRUE', True), ('1', True), ('yes', True),
+    ('false', False), ('0', False), ('no', False), ('', False), (None, False), (1, True), (0, False),
+])
+def test_parse_flag(value, expected):
+    assert analysis_lambda.parse_flag(value) is expected
+
+
+def test_string_false_flags_are_off(monkeypatch):
+    calls = []
+
+    def analyze_candidate(prompt, temperature, max_gen_len, top_p, use_cache=True, output_format='text'):
+        calls.append({'temperature': temperature, 'top_p': top_p, 'use_cache': use_cache})
+        return {'rawText': '', 'sections': {}}, 0, 'hit'
+
+    monkeypatch.setattr(analysis_lambda, 'analyze_candidate', analyze_candidate)
+    event = {'body': json.dumps({
+        'candidateData': {'personal_info': {'name': 'Jane Doe'}},
+        'jobInfo': {'job_title': 'Engineer'},
+        'parameters': {'temperature': 0.7, 'top_p': 0.8},
+        'reproducible': 'false',
+        'bypassCache': 'false'
+    })}
+
+    response = analysis_lambda.lambda_handler(event, None)
+
+    assert response['statusCode'] == 200
+    assert calls == [{'temperature': 0.7, 'top_p': 0.8, 'use_cache': True}]
@@ -0,0 +1,133 @@
+import pytest
+
+from analysis_sections import SectionStreamParser, parse_sections, structured_sections
+from conftest import load_module
+
+analysis_lambda = load_module('analysis_lambda', 'bedrock-analysis-lambda/lambda_function.py')
+
+NUMBERED = (
+    "Here is my analysis.\n\n"
+    "**1. EXECUTIVE SUMMARY (2-3 sentences)**\nStrong backend engineer.\n\n"
+    "2. SCORE ANALYSIS:\nGood skill match.\n\n"
+    "3. KEY STRENGTHS\n- Python\n- AWS\n\n"
+    "4. AREAS FOR CONSIDERATION: No Go experience.\n"
+    "5. INTERVIEW RECOMMENDATIONS: System design.\n"
+    "6. FINAL RECOMMENDATION: Advance.\n"
+)
+
+
+def test_line_start_headings():
+    sections = parse_sections(NUMBERED)
+    assert sections == {
+        'executiveSummary': 'Strong backend engineer.',
+        'scoreAnalysis': 'Good skill match.',
+        'keyStrengths': '- Python\n- AWS',
+        'areasForConsideration': 'No Go experience.',
+        'interviewRecommendations': 'System design.',
+        'finalRecommendation': 'Advance.',
+    }
+
+
+def test_inline_headings():
+    sections = parse_sections(
+        "Here is the analysis. EXECUTIVE SUMMARY: Good fit. SCORE ANALYSIS: Scores are high. "
+        "KEY STRENGTHS: Python. AREAS FOR CONSIDERATION: None. "
+        "INTERVIEW RECOMMENDATIONS: Ask about AWS. FINAL RECOMMENDATION: Advance."
+    )
+    assert sections['executiveSummary'] == 'Good fit.'
+    assert sections['scoreAnalysis'] == 'Scores are high.'
+    assert sections['keyStrengths'] == 'Python.'
+    assert sections['finalRecommendation'] == 'Advance.'
+
+
+def test_reordered_headings():
+    sections = parse_sections(
+        "EXECUTIVE SUMMARY: Good fit.\n"
+        "FINAL RECOMMENDATION: Advance.\n"
+        "KEY STRENGTHS: Python.\n"
+    )
+    assert sections['finalRecommendation'] == 'Advance.'
+    assert sections['keyStrengths'] == 'Python.'
+    assert sections['scoreAnalysis'] == ''
+
+
+def test_repeated_heading_does_not_cut_a_section_short():
+    sections = parse_sections(
+        "EXECUTIVE SUMMARY: Good fit.\n"
+        "KEY STRENGTHS:\n"
+        "EXECUTIVE SUMMARY skills above are confirmed by projects.\n"
+        "FINAL RECOMMENDATION: Advance.\n"
+    )
+    assert sections['keyStrengths'] == 'EXECUTIVE SUMMARY skills above are confirmed by projects.'
+    assert sections['executiveSummary'] == 'Good fit.'
+
+
+def test_heading_split_across_chunks():
+    parser = SectionStreamParser()
+    completed = []
+    for chunk in ("EXECUTIVE SUMMARY: Good fit.\n2. SCORE ANA", "LYSIS**: High.\n3. KEY", " STRENGTHS: Python."):
+        completed.extend(parser.feed(chunk))
+    completed.extend(parser.finish())
+    assert completed == [
+        ('executiveSummary', 'Good fit.'),
+        ('scoreAnalysis', 'High.'),
+        ('keyStrengths', 'Python.'),
+    ]
+
+
+def test_inline_headings_are_streamed_at_the_end():
+    parser = SectionStreamParser()
+    assert parser.feed("My analysis. EXECUTIVE SUMMARY: Good fit. FINAL RECOMMENDATION: Advance.") == []
+    assert parser.finish() == [('executiveSummary', 'Good fit.'), ('finalRecommendation', 'Advance.')]
+
+
+def test_structured_sections_map_null_and_lists():
+    sections = structured_sections({
+        'executive_summary': None,
+        'key_strengths': ['Python', 'AWS'],
+        'final_recommendation': ' Advance ',
+    })
+    assert sections['executiveSummary'] == ''
+    assert sections['keyStrengths'] == '- Python\n- AWS'
+    assert sections['finalRecommendation'] == 'Advance'
+    assert sections['scoreAnalysis'] == ''
+
+
+@pytest.mark.parametrize('raw_text, structured', [
+    ('```json\n{"executive_summary": "Good fit.", "score_analysis": null}\n```', True),
+    ('EXECUTIVE SUMMARY: Good fit.', False),
+])
+def test_parse_structured_response(raw_text, structured):
+    result = analysis_lambda.parse_structured_response(raw_text)
+    assert result['structured'] is structured
+    assert result['sections']['executiveSummary'] == 'Good fit.'
+    assert result['sections']['scoreAnalysis'] == ''
+
+
+def test_structured_flag_is_reported_in_metadata(monkeypatch):
+    monkeypatch.setattr(analysis_lambda, 'invoke_bedrock_model',
+                        lambda **kwargs: '{"executive_summary": "Good fit."}')
+    event = {'body': analysis_lambda.json.dumps({
+        'candidateData': {'personal_info': {'name': 'Jane Doe'}},
+        'jobInfo': {'job_title': 'Engineer'},
+        'outputFormat': 'json',
+        'bypassCache': True
+    })}
+
+    response = analysis_lambda.lambda_handler(event, None)
+
+    body = analysis_lambda.json.loads(response['body'])
+    assert body['metadata']['structured'] is True
+    assert 'structured' not in body['data']
+    assert body['data']['sections']['executiveSummary'] == 'Good fit.'
+
+
+def test_single_line_start_heading_followed_by_inline_ones():
+    sections = parse_sections("EXECUTIVE SUMMARY: Good fit. SCORE ANALYSIS: High. FINAL RECOMMENDATION: Advance.")
+    assert sections['executiveSummary'] == 'Good fit.'
+    assert sections['scoreAnalysis'] == 'High.'
+    assert sections['finalRecommendation'] == 'Advance.'
+
+
+def test_single_heading_without_colon():
+    assert parse_sections("EXECUTIVE SUMMARY\nGood fit.")['executiveSummary'] == 'Good fit.'
@@ -0,0 +1,99 @@
+import json
+
+import pytest
+
+from conftest import load_module
+
+analysis_lambda = load_module('analysis_lambda', 'bedrock-analysis-lambda/lambda_function.py')
+
+ANSWER = (
+    "1. EXECUTIVE SUMMARY: Strong backend engineer.\n"
+    "2. SCORE ANALYSIS: Good skill match.\n"
+    "3. KEY STRENGTHS: Python, AWS.\n"
+)
+
+
+def parse_event_stream(body):
+    return [json.loads(frame.split('data: ', 1)[1]) for frame in body.split('\n\n') if frame]
+
+
+def stream_chunks(*chunks, error=None):
+    def invoke(prompt, temperature, max_gen_len, top_p):
+        yield from chunks
+        if error is not None:
+            raise error
+    return invoke
+
+
+def test_sections_are_streamed_as_they_complete():
+    parser = analysis_lambda.SectionStreamParser()
+    completed = []
+    for chunk in (ANSWER[:25], ANSWER[25:60], ANSWER[60:]):
+        completed.extend(parser.feed(chunk))
+    assert [key for key, _ in completed] == ['executiveSummary', 'scoreAnalysis']
+    assert parser.finish() == [('keyStrengths', 'Python, AWS.')]
+
+
+def test_stream_ends_with_complete_event(monkeypatch):
+    monkeypatch.setattr(analysis_lambda, 'invoke_bedrock_model_stream', stream_chunks(ANSWER))
+
+    response = analysis_lambda.handle_stream_request({}, 'prompt', 0.5, 512, 0.9, False, 0)
+
+    events = parse_event_stream(response['body'])
+    assert response['statusCode'] == 200
+    assert [event['type'] for event in events] == ['section', 'section', 'section', 'complete']
+    assert events[-1]['data']['sections']['keyStrengths'] == 'Python, AWS.'
+    assert events[-1]['metadata']['buffered'] is True
+
+
+def test_stream_failure_ends_with_error_event(monkeypatch):
+    monkeypatch.setattr(analysis_lambda, 'invoke_bedrock_model_stream',
+                        stream_chunks(ANSWER[:ANSWER.index('Python')], error=RuntimeError('stream reset')))
+
+    response = analysis_lambda.handle_stream_request({}, 'prompt', 0.5, 512, 0.9, False, 0)
+
+    events = parse_event_stream(response['body'])
+    assert response['statusCode'] == 502
+    assert [event['type'] for event in events] == ['section', 'section', 'error']
+    assert events[-1]['success'] is False
+    assert 'stream reset' in events[-1]['message']
+
+
+def test_websocket_client_gets_error_event(monkeypatch):
+    sent = []
+    monkeypatch.setattr(analysis_lambda, 'create_websocket_emitter', lambda event: sent.append)
+    monkeypatch.setattr(analysis_lambda, 'invoke_bedrock_model_stream',
+                        stream_chunks(error=RuntimeError('throttled')))
+    event = {'requestContext': {'connectionId': 'abc', 'domainName': 'example.com', 'stage': 'prod'}}
+
+    response = analysis_lambda.handle_stream_request(event, 'prompt', 0.5, 512, 0.9, False, 0)
+
+    assert response == {'statusCode': 502}
+    assert [event['type'] for event in sent] == ['error']
+
+
+def test_websocket_stream_is_not_buffered(monkeypatch):
+    sent = []
+    monkeypatch.setattr(analysis_lambda, 'create_websocket_emitter', lambda event: sent.append)
+    monkeypatch.setattr(analysis_lambda, 'invoke_bedrock_model_stream', stream_chunks(ANSWER))
+    event = {'requestContext': {'connectionId': 'abc', 'domainName': 'example.com', 'stage': 'prod'}}
+
+    response = analysis_lambda.handle_stream_request(event, 'prompt', 0.5, 512, 0.9, False, 0)
+
+    assert response == {'statusCode': 200}
+    assert sent[-1]['metadata']['buffered'] is False
+
+
+@pytest.mark.parametrize('domain_name, expected', [
+    ('a1b2c3d4e5.execute-api.eu-west-1.amazonaws.com', 'eu-west-1'),
+    ('ws.example.com', 'ap-southeast-2'),
+])
+def test_websocket_client_uses_the_api_region(monkeypatch, domain_name, expected):
+    calls = []
+    monkeypatch.setenv('AWS_REGION', 'ap-southeast-2')
+    monkeypatch.setattr(analysis_lambda, 'get_client', lambda *args, **kwargs: calls.append((args, kwargs)))
+    event = {'requestContext': {'connectionId': 'abc', 'domainName': domain_name, 'stage': 'prod'}}
+
+    analysis_lambda.create_websocket_emitter(event)
+
+    assert calls == [(('apigatewaymanagementapi', expected), {'endpoint_url': f"https://{domain_name}/prod"})]
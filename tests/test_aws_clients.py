@@ -0,0 +1,21 @@
+import aws_clients
+
+
+class FakeSession:
+    def client(self, **kwargs):
+        return object()
+
+
+def test_config_overrides_get_their_own_client(monkeypatch):
+    monkeypatch.setattr(aws_clients, '_session', FakeSession())
+    monkeypatch.setattr(aws_clients, '_clients', {})
+    monkeypatch.setattr(aws_clients, 'build_client_config', lambda **overrides: overrides)
+
+    default = aws_clients.get_client('bedrock-runtime', 'us-east-1')
+    no_retries = aws_clients.get_client('bedrock-runtime', 'us-east-1',
+                                        retries={'mode': 'standard', 'total_max_attempts': 1})
+
+    assert no_retries is not default
+    assert aws_clients.get_client('bedrock-runtime', 'us-east-1') is default
+    assert aws_clients.get_client('bedrock-runtime', 'us-east-1',
+                                  retries={'total_max_attempts': 1, 'mode': 'standard'}) is no_retries
@@ -0,0 +1,232 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pytest
+
+import bedrock_control
+from bedrock_control import AIMDLimiter, BedrockController, CircuitBreaker, RetryBudget
+
+MODEL = 'test-model'
+
+
+class ThrottlingError(Exception):
+    response = {'Error': {'Code': 'ThrottlingException'}}
+
+
+def test_aimd_additive_increase():
+    limiter = AIMDLimiter(MODEL, initial=4, maximum=16, latency_target_ms=1000)
+    for _ in range(4):
+        limiter.acquire(0)
+        limiter.release(0.1)
+    # +1/limit per success: about +1 per window of `limit` calls
+    assert 4.9 < limiter.limit < 5.0
+    assert limiter.successes == 4
+
+
+def test_slow_successes_do_not_raise_the_limit():
+    limiter = AIMDLimiter(MODEL, initial=4, latency_target_ms=100)
+    limiter.acquire(0)
+    limiter.release(0.5)
+    assert limiter.limit == 4
+
+
+def test_aimd_multiplicative_decrease_once_per_round_trip():
+    limiter = AIMDLimiter(MODEL, initial=8, minimum=1, decrease_factor=0.5)
+    for _ in range(3):
+        limiter.acquire(0)
+    for _ in range(3):
+        limiter.release(0.1, throttled=True)
+    assert limiter.limit == 4
+    assert limiter.throttles == 3
+    assert limiter.decreases == 1
+
+
+def test_aimd_decrease_stops_at_minimum(monkeypatch):
+    limiter = AIMDLimiter(MODEL, initial=2, minimum=1, decrease_factor=0.5)
+    clock = [1000.0]
+    monkeypatch.setattr(bedrock_control.time, 'monotonic', lambda: clock[0])
+    for _ in range(3):
+        limiter.acquire(0)
+        limiter.release(0.1, throttled=True)
+        clock[0] += 10
+    assert limiter.limit == 1
+    assert limiter.decreases == 3
+
+
+def test_full_limiter_rejects():
+    limiter = AIMDLimiter(MODEL, initial=1)
+    limiter.acquire(0)
+    with pytest.raises(bedrock_control.BedrockCapacityError):
+        limiter.acquire(0)
+    assert limiter.rejections == 1
+    with pytest.raises(bedrock_control.BedrockCapacityError):
+        limiter.acquire(0, count_rejection=False)
+    assert limiter.rejections == 1
+
+
+def test_retry_budget_exhaustion():
+    budget = RetryBudget(2)
+    assert budget.take() and budget.take()
+    assert not budget.take()
+    assert budget.stats() == {'limit': 2, 'used': 2, 'denied': 1}
+
+
+def test_call_stops_retrying_when_the_budget_is_spent(monkeypatch):
+    monkeypatch.setattr(bedrock_control, 'BACKOFF_MAX_SECONDS', 0)
+    controller = BedrockController(retry_budget=2)
+    calls = []
+
+    def throttled():
+        calls.append(1)
+        raise ThrottlingError()
+
+    with pytest.raises(ThrottlingError):
+        controller.call(MODEL, throttled)
+    # The first attempt plus the two budgeted retries
+    assert len(calls) == 3
+    assert controller.stats()['retry_budget'] == {'limit': 2, 'used': 2, 'denied': 1}
+
+
+def hedging_controller(monkeypatch, latency=0.01):
+    monkeypatch.setattr(bedrock_control, 'HEDGING_ENABLED', True)
+    controller = BedrockController()
+    hedger = controller.hedger(MODEL)
+    hedger.max_fraction = 1.0
+    for _ in range(hedger.min_samples):
+        hedger.record(latency)
+    return controller
+
+
+def test_hedge_fires_after_the_delay_and_wins(monkeypatch):
+    controller = hedging_controller(monkeypatch)
+    release_primary = threading.Event()
+    calls = []
+
+    def invoke():
+        calls.append(time.monotonic())
+        if len(calls) == 1:
+            release_primary.wait(2)
+            return 'primary'
+        return 'hedge'
+
+    try:
+        start = time.monotonic()
+        assert controller.call_hedged(MODEL, invoke) == 'hedge'
+    finally:
+        release_primary.set()
+    assert calls[1] - start >= bedrock_control.HEDGE_MIN_DELAY_SECONDS
+    stats = controller.hedger(MODEL).stats()
+    assert stats['hedged'] == 1
+    assert stats['hedge_wins'] == 1
+    controller.shutdown()
+
+
+class PrimaryOnlyPool:
+    """Runs the first submitted call; later ones stay queued until cancelled"""
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self.primary = None
+        self.queued = []
+
+    def submit(self, fn, *args, **kwargs):
+        if self.primary is not None:
+            future = Future()
+            self.queued.append(future)
+            return future
+        self.primary = self._executor.submit(fn, *args, **kwargs)
+        return self.primary
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+
+def test_queued_hedge_is_cancelled_when_the_primary_wins(monkeypatch):
+    controller = hedging_controller(monkeypatch)
+    pool = PrimaryOnlyPool()
+    controller._pool = pool
+
+    def invoke():
+        time.sleep(0.15)
+        return 'primary'
+
+    assert controller.call_hedged(MODEL, invoke) == 'primary'
+    assert len(pool.queued) == 1
+    assert pool.queued[0].cancelled()
+    stats = controller.hedger(MODEL).stats()
+    assert stats['calls'] == 1
+    # A hedge that never reached Bedrock is not counted
+    assert stats['hedged'] == 0
+    assert stats['hedge_wins'] == 0
+    controller.shutdown()
+
+
+def test_no_hedge_without_a_free_slot(monkeypatch):
+    controller = hedging_controller(monkeypatch)
+    controller._limiters[MODEL] = AIMDLimiter(MODEL, initial=1, maximum=1)
+    calls = []
+
+    def invoke():
+        calls.append(1)
+        time.sleep(0.15)
+        return 'primary'
+
+    assert controller.call_hedged(MODEL, invoke) == 'primary'
+    assert len(calls) == 1
+    assert controller.hedger(MODEL).stats()['hedged'] == 0
+    assert controller.limiter(MODEL).rejections == 0
+    controller.shutdown()
+
+
+def test_breaker_transitions():
+    breaker = CircuitBreaker(MODEL, failure_threshold=2, open_seconds=0.05)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow()
+    # Only one probe at a time
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+
+
+def test_failed_probe_reopens_the_breaker():
+    breaker = CircuitBreaker(MODEL, failure_threshold=1, open_seconds=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.opens == 2
+
+
+def test_open_breaker_fails_fast():
+    controller = BedrockController()
+    for _ in range(controller.breaker(MODEL).failure_threshold):
+        controller.breaker(MODEL).record_failure()
+    with pytest.raises(bedrock_control.BedrockCircuitOpenError):
+        controller.call(MODEL, lambda: 'never called')
+    assert not controller.is_available(MODEL)
+
+
+def test_hedge_share_is_capped(monkeypatch):
+    controller = hedging_controller(monkeypatch)
+    controller.hedger(MODEL).max_fraction = 0.1
+
+    def invoke():
+        time.sleep(0.1)
+        return 'primary'
+
+    assert controller.call_hedged(MODEL, invoke) == 'primary'
+    assert controller.hedger(MODEL).stats()['hedged'] == 0
+    controller.shutdown()
@@ -0,0 +1,62 @@
+from conftest import load_module
+
+analysis_lambda = load_module('analysis_lambda', 'bedrock-analysis-lambda/lambda_function.py')
+
+CANDIDATES = [
+    {'id': 'a', 'personal_info': {'name': 'Ann'}, 'scores': {'overall': 70}},
+    {'id': 'b', 'personal_info': {'name': 'Ben'}, 'scores': {'overall': 90}},
+    {'id': 'c', 'personal_info': {'name': 'Cal'}, 'scores': {'overall': 80}},
+]
+
+
+def ranked_ids(result):
+    return [entry['candidateId'] for entry in result['ranking']]
+
+
+def test_comma_separated_ranking():
+    result = analysis_lambda.parse_comparison_response(
+        "RANKING: 2, 3, 1\n\n"
+        "CANDIDATE 2: Ben\nSUMMARY: Best fit.\nRECOMMENDATION: Advance\n\n"
+        "OVERALL COMPARISON: Ben leads.",
+        CANDIDATES
+    )
+    assert ranked_ids(result) == ['b', 'c', 'a']
+    assert result['ranking'][0]['sections']['summary'] == 'Best fit.'
+    assert result['overallComparison'] == 'Ben leads.'
+
+
+def test_numbered_ranking_list_uses_candidate_numbers():
+    result = analysis_lambda.parse_comparison_response(
+        "RANKING:\n1. Candidate 3\n2. Candidate 2\n3. Candidate 1\n",
+        CANDIDATES
+    )
+    assert ranked_ids(result) == ['c', 'b', 'a']
+
+
+def test_numbered_ranking_list_of_bare_numbers():
+    result = analysis_lambda.parse_comparison_response("RANKING:\n1. 3\n2. 1\n3. 2\n", CANDIDATES)
+    assert ranked_ids(result) == ['c', 'a', 'b']
+
+
+def test_prose_mentioning_a_candidate_stays_in_its_section():
+    result = analysis_lambda.parse_comparison_response(
+        "RANKING: 2, 1, 3\n\n"
+        "CANDIDATE 2: Ben\n"
+        "SUMMARY: Strong backend experience.\n"
+        "Candidate 1 is weaker than Ben on AWS.\n"
+        "CONSIDERATIONS: Limited leadership.\n\n"
+        "**CANDIDATE 1**\n"
+        "SUMMARY: Solid generalist.\n",
+        CANDIDATES
+    )
+    ben, ann = result['ranking'][0], result['ranking'][1]
+    assert ben['candidateId'] == 'b'
+    assert ben['sections']['summary'] == 'Strong backend experience.\nCandidate 1 is weaker than Ben on AWS.'
+    assert ben['sections']['areasForConsideration'] == 'Limited leadership.'
+    assert ann['candidateId'] == 'a'
+    assert ann['sections']['summary'] == 'Solid generalist.'
+
+
+def test_skipped_candidates_are_ranked_by_overall_score():
+    result = analysis_lambda.parse_comparison_response("CANDIDATE 1 - Ann\nSUMMARY: Fine.", CANDIDATES)
+    assert ranked_ids(result) == ['a', 'b', 'c']
@@ -0,0 +1,22 @@
+import os
+
+import pytest
+
+os.environ.setdefault('OPENSEARCH_ENDPOINT', 'search.example.com')
+os.environ.setdefault('OPENSEARCH_INDEX', 'resumes')
+os.environ.setdefault('OPENSEARCH_REGION', 'us-east-1')
+
+from conftest import load_module
+
+search_lambda = load_module('search_lambda', 'deployment-package/lambda_function.py')
+
+
+@pytest.mark.parametrize('metrics, expected', [
+    ({'jd_analysis_path': 'llm', 'jd_model_tier': {'tier': 0, 'model_id': 'cheap-model'}}, 'cheap-model'),
+    ({'jd_analysis_path': 'fast_path'}, 'rule-based-fast-path'),
+    ({'jd_analysis_path': 'cache'}, 'cached-analysis'),
+    ({'jd_analysis_path': 'pattern', 'jd_model_tier': {'model_id': None}}, 'template-based-analysis'),
+    ({}, 'template-based-analysis'),
+])
+def test_model_id_names_what_answered(metrics, expected):
+    assert search_lambda.jd_analysis_model_id(metrics) == expected
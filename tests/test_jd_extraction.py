@@ -0,0 +1,75 @@
+import json
+import os
+
+import pytest
+from botocore.exceptions import ClientError
+
+os.environ.setdefault('OPENSEARCH_ENDPOINT', 'search.example.com')
+os.environ.setdefault('OPENSEARCH_INDEX', 'resumes')
+os.environ.setdefault('OPENSEARCH_REGION', 'us-east-1')
+
+from conftest import load_module
+
+search_lambda = load_module('search_lambda', 'deployment-package/lambda_function.py')
+
+EXTRACTION = {'t': 'Data Engineer', 'exp': 5, 'req': ['python', 'spark'], 'nice': ['aws'],
+              'sen': 'Senior', 'edu': "Bachelor's"}
+
+
+class FakeBedrock:
+    """Converse stand-in; models named 'llama' reject tools like Bedrock does"""
+
+    def __init__(self, answer_text=None):
+        self.requests = []
+        self.answer_text = answer_text or 'Here is the JSON:\n' + json.dumps(EXTRACTION)
+
+    def converse(self, **request):
+        self.requests.append(request)
+        if 'llama' in request['modelId']:
+            if 'toolConfig' in request:
+                raise ClientError({'Error': {'Code': 'ValidationException',
+                                             'Message': "This model doesn't support tool use."}}, 'Converse')
+            return {'output': {'message': {'content': [{'text': self.answer_text}]}}, 'usage': {}}
+        content = [{'toolUse': {'toolUseId': '1', 'name': 'record_jd', 'input': EXTRACTION}}]
+        return {'output': {'message': {'content': content}}, 'stopReason': 'tool_use', 'usage': {}}
+
+
+@pytest.fixture
+def bedrock(monkeypatch):
+    fake = FakeBedrock()
+    monkeypatch.setattr(search_lambda, 'get_bedrock_client', lambda: fake)
+    monkeypatch.setattr(search_lambda, '_jd_json_prompt_models', set())
+    return fake
+
+
+def test_llama3_is_asked_for_json_without_tools(bedrock):
+    jd_info = search_lambda.extract_jd_fields_llm('Senior data engineer', 'meta.llama3-70b-instruct-v1:0')
+
+    assert jd_info['job_title'] == 'Data Engineer'
+    assert jd_info['required_skills'] == ['python', 'spark']
+    assert len(bedrock.requests) == 1
+    assert 'toolConfig' not in bedrock.requests[0]
+
+
+def test_tool_models_answer_through_the_tool(bedrock):
+    jd_info = search_lambda.extract_jd_fields_llm('Senior data engineer', 'anthropic.claude-3-haiku-20240307-v1:0')
+
+    assert jd_info['required_experience'] == 5
+    assert 'toolConfig' in bedrock.requests[0]
+
+
+def test_tool_rejection_switches_the_model_to_json(bedrock):
+    model_id = 'us.meta.llama3-3-70b-custom-v1:0'
+    assert search_lambda.jd_model_supports_tool_use(model_id)
+
+    jd_info = search_lambda.extract_jd_fields_llm('Senior data engineer', model_id)
+
+    assert jd_info['seniority_level'] == 'Senior'
+    assert ['toolConfig' in request for request in bedrock.requests] == [True, False]
+    assert not search_lambda.jd_model_supports_tool_use(model_id)
+
+
+@pytest.mark.parametrize('text', ['no json here', '{"t": "Engineer"', '{"t": "Engineer"}'])
+def test_invalid_json_answers_raise_value_error(text):
+    with pytest.raises(ValueError):
+        search_lambda.parse_jd_json_answer(text)
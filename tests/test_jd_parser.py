@@ -0,0 +1,30 @@
+from jd_parser import JDParser
+
+
+def make_parser():
+    return JDParser(['python', 'aws', 'react'])
+
+
+def test_required_experience_is_the_strictest_mention():
+    parsed = make_parser().parse(
+        "Backend Engineer\n"
+        "Requirements:\n"
+        "- 3+ years of Python\n"
+        "- 5-7 years of experience with AWS\n"
+    )
+    assert parsed.info['required_experience'] == 5
+    assert parsed.info['experience_range'] == {'min': 5, 'max': 7}
+    assert parsed.field_confidence['required_experience'] == 0.75
+
+
+def test_single_experience_mention_is_confident():
+    parsed = make_parser().parse("We need at least 4 years of experience with React.")
+    assert parsed.info['required_experience'] == 4
+    assert 'experience_range' not in parsed.info
+    assert parsed.field_confidence['required_experience'] == 0.9
+
+
+def test_no_experience_mention_defaults_to_zero():
+    parsed = make_parser().parse("Python developer wanted.")
+    assert parsed.info['required_experience'] == 0
+    assert parsed.field_confidence['required_experience'] == 0.3
@@ -0,0 +1,29 @@
+import os
+
+os.environ.setdefault('OPENSEARCH_ENDPOINT', 'search.example.com')
+os.environ.setdefault('OPENSEARCH_INDEX', 'resumes')
+os.environ.setdefault('OPENSEARCH_REGION', 'us-east-1')
+
+from conftest import load_module
+
+search_lambda = load_module('search_lambda', 'deployment-package/lambda_function.py')
+
+RESUME_ID = '3f2c1a9e-8b7d-4c6e-9f10-2a3b4c5d6e7f'
+
+
+def test_invalidate_matches_any_spelling_of_the_id():
+    search_lambda._pii_cache.invalidate()
+    search_lambda._pii_cache.put(RESUME_ID, {'name': 'Jane Doe'})
+
+    removed = search_lambda.invalidate_pii_cache(['{' + RESUME_ID.upper() + '}', 'not-a-uuid'])
+
+    assert removed == 1
+    assert search_lambda._pii_cache.get(RESUME_ID) is None
+
+
+def test_invalidate_without_ids_clears_the_cache():
+    search_lambda._pii_cache.invalidate()
+    search_lambda._pii_cache.put(RESUME_ID, {'name': 'Jane Doe'})
+
+    assert search_lambda.invalidate_pii_cache() == 1
+    assert len(search_lambda._pii_cache) == 0
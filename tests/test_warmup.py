@@ -0,0 +1,62 @@
+import io
+import json
+import os
+
+os.environ.setdefault('OPENSEARCH_ENDPOINT', 'search.example.com')
+os.environ.setdefault('OPENSEARCH_INDEX', 'resumes')
+os.environ.setdefault('OPENSEARCH_REGION', 'us-east-1')
+
+from conftest import load_module
+
+search_lambda = load_module('search_lambda', 'deployment-package/lambda_function.py')
+
+
+class FakeBedrock:
+    def __init__(self):
+        self.calls = 0
+
+    def invoke_model(self, modelId, body):
+        self.calls += 1
+        return {'body': io.BytesIO(json.dumps({'embedding': [0.5, 0.25]}).encode())}
+
+
+class RecordingL2:
+    def __init__(self):
+        self.puts = []
+
+    def get(self, namespace, key):
+        return None
+
+    def put(self, namespace, key, value, ttl_seconds):
+        self.puts.append((namespace, key))
+
+
+def test_warmup_embedding_is_not_cached(monkeypatch):
+    bedrock = FakeBedrock()
+    l2 = RecordingL2()
+    monkeypatch.setattr(search_lambda, 'get_bedrock_client', lambda: bedrock)
+    monkeypatch.setattr(search_lambda, '_l2_cache', l2)
+    search_lambda._embedding_cache.invalidate()
+
+    search_lambda._prewarm_bedrock()
+    search_lambda._prewarm_bedrock()
+
+    # Every warm-up reaches Bedrock, and nothing is left in either cache tier
+    assert bedrock.calls == 2
+    assert len(search_lambda._embedding_cache) == 0
+    assert l2.puts == []
+
+
+def test_search_embeddings_are_cached(monkeypatch):
+    bedrock = FakeBedrock()
+    l2 = RecordingL2()
+    monkeypatch.setattr(search_lambda, 'get_bedrock_client', lambda: bedrock)
+    monkeypatch.setattr(search_lambda, '_l2_cache', l2)
+    search_lambda._embedding_cache.invalidate()
+
+    first = search_lambda.get_query_embedding('Senior Python engineer')
+    second = search_lambda.get_query_embedding('senior  python engineer')
+
+    assert second is first
+    assert bedrock.calls == 1
+    assert [namespace for namespace, _ in l2.puts] == ['embedding']